@@ -0,0 +1,114 @@
+"""Benchmark of interned media ranges and language ranges.
+
+Replays a realistic mix of accept and accept-language headers, and compares parsing
+every range on every request with looking ranges up in the intern tables.
+
+Run with:
+
+    python benchmarks/interning.py
+"""
+
+import random
+import time
+import tracemalloc
+from typing import Callable, List, Sequence, Tuple
+
+from content_negotiation.content_negotiation import intern_media_range
+from content_negotiation.language_negotiation import intern_language
+
+# Headers and their share of the traffic:
+ACCEPT_HEADERS: List[Tuple[str, int]] = [
+    (
+        "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,"
+        "image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
+        40,
+    ),
+    (
+        "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,"
+        "image/webp,*/*;q=0.8",
+        15,
+    ),
+    ("text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8", 10),
+    ("*/*", 15),
+    ("application/json", 10),
+    (
+        "text/turtle,application/n-triples;q=0.9,application/ld+json;q=0.8,"
+        "application/rdf+xml;q=0.7,*/*;q=0.5",
+        5,
+    ),
+    ("application/ld+json, application/json;q=0.9, */*;q=0.1", 5),
+]
+
+ACCEPT_LANGUAGE_HEADERS: List[Tuple[str, int]] = [
+    ("nb-NO,nb;q=0.9,no;q=0.8,nn;q=0.7,en-US;q=0.6,en;q=0.5", 45),
+    ("en-US,en;q=0.9", 30),
+    ("nb,en;q=0.8", 10),
+    ("*", 10),
+    ("en-GB,en;q=0.9,nb;q=0.8", 5),
+]
+
+REQUESTS = 20000
+
+
+def _traffic(headers: Sequence[Tuple[str, int]], seed: int) -> List[List[str]]:
+    """Return the range tokens of every request in a random mix of headers."""
+    rng = random.Random(seed)  # noqa: S311
+    values = [header for header, _ in headers]
+    weights = [weight for _, weight in headers]
+    return [rng.choices(values, weights)[0].split(",") for _ in range(REQUESTS)]
+
+
+def _run(parse: Callable[[str], object], traffic: List[List[str]]) -> float:
+    """Parse the ranges of every request and return the time taken."""
+    start = time.perf_counter()
+    for tokens in traffic:
+        for token in tokens:
+            parse(token)
+    return time.perf_counter() - start
+
+
+def _peak(parse: Callable[[str], object], traffic: List[List[str]]) -> int:
+    """Return the peak memory in bytes of parsing the ranges of one request."""
+    peak = 0
+    for tokens in traffic[:1000]:
+        tracemalloc.start()
+        parsed = [parse(token) for token in tokens]
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        del parsed
+    return peak
+
+
+def _report(name: str, interned: Callable, traffic: List[List[str]]) -> None:
+    """Print the cost per request with and without the intern table."""
+    tokens = sum(len(request) for request in traffic)
+
+    interned.cache_clear()
+    interned_time = _run(interned, traffic)
+    misses = interned.cache_info().misses
+    interned_peak = _peak(interned, traffic)
+
+    parsed_time = _run(interned.__wrapped__, traffic)
+    parsed_peak = _peak(interned.__wrapped__, traffic)
+
+    print(f"{name} ({REQUESTS} requests, {tokens / REQUESTS:.1f} ranges/request)")
+    print(f"{'':12}{'objects/request':>18}{'peak bytes':>14}{'us/request':>14}")
+    print(
+        f"{'parsed':12}{tokens / REQUESTS:>18.2f}{parsed_peak:>14}"
+        f"{parsed_time / REQUESTS * 1e6:>14.2f}"
+    )
+    print(
+        f"{'interned':12}{misses / REQUESTS:>18.4f}{interned_peak:>14}"
+        f"{interned_time / REQUESTS * 1e6:>14.2f}"
+    )
+    print()
+
+
+def main() -> None:
+    """Run the benchmark."""
+    _report("Accept", intern_media_range, _traffic(ACCEPT_HEADERS, 1))
+    _report("Accept-Language", intern_language, _traffic(ACCEPT_LANGUAGE_HEADERS, 2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Benchmark of the compiled negotiators against the functions deciding on lists.
+
+Decides headers that are not in the tables of known headers, so that every request
+is parsed and negotiated, with the negotiators and with the functions. A compiled
+negotiator should never be slower than the function, nor allocate more.
+
+Run with:
+
+    python benchmarks/negotiators.py
+"""
+
+import sys
+import time
+import tracemalloc
+from typing import Callable, List
+
+from content_negotiation import (
+    ContentNegotiator,
+    decide_content_type,
+    decide_language,
+    LanguageNegotiator,
+)
+
+REQUESTS = 20000
+REPEAT = 5
+
+SUPPORTED_CONTENT_TYPES = [
+    "text/turtle",
+    "application/ld+json",
+    "application/rdf+xml",
+    "application/n-triples",
+    "text/html",
+]
+ACCEPT_HEADERS = [
+    "application/x-foo;q=0.3, text/html;level=1;q=0.7, application/ld+json;q=0.9, "
+    "*/*;q=0.1",
+    "image/png, application/rdf+xml;q=0.5",
+    "application/n-triples;q=0.9, text/*;q=0.8, */*;q=0.1",
+]
+
+SUPPORTED_LANGUAGES = ["nb", "nn", "en", "de"]
+ACCEPT_LANGUAGE_HEADERS = [
+    "fr-CA, fr;q=0.9, en-US;q=0.8, en;q=0.7, *;q=0.5",
+    "de-AT, nn;q=0.4",
+    "sv, da;q=0.9, nb;q=0.8",
+]
+
+
+def _decide(decide: Callable[[List[str]], str], headers: List[List[str]]) -> None:
+    """Decide every header once."""
+    for accept_headers in headers:
+        decide(accept_headers)
+
+
+def _us_per_request(
+    decide: Callable[[List[str]], str], headers: List[List[str]]
+) -> float:
+    """Return the best time per request, in microseconds."""
+    traffic = headers * (REQUESTS // len(headers))
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        _decide(decide, traffic)
+        best = min(best, time.perf_counter() - start)
+    return best / len(traffic) * 1e6
+
+
+def _peak(decide: Callable[[List[str]], str], headers: List[List[str]]) -> int:
+    """Return the peak bytes allocated by deciding one request."""
+    _decide(decide, headers)
+    peak = 0
+    for accept_headers in headers:
+        tracemalloc.start()
+        decide(accept_headers)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return peak
+
+
+def _report(
+    name: str,
+    function: Callable[[List[str]], str],
+    negotiator: Callable[[List[str]], str],
+    headers: List[List[str]],
+) -> bool:
+    """Print the cost of the function and the negotiator, and compare them."""
+    function_us = _us_per_request(function, headers)
+    negotiator_us = _us_per_request(negotiator, headers)
+    function_peak = _peak(function, headers)
+    negotiator_peak = _peak(negotiator, headers)
+    print(name)
+    print(f"{'':12}{'us/request':>14}{'peak bytes':>14}")
+    print(f"{'function':12}{function_us:>14.2f}{function_peak:>14}")
+    print(f"{'negotiator':12}{negotiator_us:>14.2f}{negotiator_peak:>14}")
+    print()
+    return negotiator_us <= function_us and negotiator_peak <= function_peak
+
+
+def main() -> int:
+    """Run the benchmark, and return 1 if a negotiator is more costly."""
+    content_negotiator = ContentNegotiator(SUPPORTED_CONTENT_TYPES)
+    language_negotiator = LanguageNegotiator(SUPPORTED_LANGUAGES)
+    accept = [[header] for header in ACCEPT_HEADERS]
+    accept_language = [[header] for header in ACCEPT_LANGUAGE_HEADERS]
+    if any(h in content_negotiator.decisions for h in ACCEPT_HEADERS) or any(
+        h in language_negotiator.decisions for h in ACCEPT_LANGUAGE_HEADERS
+    ):
+        raise RuntimeError("The headers must not be known headers.")
+
+    ok = _report(
+        "Accept",
+        lambda headers: decide_content_type(headers, SUPPORTED_CONTENT_TYPES),
+        content_negotiator.decide,
+        accept,
+    )
+    ok &= _report(
+        "Accept-Language",
+        lambda headers: decide_language(headers, SUPPORTED_LANGUAGES),
+        language_negotiator.decide,
+        accept_language,
+    )
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
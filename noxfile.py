@@ -1,16 +1,18 @@
 """Nox sessions."""
 
+import os
+import random
 import sys
 
 import nox
 from nox_poetry import Session, session
 
 package = "content_negotiation"
-locations = "src", "tests", "noxfile.py", "docs/conf.py"
+locations = "src", "tests", "benchmarks", "noxfile.py", "docs/conf.py"
 nox.options.envdir = ".cache"
 nox.options.reuse_existing_virtualenvs = True
 nox.options.stop_on_first_error = False
-nox.options.sessions = "lint", "mypy", "pytype", "unit_tests", "tests"
+nox.options.sessions = "lint", "mypy", "pytype", "unit_tests", "tests", "memory"
 
 
 @session(python=["3.12"])
@@ -31,6 +33,36 @@ def tests(session: Session) -> None:
     session.run("pytest", "-m not (unit)", *args)
 
 
+@session(python=["3.12"])
+def memory(session: Session) -> None:
+    """Run the tests measuring memory, which are skipped while coverage is measured."""
+    args = session.posargs
+    session.install(".")
+    session.install("pytest")
+    session.run("pytest", "-m memory", *args)
+
+
+@session(python=["3.12"])
+def fuzz(session: Session) -> None:
+    """Run the differential fuzz tests for long, with a random seed."""
+    seed = os.environ.get(
+        "CONTENT_NEGOTIATION_FUZZ_SEED", str(random.randrange(2**32))  # noqa: S311
+    )
+    iterations = os.environ.get("CONTENT_NEGOTIATION_FUZZ_ITERATIONS", "200000")
+    session.log(f"Fuzzing {iterations} iterations with seed {seed}")
+    session.install(".")
+    session.install("pytest")
+    session.run(
+        "pytest",
+        "tests/test_differential.py",
+        *session.posargs,
+        env={
+            "CONTENT_NEGOTIATION_FUZZ_SEED": seed,
+            "CONTENT_NEGOTIATION_FUZZ_ITERATIONS": iterations,
+        },
+    )
+
+
 @session(python=["3.12"])
 def black(session: Session) -> None:
     """Run black code formatter."""
@@ -1,23 +1,104 @@
-"""Datacatalog package.
+"""Content negotiation package.
+
+The public names, and the package version, are imported on first access, so that
+importing the package itself is cheap.
 
 Modules:
-    resource
-    dataset
-    dataset_series
-    catalog
-    dataservice
-    distribution
+    content_negotiation
+    language_negotiation
+    charset_negotiation
+    headers
+    freezing
+    registry
+    config
+    shared_cache
+    heavy_hitters
+    variants
+    codegen
+    export
+    bulk
+    bench
 """
 
-try:
-    from importlib.metadata import version, PackageNotFoundError  # type: ignore
-except ImportError:  # pragma: no cover
-    from importlib_metadata import version, PackageNotFoundError  # type: ignore
+# Importing typing takes longer than importing the rest of the package:
+TYPE_CHECKING = False
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any
+
+    from .charset_negotiation import (
+        CharsetNegotiator,
+        decide_charset,
+        NoAgreeableCharsetError,
+    )
+    from .content_negotiation import (
+        ContentNegotiator,
+        decide_content_type,
+        iter_content_types,
+        Negotiation,
+        NoAgreeableContentTypeError,
+        parse_accept,
+        ParsedAccept,
+    )
+    from .heavy_hitters import HeavyHittersTracker
+    from .language_negotiation import (
+        decide_language,
+        LanguageNegotiator,
+        NoAgreeableLanguageError,
+        parse_accept_language,
+        ParsedAcceptLanguage,
+    )
+
+    __version__: str
+
+# Public names, and the submodules defining them:
+_LAZY_ATTRIBUTES = {
+    "CharsetNegotiator": "charset_negotiation",
+    "decide_charset": "charset_negotiation",
+    "NoAgreeableCharsetError": "charset_negotiation",
+    "ContentNegotiator": "content_negotiation",
+    "decide_content_type": "content_negotiation",
+    "iter_content_types": "content_negotiation",
+    "Negotiation": "content_negotiation",
+    "NoAgreeableContentTypeError": "content_negotiation",
+    "parse_accept": "content_negotiation",
+    "ParsedAccept": "content_negotiation",
+    "HeavyHittersTracker": "heavy_hitters",
+    "decide_language": "language_negotiation",
+    "LanguageNegotiator": "language_negotiation",
+    "NoAgreeableLanguageError": "language_negotiation",
+    "parse_accept_language": "language_negotiation",
+    "ParsedAcceptLanguage": "language_negotiation",
+}
+
+__all__ = [*_LAZY_ATTRIBUTES, "__version__"]
+
+
+def _version() -> str:
+    """Return the version of the installed package."""
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version(__name__)
+    except PackageNotFoundError:  # pragma: no cover
+        return "unknown"
+
+
+def __getattr__(name: str) -> "Any":
+    """Import a public name on first access."""
+    if name == "__version__":
+        value = _version()
+    elif name in _LAZY_ATTRIBUTES:
+        # Relative import of the submodule, without importing importlib:
+        module = __import__(_LAZY_ATTRIBUTES[name], globals(), None, [name], 1)
+        value = getattr(module, name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    # Cache the value, so that __getattr__ is not called for it again:
+    globals()[name] = value
+    return value
 
-try:
-    __version__ = version(__name__)
-except PackageNotFoundError:  # pragma: no cover
-    __version__ = "unknown"
 
-from .content_negotiation import decide_content_type, NoAgreeableContentTypeError
-from .language_negotiation import decide_language, NoAgreeableLanguageError
+def __dir__() -> list[str]:
+    """Return the names of the package, including those not yet imported."""
+    return sorted({*globals(), *__all__})
@@ -0,0 +1,101 @@
+"""Command line interface of the content negotiation package.
+
+Run ``python -m content_negotiation --help`` for the commands.
+"""
+
+import argparse
+import sys
+from typing import List, Optional
+
+
+def _non_negative_int(value: str) -> int:
+    """Return the integer of an argument, which must not be negative."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = -1
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"not a non-negative integer: {value!r}")
+    return number
+
+
+def _bench(args: argparse.Namespace) -> int:
+    """Measure the cost of negotiating a corpus, and print it."""
+    from .bench import format_table, read_corpus, run, to_json
+
+    results = run(
+        read_corpus(args.corpus),
+        supported_content_types=args.supported,
+        supported_languages=args.languages,
+        repeat=args.repeat,
+        cache_slots=args.cache_slots,
+    )
+    print(to_json(results) if args.json else format_table(results))
+    return 0
+
+
+def _parser() -> argparse.ArgumentParser:
+    """Return the parser of the command line."""
+    parser = argparse.ArgumentParser(prog="python -m content_negotiation")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    bench = commands.add_parser(
+        "bench",
+        help="measure the cost of negotiating a corpus of headers",
+        description=(
+            "Decide every request of a corpus with every engine, and report "
+            "ops/sec, p50/p99/p999 latency, peak bytes allocated per request and "
+            "the hit ratio of tables and caches."
+        ),
+    )
+    bench.add_argument(
+        "--supported",
+        nargs="+",
+        metavar="CONTENT_TYPE",
+        help="supported content types, in order of preference",
+    )
+    bench.add_argument(
+        "--languages",
+        nargs="+",
+        metavar="LANGUAGE",
+        help="supported languages, in order of preference",
+    )
+    bench.add_argument(
+        "--corpus",
+        required=True,
+        help="file of accept and accept-language headers, tab-separated, "
+        "one request per line",
+    )
+    bench.add_argument(
+        "--repeat", type=int, default=1, help="times to decide the corpus"
+    )
+    bench.add_argument(
+        "--cache-slots",
+        type=_non_negative_int,
+        default=4096,
+        help="slots of the shared decision cache, or 0 to leave it out",
+    )
+    bench.add_argument("--json", action="store_true", help="report as JSON")
+    bench.set_defaults(handler=_bench)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the command line.
+
+    Args:
+        argv (Optional[List[str]]): the arguments, by default those of the process.
+
+    Returns:
+        The exit status.
+
+    """
+    parser = _parser()
+    args = parser.parse_args(argv)
+    if args.command == "bench" and args.supported is None and args.languages is None:
+        parser.error("bench: at least one of --supported and --languages is required")
+    return args.handler(args)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
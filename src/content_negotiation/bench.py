@@ -0,0 +1,339 @@
+"""Module for measuring the cost of negotiating a corpus of headers.
+
+Every engine, i.e. the functions deciding on lists and the compiled negotiators
+and caches, decides every request of the corpus once, timed per request, and
+once more under tracemalloc, for the peak bytes allocated by a request. The hit
+ratio is the share of requests decided by a table of known headers or by the
+shared decision cache, without negotiating.
+
+The corpus is a file in the format read by :mod:`content_negotiation.bulk`: one
+request per line, the value of the Accept header and, optionally, the value of
+the Accept-Language header, separated by a tab.
+
+Run from the command line with e.g.:
+
+    python -m content_negotiation bench --supported text/turtle application/ld+json
+        --languages nb en --corpus accept-headers.tsv
+
+Example:
+    >>> from content_negotiation.bench import format_table, read_corpus, run
+    >>>
+    >>> results = run(
+    >>>     read_corpus("accept-headers.tsv"),
+    >>>     supported_content_types=["text/turtle", "application/ld+json"],
+    >>>     supported_languages=["nb", "en"],
+    >>> )
+    >>> print(format_table(results))
+"""
+
+from contextlib import ExitStack
+from dataclasses import asdict, dataclass
+import json
+import time
+from typing import Callable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from .bulk import header_values
+from .codegen import compile_matcher
+from .content_negotiation import (
+    ContentNegotiator,
+    decide_content_type,
+    intern_media_range,
+    NoAgreeableContentTypeError,
+)
+from .headers import join_field_values
+from .language_negotiation import (
+    decide_language,
+    intern_language,
+    LanguageNegotiator,
+    NoAgreeableLanguageError,
+)
+from .shared_cache import SharedDecisionCache
+
+# A request: the accept headers and the accept-language headers.
+Request = Tuple[List[str], List[str]]
+# A function deciding the headers of a request:
+Decide = Callable[[List[str]], str]
+# An engine: its name, its decide function, and a function returning its hit ratio
+# over the requests decided since it was created, if it has a table or cache.
+Engine = Tuple[str, Decide, Optional[Callable[[], float]]]
+
+_NO_DECISION = (NoAgreeableContentTypeError, NoAgreeableLanguageError, ValueError)
+
+
+@dataclass(frozen=True)
+class BenchResult:
+    """Cost of an engine deciding the headers of a corpus."""
+
+    #: The name of the engine.
+    engine: str
+    #: The header decided, "Accept" or "Accept-Language".
+    header: str
+    #: The number of requests decided.
+    requests: int
+    #: Requests decided per second.
+    ops_per_sec: float
+    #: Median, 99th and 99.9th percentile time per request, in microseconds.
+    p50_us: float
+    p99_us: float
+    p999_us: float
+    #: The most bytes allocated at once by a request.
+    peak_bytes: int
+    #: The share of requests decided without negotiating, if the engine has a
+    #: table of known headers or a cache.
+    hit_ratio: Optional[float]
+
+
+class _CountingCache(SharedDecisionCache):
+    """Shared decision cache counting its hits."""
+
+    hits = 0
+
+    def lookup(self, header: str) -> Optional[int]:
+        """Look up a header, and count the hit."""
+        index = super().lookup(header)
+        if index is not None:
+            self.hits += 1
+        return index
+
+
+def read_corpus(path: str) -> List[Request]:
+    """Read a corpus of requests.
+
+    Args:
+        path (str): path to the file of accept headers, as read by
+            :func:`~content_negotiation.bulk.analyze_file`.
+
+    Returns:
+        The accept headers and accept-language headers of every request.
+
+    """
+    with open(path, "rb") as f:
+        requests = []
+        for line in f:
+            accept, _, accept_language = line.rstrip(b"\r\n").partition(b"\t")
+            requests.append((header_values(accept), header_values(accept_language)))
+    return requests
+
+
+def _table_hit_ratio(
+    table: Mapping[str, Optional[str]], corpus: Sequence[List[str]]
+) -> float:
+    """Return the share of the headers found in a table."""
+    hits = 0
+    for headers in corpus:
+        header = join_field_values(headers)
+        hits += header is not None and header in table
+    return hits / len(corpus) if corpus else 0.0
+
+
+def content_type_engines(
+    supported_content_types: List[str],
+    corpus: Sequence[List[str]],
+    stack: ExitStack,
+    cache_slots: int = 4096,
+) -> Iterator[Engine]:
+    """Yield the engines deciding a content type.
+
+    Args:
+        supported_content_types (List[str]): List of supported content types.
+        corpus (Sequence[List[str]]): the accept headers of every request.
+        stack (ExitStack): the stack to release the shared memory of caches with.
+        cache_slots (int): the number of slots of the shared decision cache, or 0
+            to leave it out.
+
+    Yields:
+        The name, the decide function and the hit ratio function of every engine.
+
+    """
+    yield (
+        "decide_content_type",
+        lambda headers: decide_content_type(headers, supported_content_types),
+        None,
+    )
+    yield "compile_matcher", compile_matcher(supported_content_types), None
+    negotiator = ContentNegotiator(supported_content_types)
+    yield (
+        "ContentNegotiator",
+        negotiator.decide,
+        lambda: _table_hit_ratio(negotiator.decisions, corpus),
+    )
+    if cache_slots:
+        cache = _CountingCache(slots=cache_slots)
+        stack.enter_context(cache)
+        stack.callback(cache.unlink)
+        cached = ContentNegotiator(
+            supported_content_types, known_headers=(), cache=cache
+        )
+        # A request hits the cache at most once, by its header or its canonical key:
+        yield (
+            "ContentNegotiator+SharedDecisionCache",
+            cached.decide,
+            lambda: cache.hits / len(corpus) if corpus else 0.0,
+        )
+
+
+def language_engines(
+    supported_languages: List[str], corpus: Sequence[List[str]]
+) -> Iterator[Engine]:
+    """Yield the engines deciding a language.
+
+    Args:
+        supported_languages (List[str]): List of supported languages.
+        corpus (Sequence[List[str]]): the accept-language headers of every request.
+
+    Yields:
+        The name, the decide function and the hit ratio function of every engine.
+
+    """
+    yield (
+        "decide_language",
+        lambda headers: decide_language(headers, supported_languages),
+        None,
+    )
+    negotiator = LanguageNegotiator(supported_languages)
+    yield (
+        "LanguageNegotiator",
+        negotiator.decide,
+        lambda: _table_hit_ratio(negotiator.decisions, corpus),
+    )
+
+
+def _percentile(durations: List[int], fraction: float) -> float:
+    """Return a percentile of sorted durations in nanoseconds, in microseconds."""
+    return durations[min(len(durations) - 1, int(fraction * len(durations)))] / 1000
+
+
+def measure(engine: Engine, header: str, corpus: Sequence[List[str]]) -> BenchResult:
+    """Decide every request of a corpus with an engine, and measure the cost.
+
+    Args:
+        engine (Engine): the name, decide function and hit ratio function.
+        header (str): the header decided, "Accept" or "Accept-Language".
+        corpus (Sequence[List[str]]): the headers of every request.
+
+    Returns:
+        The cost of the engine.
+
+    """
+    name, decide, hit_ratio = engine
+    # Every engine starts from cold intern tables, as the first engine would:
+    intern_media_range.cache_clear()
+    intern_language.cache_clear()
+    clock = time.perf_counter_ns
+    durations = []
+    for headers in corpus:
+        start = clock()
+        try:
+            decide(headers)
+        except _NO_DECISION:
+            pass
+        durations.append(clock() - start)
+    ratio = hit_ratio() if hit_ratio is not None else None
+
+    # Imported here, so that the module is imported in isolated subinterpreters,
+    # which cannot load tracemalloc:
+    import tracemalloc
+
+    peak = 0
+    tracemalloc.start()
+    try:
+        for headers in corpus:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            try:
+                decide(headers)
+            except _NO_DECISION:
+                pass
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        tracemalloc.stop()
+
+    total = sum(durations)
+    durations.sort()
+    return BenchResult(
+        engine=name,
+        header=header,
+        requests=len(durations),
+        ops_per_sec=len(durations) / total * 1e9 if total else 0.0,
+        p50_us=_percentile(durations, 0.5) if durations else 0.0,
+        p99_us=_percentile(durations, 0.99) if durations else 0.0,
+        p999_us=_percentile(durations, 0.999) if durations else 0.0,
+        peak_bytes=peak,
+        hit_ratio=ratio,
+    )
+
+
+def run(
+    corpus: Sequence[Request],
+    supported_content_types: Optional[List[str]] = None,
+    supported_languages: Optional[List[str]] = None,
+    repeat: int = 1,
+    cache_slots: int = 4096,
+) -> List[BenchResult]:
+    """Measure the cost of every engine on a corpus.
+
+    Args:
+        corpus (Sequence[Request]): the requests, e.g. read by :func:`read_corpus`.
+        supported_content_types (Optional[List[str]]): List of supported content
+            types. If not given, content types are not measured.
+        supported_languages (Optional[List[str]]): List of supported languages. If
+            not given, languages are not measured.
+        repeat (int): the number of times to decide the corpus.
+        cache_slots (int): the number of slots of the shared decision cache, or 0
+            to leave it out.
+
+    Returns:
+        The cost of every engine.
+
+    """
+    results = []
+    with ExitStack() as stack:
+        if supported_content_types is not None:
+            accept = [accept for accept, _ in corpus] * repeat
+            for engine in content_type_engines(
+                supported_content_types, accept, stack, cache_slots
+            ):
+                results.append(measure(engine, "Accept", accept))
+        if supported_languages is not None:
+            accept_language = [accept_language for _, accept_language in corpus]
+            accept_language *= repeat
+            for engine in language_engines(supported_languages, accept_language):
+                results.append(measure(engine, "Accept-Language", accept_language))
+    return results
+
+
+def format_table(results: Sequence[BenchResult]) -> str:
+    """Return the cost of every engine as a table.
+
+    Args:
+        results (Sequence[BenchResult]): the cost of every engine.
+
+    Returns:
+        The table, one engine per line.
+
+    """
+    lines = [
+        f"{'engine':40}{'requests':>10}{'ops/sec':>12}{'p50 us':>9}{'p99 us':>9}"
+        f"{'p999 us':>9}{'peak bytes':>12}{'hit ratio':>11}"
+    ]
+    for result in results:
+        hit_ratio = "-" if result.hit_ratio is None else f"{result.hit_ratio:.3f}"
+        lines.append(
+            f"{result.engine:40}{result.requests:>10}{result.ops_per_sec:>12.0f}"
+            f"{result.p50_us:>9.2f}{result.p99_us:>9.2f}{result.p999_us:>9.2f}"
+            f"{result.peak_bytes:>12}{hit_ratio:>11}"
+        )
+    return "\n".join(lines)
+
+
+def to_json(results: Sequence[BenchResult]) -> str:
+    """Return the cost of every engine as JSON, e.g. to compare configurations.
+
+    Args:
+        results (Sequence[BenchResult]): the cost of every engine.
+
+    Returns:
+        The JSON array, one object per engine.
+
+    """
+    return json.dumps([asdict(result) for result in results], indent=2)
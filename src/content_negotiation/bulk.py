@@ -0,0 +1,211 @@
+"""Module for negotiating accept headers in bulk, e.g. from archived access logs.
+
+The input file holds one request per line: the value of the Accept header and,
+optionally, the value of the Accept-Language header, separated by a tab. An empty
+value or ``-`` means that the header was not sent.
+
+The file is memory-mapped and split on line boundaries into shards, which are
+negotiated by a pool of worker processes. Every worker compiles its negotiators
+once, and returns aggregated counts only.
+
+Example:
+    >>> from content_negotiation.bulk import analyze_file
+    >>>
+    >>> result = analyze_file(
+    >>>     "accept-headers.tsv",
+    >>>     supported_content_types=["text/turtle", "application/ld+json"],
+    >>>     supported_languages=["nb", "en"],
+    >>> )
+    >>> result.content_types.most_common(1)
+    [('text/turtle', 1234)]
+"""
+
+from collections import Counter
+from concurrent.futures import as_completed, ProcessPoolExecutor
+from dataclasses import dataclass, field
+import mmap
+import os
+from typing import Dict, List, Optional, Tuple
+
+from .content_negotiation import ContentNegotiator, NoAgreeableContentTypeError
+from .language_negotiation import LanguageNegotiator, NoAgreeableLanguageError
+
+# Upper bound on the number of distinct lines memoized per shard:
+MEMO_SIZE = 65536
+
+_MISSING = (b"", b"-")
+
+
+@dataclass
+class BulkResult:
+    """Aggregated outcome of negotiating a file of accept headers."""
+
+    lines: int = 0
+    content_types: Counter = field(default_factory=Counter)
+    languages: Counter = field(default_factory=Counter)
+    no_agreeable_content_type: int = 0
+    no_agreeable_language: int = 0
+
+    def update(self, other: "BulkResult") -> None:
+        """Add the counts of another result to this result."""
+        self.lines += other.lines
+        self.content_types.update(other.content_types)
+        self.languages.update(other.languages)
+        self.no_agreeable_content_type += other.no_agreeable_content_type
+        self.no_agreeable_language += other.no_agreeable_language
+
+
+# Negotiators of the current worker process, compiled once by `_init_worker`:
+_content_negotiator: Optional[ContentNegotiator] = None
+_language_negotiator: Optional[LanguageNegotiator] = None
+
+
+def _init_worker(
+    supported_content_types: List[str], supported_languages: Optional[List[str]]
+) -> None:
+    """Compile the negotiators of a worker process."""
+    global _content_negotiator, _language_negotiator
+    _content_negotiator = ContentNegotiator(supported_content_types)
+    _language_negotiator = (
+        LanguageNegotiator(supported_languages)
+        if supported_languages is not None
+        else None
+    )
+
+
+def header_values(value: bytes) -> List[str]:
+    """Return the header values of a field of a line of the input file.
+
+    Args:
+        value (bytes): the field, without the tab and line break.
+
+    Returns:
+        The value of the header, decoded as latin-1, or no values if the header
+        was not sent.
+
+    """
+    if value in _MISSING:
+        return []
+    return [value.decode("latin-1")]
+
+
+def _negotiate_line(line: bytes) -> Tuple[Optional[str], Optional[str]]:
+    """Negotiate the content type and language of a line."""
+    assert _content_negotiator is not None  # noqa: S101
+    accept, _, accept_language = line.rstrip(b"\r\n").partition(b"\t")
+
+    content_type: Optional[str]
+    try:
+        content_type = _content_negotiator.decide(header_values(accept))
+    except NoAgreeableContentTypeError:
+        content_type = None
+
+    language: Optional[str] = None
+    if _language_negotiator is not None:
+        try:
+            language = _language_negotiator.decide(header_values(accept_language))
+        except (NoAgreeableLanguageError, ValueError):
+            language = None
+
+    return content_type, language
+
+
+def _analyze_shard(path: str, start: int, end: int) -> BulkResult:
+    """Negotiate the lines of the shard starting at `start` and ending at `end`."""
+    result = BulkResult()
+    memo: Dict[bytes, Tuple[Optional[str], Optional[str]]] = {}
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        mm.seek(start)
+        while mm.tell() < end:
+            line = mm.readline()
+            if line in memo:
+                content_type, language = memo[line]
+            else:
+                content_type, language = _negotiate_line(line)
+                if len(memo) < MEMO_SIZE:
+                    memo[line] = (content_type, language)
+
+            result.lines += 1
+            if content_type is None:
+                result.no_agreeable_content_type += 1
+            else:
+                result.content_types[content_type] += 1
+            if _language_negotiator is not None:
+                if language is None:
+                    result.no_agreeable_language += 1
+                else:
+                    result.languages[language] += 1
+
+    return result
+
+
+def shard_boundaries(mm: mmap.mmap, shard_count: int) -> List[Tuple[int, int]]:
+    """Split a memory-mapped file into shards on line boundaries.
+
+    Args:
+        mm (mmap.mmap): the memory-mapped file.
+        shard_count (int): the number of shards to aim for.
+
+    Returns:
+        List of (start, end) offsets, where every shard ends after a newline or at
+        the end of the file.
+
+    """
+    size = len(mm)
+    step = max(1, size // max(1, shard_count))
+    boundaries: List[Tuple[int, int]] = []
+
+    start = 0
+    while start < size:
+        newline = mm.find(b"\n", min(start + step, size) - 1)
+        end = size if newline == -1 else newline + 1
+        boundaries.append((start, end))
+        start = end
+
+    return boundaries
+
+
+def analyze_file(
+    path: str,
+    supported_content_types: List[str],
+    supported_languages: Optional[List[str]] = None,
+    max_workers: Optional[int] = None,
+    shards_per_worker: int = 4,
+) -> BulkResult:
+    """Negotiate every line of a file of accept headers on all cores.
+
+    Args:
+        path (str): path to the file of accept headers.
+        supported_content_types (List[str]): List of supported content types.
+        supported_languages (Optional[List[str]]): List of supported languages. If
+            not given, languages are not negotiated.
+        max_workers (Optional[int]): number of worker processes. Defaults to the
+            number of CPUs.
+        shards_per_worker (int): number of shards per worker, to even out the load.
+
+    Returns:
+        The aggregated counts of the decided content types and languages.
+
+    """
+    result = BulkResult()
+    if os.path.getsize(path) == 0:
+        return result
+
+    workers = max_workers or os.cpu_count() or 1
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        boundaries = shard_boundaries(mm, workers * shards_per_worker)
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(supported_content_types, supported_languages),
+    ) as executor:
+        futures = [
+            executor.submit(_analyze_shard, path, start, end)
+            for start, end in boundaries
+        ]
+        for future in as_completed(futures):
+            result.update(future.result())
+
+    return result
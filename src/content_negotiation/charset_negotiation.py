@@ -0,0 +1,345 @@
+"""Module for determining charset based on accept-charset header.
+
+Charsets are matched case-insensitively, and aliases such as "latin1" are folded
+into their preferred name, "iso-8859-1". As specified in RFC 7231, section 5.3.3,
+"*" matches every charset not mentioned elsewhere in the header, and charsets that
+are not mentioned are not acceptable unless "*" is present.
+
+Example:
+    >>> from content_negotiation import decide_charset, NoAgreeableCharsetError
+    >>>
+    >>> accept_charset_headers = ["iso-8859-1, utf-8;q=0.7"]
+    >>> supported_charsets = ["utf-8", "latin1"]
+    >>>
+    >>> try:
+    >>>     charset = decide_charset(accept_charset_headers, supported_charsets)
+    >>> except NoAgreeableCharsetError:
+    >>>     print("No agreeable charset found.")
+    >>>     # Handle error, by returning e.g. 406 Not Acceptable
+    >>> print(charset)
+    'latin1'
+"""
+
+from enum import Enum
+from functools import lru_cache
+import logging
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
+
+from .freezing import Freezable
+from .headers import parse_quality
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on the number of interned charset ranges:
+CHARSET_INTERN_SIZE = 1024
+# Upper bound on the number of negotiators cached for decide_charset:
+CHARSET_NEGOTIATOR_CACHE_SIZE = 128
+
+# Aliases of common charsets, and their preferred names, in lower case, read-only
+# like every module-level table, so that no interpreter state is mutable:
+CHARSET_ALIASES: Mapping[str, str] = MappingProxyType(
+    {
+        "utf8": "utf-8",
+        "unicode-1-1-utf-8": "utf-8",
+        "utf16": "utf-16",
+        "ascii": "us-ascii",
+        "us": "us-ascii",
+        "iso646-us": "us-ascii",
+        "iso-ir-6": "us-ascii",
+        "ansi_x3.4-1968": "us-ascii",
+        "cp367": "us-ascii",
+        "ibm367": "us-ascii",
+        "csascii": "us-ascii",
+        "latin1": "iso-8859-1",
+        "latin-1": "iso-8859-1",
+        "l1": "iso-8859-1",
+        "iso8859-1": "iso-8859-1",
+        "iso_8859-1": "iso-8859-1",
+        "iso_8859-1:1987": "iso-8859-1",
+        "iso-ir-100": "iso-8859-1",
+        "cp819": "iso-8859-1",
+        "ibm819": "iso-8859-1",
+        "csisolatin1": "iso-8859-1",
+        "latin9": "iso-8859-15",
+        "latin-9": "iso-8859-15",
+        "l9": "iso-8859-15",
+        "iso8859-15": "iso-8859-15",
+        "iso_8859-15": "iso-8859-15",
+        "cp1252": "windows-1252",
+        "cswindows1252": "windows-1252",
+        "cp1251": "windows-1251",
+        "cswindows1251": "windows-1251",
+        "sjis": "shift_jis",
+        "ms_kanji": "shift_jis",
+        "csshiftjis": "shift_jis",
+    }
+)
+
+
+class InvalidCharsetError(ValueError):
+    """Exception for invalid charset ranges."""
+
+    pass
+
+
+class NoAgreeableCharsetError(Exception):
+    """Exception for no agreeable charset."""
+
+    pass
+
+
+class CharsetSpecificity(Enum):
+    """Enum for charset range specificity."""
+
+    NONSPECIFIC = 0
+    SPECIFIC = 1
+
+
+class WeightedCharset:
+    """Class for handling weighted charsets.
+
+    Weighted charsets are immutable, so that a parsed charset range can be shared
+    between requests through :func:`intern_charset`.
+    """
+
+    __slots__ = ("charset", "q", "specificity")
+
+    charset: str
+    q: float
+    specificity: CharsetSpecificity
+
+    def __init__(self, charset: str) -> None:
+        """Initialize the weighted charset."""
+        weighted_charset_split = charset.split(";")
+        logger.debug("Assigning q-parameter for weighted charset: %s", charset)
+
+        # Charsets are case-insensitive:
+        charset_range = weighted_charset_split[0].strip().lower()
+
+        # Determine specificity:
+        if charset_range == "*":
+            specificity = CharsetSpecificity.NONSPECIFIC
+        else:
+            specificity = CharsetSpecificity.SPECIFIC
+
+        # If q-parameter is present, assign it:
+        try:
+            q = parse_quality(weighted_charset_split[1:])
+        except ValueError as e:
+            raise InvalidCharsetError(f"Invalid charset: {charset}") from e
+
+        object.__setattr__(self, "charset", charset_range)
+        object.__setattr__(self, "q", q)
+        object.__setattr__(self, "specificity", specificity)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Refuse to modify the weighted charset."""
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        """Refuse to modify the weighted charset."""
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __getstate__(self) -> Tuple[Any, ...]:
+        """Return the attributes, to pickle or copy the weighted charset by."""
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state: Tuple[Any, ...]) -> None:
+        """Restore the attributes of a pickled or copied weighted charset."""
+        for name, value in zip(self.__slots__, state, strict=True):
+            object.__setattr__(self, name, value)
+
+    def __lt__(self, other: Any) -> bool:
+        """Compare two weighted charsets."""
+        if isinstance(other, WeightedCharset):
+            # When q values are equal, compare specificity instead:
+            if self.q == other.q:
+                return self.specificity.value < other.specificity.value
+            # Compare q values:
+            return self.q < other.q
+        raise TypeError(
+            f"Cannot compare WeightedCharset with {type(other).__name__}"
+        )  # pragma: no cover
+
+    def __str__(self) -> str:
+        """Return the weighted charset as a string."""
+        return f"{self.charset};q={self.q}"
+
+
+@lru_cache(maxsize=CHARSET_INTERN_SIZE)
+def intern_charset(charset: str) -> Optional[WeightedCharset]:
+    """Return the shared weighted charset of a charset range.
+
+    Args:
+        charset (str): the raw charset range, e.g. "utf-8;q=0.9".
+
+    Returns:
+        The weighted charset, or None if the charset range is invalid.
+
+    """
+    try:
+        return WeightedCharset(charset)
+    except InvalidCharsetError:
+        return None
+
+
+def prepare_weighted_charsets(weighted_charsets: List[str]) -> List[WeightedCharset]:
+    """Prepare the accept weighted charsets and sort."""
+    weighted_charsets_sorted: List[WeightedCharset] = []
+
+    for accept_weighted_charset in weighted_charsets:
+        weighted_charset = intern_charset(accept_weighted_charset)
+        if weighted_charset is None:
+            logger.debug(
+                "Ignoring invalid weighted charset: %s", accept_weighted_charset
+            )
+            continue  # ignore invalid charset
+
+        weighted_charsets_sorted.append(weighted_charset)
+
+    # Sort and return list of weighted charsets:
+    weighted_charsets_sorted.sort(reverse=True)
+    return weighted_charsets_sorted
+
+
+def fold_charset(charset: str, aliases: Mapping[str, str] = CHARSET_ALIASES) -> str:
+    """Return the preferred name of a charset, in lower case."""
+    charset = charset.strip().lower()
+    return aliases.get(charset, charset)
+
+
+class CharsetNegotiator(Freezable):
+    """Negotiator compiled once for a list of supported charsets.
+
+    Every spelling of the supported charsets, in lower case and including their
+    aliases, is compiled into a lookup table when the negotiator is constructed, so
+    that matching a charset range is a single dict lookup.
+
+    Example:
+        >>> negotiator = CharsetNegotiator(["UTF-8", "ISO-8859-1"])
+        >>> negotiator.decide(["latin1;q=0.9, *;q=0.1"])
+        'ISO-8859-1'
+    """
+
+    supported_charsets: List[str]
+
+    def __init__(
+        self,
+        supported_charsets: List[str],
+        aliases: Mapping[str, str] = CHARSET_ALIASES,
+    ) -> None:
+        """Compile the supported charsets.
+
+        Args:
+            supported_charsets (List[str]): List of supported charsets.
+            aliases (Mapping[str, str]): aliases of charsets, and their preferred
+                names, in lower case.
+
+        """
+        self.supported_charsets = list(supported_charsets)
+
+        # Map each supported charset's preferred name to the supported spelling:
+        supported_by_name: Dict[str, str] = {}
+        for charset in self.supported_charsets:
+            supported_by_name.setdefault(fold_charset(charset, aliases), charset)
+
+        # Map every spelling of a supported charset to the supported spelling:
+        self._lookup: Dict[str, str] = {
+            alias: supported_by_name[name]
+            for alias, name in aliases.items()
+            if name in supported_by_name
+        }
+        self._lookup.update(supported_by_name)
+        for charset in self.supported_charsets:
+            self._lookup.setdefault(charset.strip().lower(), charset)
+
+        # The supported charsets, and the spelling they are looked up by:
+        self._spellings = [
+            (charset, self._lookup[charset.strip().lower()])
+            for charset in self.supported_charsets
+        ]
+
+    def decide(self, accept_charset_headers: List[str]) -> str:
+        """Decide the charset based on the given accept-charset headers.
+
+        Args:
+            accept_charset_headers (List[str]): the accept-charset headers.
+
+        Returns:
+            The charset of the response.
+
+        Raises:
+            NoAgreeableCharsetError: If no agreeable charset is found.
+
+        """
+        if len(self.supported_charsets) == 0:
+            raise NoAgreeableCharsetError("No supported charsets provided.")
+
+        # Parse and sort the accept-charset headers, skipping empty list elements:
+        weighted_charsets: List[str] = [
+            wc
+            for header in accept_charset_headers
+            for wc in header.split(",")
+            if wc.strip()
+        ]
+
+        # Without an accept-charset header, any charset is acceptable:
+        if len(weighted_charsets) == 0:
+            return self.supported_charsets[0]
+
+        weighted_charsets_sorted = prepare_weighted_charsets(weighted_charsets)
+
+        mentioned: Optional[Set[str]] = None
+        for weighted_charset in weighted_charsets_sorted:
+            # Weighted charsets with q=0.0 are not acceptable:
+            if weighted_charset.q == 0.0:
+                break
+
+            if weighted_charset.charset != "*":
+                charset = self._lookup.get(weighted_charset.charset)
+                if charset is not None:
+                    return charset
+                continue
+
+            # "*" matches every charset not mentioned elsewhere in the header:
+            if mentioned is None:
+                mentioned = {
+                    self._lookup[wc.charset]
+                    for wc in weighted_charsets_sorted
+                    if wc.charset in self._lookup
+                }
+            for charset, spelling in self._spellings:
+                if spelling not in mentioned:
+                    return charset
+
+        raise NoAgreeableCharsetError("No agreeable charset found.")
+
+
+@lru_cache(maxsize=CHARSET_NEGOTIATOR_CACHE_SIZE)
+def _charset_negotiator(supported_charsets: Tuple[str, ...]) -> CharsetNegotiator:
+    """Return the frozen negotiator of a tuple of supported charsets."""
+    return CharsetNegotiator(list(supported_charsets)).freeze()
+
+
+def decide_charset(
+    accept_charset_headers: List[str], supported_charsets: List[str]
+) -> str:
+    """Decide the charset based on the given accept-charset header and supported charsets.
+
+    The negotiators compiled for the supported charsets are cached per list, so
+    that the charset aliases are compiled once for every list. To negotiate with
+    other aliases, use :class:`CharsetNegotiator` instead.
+
+    Args:
+        accept_charset_headers (List[str]): the accept-charset headers.
+        supported_charsets (List[str]): List of supported charsets.
+
+    Returns:
+        The charset of the response.
+
+    """
+    logger.debug(
+        "Deciding charsets %s against %s", accept_charset_headers, supported_charsets
+    )
+    return _charset_negotiator(tuple(supported_charsets)).decide(accept_charset_headers)
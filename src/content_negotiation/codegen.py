@@ -0,0 +1,230 @@
+"""Module for generating a matcher specialized to a list of supported content types.
+
+When the supported content types of a route are static, the answer to every media
+range is known up front: the content type itself for a supported content type,
+the first supported content type of the type for "type/*", and the first supported
+content type for "*/*". :func:`compile_matcher` writes these answers into the
+source of a Python function, as a dict literal by type and sub type and as string
+constants, and compiles it once, so that deciding is two dict lookups per media
+range, without formatting the media range or scanning the supported content types.
+
+Every matcher is checked against :func:`~content_negotiation.decide_content_type`
+when it is compiled, and the matchers are cached per list of supported content
+types.
+
+Example:
+    >>> from content_negotiation.codegen import compile_matcher
+    >>>
+    >>> decide = compile_matcher(["text/turtle", "application/ld+json"])
+    >>> decide(["application/*;q=0.9, text/plain"])
+    'application/ld+json'
+"""
+
+from functools import lru_cache
+from itertools import count
+import linecache
+import logging
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from .content_negotiation import (
+    decide_content_type,
+    KNOWN_ACCEPT_HEADERS,
+    NoAgreeableContentTypeError,
+    parse_accept,
+    ParsedAccept,
+)
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on the number of matchers cached:
+MATCHER_CACHE_SIZE = 128
+
+# Serial number of the generated sources, for their file names:
+_serial = count()
+
+# A matcher, deciding a content type like decide_content_type:
+Matcher = Callable[[Union[List[str], ParsedAccept]], str]
+
+_TEMPLATE = '''\
+def {name}(accept_headers):
+    """Decide the content type against SUPPORTED_CONTENT_TYPES."""
+{body}
+'''
+
+_NO_SUPPORTED = """\
+    raise NoAgreeableContentTypeError(
+        "No supported content types or accept headers provided."
+    )"""
+
+_BODY = """\
+    accept = (
+        accept_headers
+        if isinstance(accept_headers, ParsedAccept)
+        else parse_accept(accept_headers)
+    )
+    if accept.invalid:
+        raise NoAgreeableContentTypeError()
+    # Wildcards must skip the excluded media types, which the generic path does:
+    if accept.excluded:
+        return decide_content_type(accept, SUPPORTED_CONTENT_TYPES)
+    if not accept.ranges:
+        return {default}
+    for weighted_media_range in accept.ranges:
+        sub_types = MATCHES.get(weighted_media_range.type)
+        if sub_types is not None:
+            content_type = sub_types.get(weighted_media_range.sub_type)
+            if content_type is not None:
+                return content_type
+    raise NoAgreeableContentTypeError("No agreeable content type found.")"""
+
+
+def answers(supported_content_types: List[str]) -> Dict[str, Dict[str, str]]:
+    """Return the content type decided for every media range, by type and sub type.
+
+    Args:
+        supported_content_types (List[str]): List of supported content types.
+
+    Returns:
+        The decided content type, by the type and sub type of the media range.
+
+    """
+    matches: Dict[str, Dict[str, str]] = {}
+    # Supported content types take precedence, where a media range equals one:
+    for content_type in supported_content_types:
+        if ";" not in content_type and content_type.count("/") == 1:
+            type, sub_type = content_type.split("/")
+            matches.setdefault(type, {}).setdefault(sub_type, content_type)
+    # "type/*" decides the first of the type, and "*/*" the first of all:
+    for content_type in supported_content_types:
+        type = content_type.split("/")[0]
+        if type != "*":
+            matches.setdefault(type, {}).setdefault("*", content_type)
+    if supported_content_types:
+        matches.setdefault("*", {}).setdefault("*", supported_content_types[0])
+    return matches
+
+
+def _literal(value: str) -> str:
+    """Return a string as a Python string literal."""
+    # The repr of str itself, which a subclass of str cannot override:
+    return str.__repr__(value)
+
+
+def generate_source(name: str, supported_content_types: List[str]) -> str:
+    """Return the source of a matcher.
+
+    Args:
+        name (str): the name of the function.
+        supported_content_types (List[str]): List of supported content types.
+
+    Returns:
+        The source, defining the function and the MATCHES constant it looks up.
+
+    """
+    if not supported_content_types:
+        body = _NO_SUPPORTED
+    else:
+        body = _BODY.format(default=_literal(supported_content_types[0]))
+    matches = ", ".join(
+        f"{_literal(type)}: {{"
+        + ", ".join(
+            f"{_literal(sub_type)}: {_literal(content_type)}"
+            for sub_type, content_type in sub_types.items()
+        )
+        + "}"
+        for type, sub_types in answers(supported_content_types).items()
+    )
+    return f"MATCHES = {{{matches}}}\n\n" + _TEMPLATE.format(name=name, body=body)
+
+
+# Outcomes the matchers are checked on, besides every media range they answer:
+_CHECKED_HEADERS: Tuple[List[str], ...] = (
+    [],
+    [""],
+    ["text"],
+    ["*/*;q=0"],
+    ["x-unsupported/x-unsupported"],
+    *([header] for header in KNOWN_ACCEPT_HEADERS),
+)
+
+
+def _outcome(decide: Matcher, accept_headers: List[str]) -> object:
+    """Return the decision, or the type of the error raised."""
+    try:
+        return decide(accept_headers)
+    except NoAgreeableContentTypeError as e:
+        return type(e)
+
+
+def _mismatch(
+    matcher: Matcher, supported_content_types: List[str]
+) -> Optional[List[str]]:
+    """Return accept headers the matcher decides unlike the generic path, if any."""
+    checked = [
+        *_CHECKED_HEADERS,
+        *(
+            [f"{type}/{sub_type}"]
+            for type, sub_types in answers(supported_content_types).items()
+            for sub_type in sub_types
+        ),
+    ]
+    for accept_headers in checked:
+        if _outcome(matcher, accept_headers) != _outcome(
+            lambda a: decide_content_type(a, supported_content_types), accept_headers
+        ):
+            return accept_headers
+    return None
+
+
+@lru_cache(maxsize=MATCHER_CACHE_SIZE)
+def _compile(supported_content_types: Tuple[str, ...]) -> Matcher:
+    """Generate, compile and check the matcher of a tuple of content types."""
+    supported = list(supported_content_types)
+    name = "decide_content_type_matcher"
+    source = generate_source(name, supported)
+    filename = f"<content_negotiation.codegen-{next(_serial)}>"
+    # Keep the source for tracebacks and inspect:
+    linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+
+    namespace: Dict[str, object] = {
+        "decide_content_type": decide_content_type,
+        "NoAgreeableContentTypeError": NoAgreeableContentTypeError,
+        "parse_accept": parse_accept,
+        "ParsedAccept": ParsedAccept,
+        "SUPPORTED_CONTENT_TYPES": supported,
+    }
+    # The source holds no input but string literals from str.__repr__, and the list
+    # itself is only passed in the namespace:
+    exec(compile(source, filename, "exec"), namespace)  # noqa: S102
+    matcher: Matcher = namespace[name]  # type: ignore[assignment]
+
+    mismatch = _mismatch(matcher, supported)
+    if mismatch is not None:
+        logger.warning(
+            "Generated matcher decides %s against %s unlike decide_content_type, "
+            "using decide_content_type instead.",
+            mismatch,
+            supported,
+        )
+        return lambda accept_headers: decide_content_type(accept_headers, supported)
+    return matcher
+
+
+def compile_matcher(supported_content_types: List[str]) -> Matcher:
+    """Return a function deciding content types against a list, generated for it.
+
+    The function decides as :func:`~content_negotiation.decide_content_type` with
+    the supported content types does. Functions are cached per list, and checked
+    against decide_content_type when they are generated; should a check fail, the
+    function returned decides with decide_content_type instead.
+
+    Args:
+        supported_content_types (List[str]): List of supported content types.
+
+    Returns:
+        The function, taking the accept headers, or the accept headers parsed by
+        :func:`~content_negotiation.parse_accept`, and returning the content type
+        of the response or raising NoAgreeableContentTypeError.
+
+    """
+    return _compile(tuple(supported_content_types))
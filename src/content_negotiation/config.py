@@ -0,0 +1,261 @@
+"""Module for loading the negotiators of routes from a configuration file.
+
+The configuration file maps routes to their supported content types and,
+optionally, supported languages, in TOML or JSON:
+
+.. code-block:: toml
+
+    [routes."/datasets"]
+    content_types = ["text/turtle", "application/ld+json"]
+    languages = ["nb", "en"]
+    language_equivalents = [["no", "nb", "nb-NO", "no-NO"]]
+
+    [routes."/datasets".language_fallbacks]
+    nn = ["nb"]
+
+    [routes."/concepts"]
+    content_types = ["text/turtle", "application/rdf+xml;qs=0.5"]
+    structured_suffixes = true
+
+Routes with the same lists share one frozen negotiator, from the registry of
+:mod:`content_negotiation.registry`. The file is checked for changes by
+modification time, and only the routes that changed are compiled again. The
+compiled routes are swapped in as one read-only snapshot, so a request that has
+looked up the routes keeps a consistent view of them while the configuration is
+reloaded.
+
+Example:
+    >>> from content_negotiation.config import NegotiatorConfig
+    >>>
+    >>> config = NegotiatorConfig("negotiation.toml")
+    >>> # Per request, or periodically:
+    >>> config.reload()
+    >>> route = config.routes["/datasets"]
+    >>> content_type = route.content_negotiator.decide(accept_headers)
+"""
+
+from dataclasses import dataclass
+import json
+import os
+from threading import Lock
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from .content_negotiation import ContentNegotiator
+from .language_negotiation import LanguageNegotiator
+from .registry import default_registry
+
+
+class ConfigError(ValueError):
+    """Exception for invalid negotiator configurations."""
+
+    pass
+
+
+@dataclass(frozen=True)
+class RouteNegotiators:
+    """The compiled negotiators of a route."""
+
+    content_negotiator: ContentNegotiator
+    language_negotiator: Optional[LanguageNegotiator]
+    #: The configuration the negotiators were compiled from.
+    spec: Tuple[Any, ...]
+
+
+def _read(path: str) -> Dict[str, Any]:
+    """Read a TOML or JSON configuration file."""
+    with open(path, "rb") as f:
+        try:
+            if path.endswith(".toml"):
+                import tomllib
+
+                return tomllib.load(f)
+            return json.load(f)
+        except ValueError as e:
+            raise ConfigError(f"Invalid configuration file {path}: {e}") from e
+
+
+def _is_string_list(value: Any) -> bool:
+    """Return True if the value is a list of strings."""
+    return isinstance(value, list) and all(isinstance(v, str) for v in value)
+
+
+def _string_list(route: str, spec: Dict[str, Any], key: str) -> Optional[List[str]]:
+    """Return a list of strings of a route's configuration."""
+    value = spec.get(key)
+    if value is None:
+        return None
+    if not _is_string_list(value):
+        raise ConfigError(f"Route {route!r}: {key} must be a list of strings.")
+    return value
+
+
+def _language_equivalents(route: str, spec: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Return the language equivalence classes of a route's configuration."""
+    value = spec.get("language_equivalents", [])
+    if not isinstance(value, list) or not all(_is_string_list(v) for v in value):
+        raise ConfigError(
+            f"Route {route!r}: language_equivalents must be a list of lists of strings."
+        )
+    return tuple(tuple(equivalence_class) for equivalence_class in value)
+
+
+def _language_fallbacks(route: str, spec: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Return the language fallback chains of a route's configuration."""
+    value = spec.get("language_fallbacks", {})
+    if not isinstance(value, dict) or not all(
+        _is_string_list(v) for v in value.values()
+    ):
+        raise ConfigError(
+            f"Route {route!r}: language_fallbacks must map languages to lists of "
+            "strings."
+        )
+    return tuple((language, tuple(chain)) for language, chain in value.items())
+
+
+def route_spec(route: str, spec: Any) -> Tuple[Any, ...]:
+    """Validate the configuration of a route, and return it as a comparable tuple.
+
+    Args:
+        route (str): the route.
+        spec (Any): the configuration of the route.
+
+    Returns:
+        The supported content types, the supported languages, or None, whether to
+        match structured syntax suffixes, and the language fallback chains and
+        equivalence classes.
+
+    Raises:
+        ConfigError: If the configuration of the route is invalid.
+
+    """
+    if not isinstance(spec, dict):
+        raise ConfigError(f"Route {route!r} must be a table.")
+    content_types = _string_list(route, spec, "content_types")
+    if content_types is None:
+        raise ConfigError(f"Route {route!r}: content_types is required.")
+    languages = _string_list(route, spec, "languages")
+    structured_suffixes = spec.get("structured_suffixes", False)
+    if not isinstance(structured_suffixes, bool):
+        raise ConfigError(f"Route {route!r}: structured_suffixes must be a boolean.")
+    return (
+        tuple(content_types),
+        tuple(languages) if languages is not None else None,
+        structured_suffixes,
+        _language_fallbacks(route, spec),
+        _language_equivalents(route, spec),
+    )
+
+
+def compile_route(route: str, spec: Tuple[Any, ...]) -> RouteNegotiators:
+    """Compile the negotiators of a route.
+
+    Args:
+        route (str): the route.
+        spec (Tuple[Any, ...]): the configuration of the route, from
+            :func:`route_spec`.
+
+    Returns:
+        The compiled negotiators.
+
+    Raises:
+        ConfigError: If a supported content type is invalid.
+
+    """
+    content_types, languages, structured_suffixes, fallbacks, equivalents = spec
+    # Routes with the same lists share the negotiators of the registry:
+    try:
+        content_negotiator = default_registry.content_negotiator(
+            content_types, structured_suffixes=structured_suffixes
+        )
+    except ValueError as e:
+        raise ConfigError(f"Route {route!r}: {e}") from e
+    return RouteNegotiators(
+        content_negotiator=content_negotiator,
+        language_negotiator=(
+            default_registry.language_negotiator(
+                languages, fallbacks=dict(fallbacks), equivalents=equivalents
+            )
+            if languages is not None
+            else None
+        ),
+        spec=spec,
+    )
+
+
+class NegotiatorConfig:
+    """The negotiators of routes, loaded from a configuration file and reloaded.
+
+    :attr:`routes` is a read-only snapshot, which is replaced, never modified, when
+    the configuration is reloaded. Look it up once per request for a consistent
+    view of the routes.
+    """
+
+    path: str
+    routes: Mapping[str, RouteNegotiators]
+
+    def __init__(self, path: str) -> None:
+        """Load the configuration file.
+
+        Args:
+            path (str): the path of the TOML or JSON configuration file.
+
+        """
+        self.path = path
+        self.routes = MappingProxyType({})
+        self._stamp: Optional[Tuple[int, int, int]] = None
+        # The stamp of the file last found invalid, so that it raises only once:
+        self._failed_stamp: Optional[Tuple[int, int, int]] = None
+        self._lock = Lock()
+        self.reload()
+
+    def reload(self) -> bool:
+        """Reload the configuration file, if it has changed.
+
+        Only the routes whose configuration changed are compiled again. If the
+        configuration is invalid, the routes are left as they were, and the error is
+        raised once: until the file changes again, the previous routes are served
+        without reading it again.
+
+        Returns:
+            True if the configuration file had changed.
+
+        Raises:
+            ConfigError: If the configuration is invalid.
+
+        """
+        with self._lock:
+            # A file replaced by renaming has another inode, if not another mtime:
+            stat = os.stat(self.path)
+            stamp = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+            if stamp == self._stamp or stamp == self._failed_stamp:
+                return False
+
+            try:
+                compiled = self._compile()
+            except ConfigError:
+                self._failed_stamp = stamp
+                raise
+
+            # Swap in the new snapshot in one assignment:
+            self.routes = MappingProxyType(compiled)
+            self._stamp = stamp
+            return True
+
+    def _compile(self) -> Dict[str, RouteNegotiators]:
+        """Read the configuration file, and compile the routes that changed."""
+        config = _read(self.path)
+        routes = config.get("routes")
+        if not isinstance(routes, dict):
+            raise ConfigError("The configuration must have a routes table.")
+
+        compiled: Dict[str, RouteNegotiators] = {}
+        for route, spec in routes.items():
+            validated = route_spec(route, spec)
+            previous = self.routes.get(route)
+            compiled[route] = (
+                previous
+                if previous is not None and previous.spec == validated
+                else compile_route(route, validated)
+            )
+        return compiled
@@ -15,9 +15,77 @@ Example:
     'application/json'
 """
 
+from dataclasses import dataclass
 from enum import Enum
+from functools import cached_property, lru_cache
 import logging
-from typing import Any, List, Optional
+from types import MappingProxyType
+from typing import (
+    AbstractSet,
+    Any,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    TYPE_CHECKING,
+    Union,
+)
+
+from .freezing import Freezable
+from .headers import join_field_values, OWS, parse_quality, split_field_values
+from .heavy_hitters import HeavyHittersTracker
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .shared_cache import SharedDecisionCache
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on the number of interned media ranges:
+MEDIA_RANGE_INTERN_SIZE = 1024
+
+# Index cached for accept headers with no agreeable content type:
+NO_AGREEABLE_CONTENT_TYPE = -1
+
+
+# Accept headers sent by common clients, decided up front by `ContentNegotiator`:
+KNOWN_ACCEPT_HEADERS = (
+    # Chrome, Edge and Opera:
+    "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,"
+    "image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
+    # Firefox:
+    "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,"
+    "image/png,image/svg+xml,*/*;q=0.8",
+    "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,"
+    "*/*;q=0.8",
+    # Safari:
+    "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    # curl, wget, HTTP libraries and API clients:
+    "*/*",
+    "application/json",
+    "application/json, text/plain, */*",
+    "application/json, */*;q=0.5",
+    # RDF clients:
+    "text/turtle",
+    "application/ld+json",
+    "application/rdf+xml",
+    "application/n-triples",
+    "text/turtle,application/n-triples;q=0.9,application/ld+json;q=0.8,"
+    "application/rdf+xml;q=0.7,*/*;q=0.5",
+    "application/rdf+xml, text/rdf+n3, application/xml;q=0.8",
+    "application/ld+json, application/json;q=0.9, */*;q=0.1",
+)
+
+
+# Media types that, besides application/<suffix>, are satisfied by types with a
+# structured syntax suffix (RFC 6839, RFC 7303):
+STRUCTURED_SUFFIX_BASE_TYPES: Mapping[str, Tuple[str, ...]] = MappingProxyType(
+    {"xml": ("text/xml",)}
+)
 
 
 class InvalidMediaRangeError(ValueError):
@@ -41,12 +109,21 @@ class MediaRangeSpecificity(Enum):
 
 
 class WeightedMediaRange:
-    """Class for handling weighted media ranges."""
+    """Class for handling weighted media ranges.
+
+    Weighted media ranges are immutable, so that a parsed media range can be shared
+    between requests through :func:`intern_media_range`.
+    """
+
+    __slots__ = ("type", "sub_type", "q", "specificity", "_media_range", "_key")
 
     type: str
     sub_type: str
-    q: float = 1.0
+    q: float
     specificity: MediaRangeSpecificity
+    # The media range, and its element in canonical keys:
+    _media_range: str
+    _key: str
 
     def __init__(self, media_range: str) -> None:
         """Initialize the weighted media range."""
@@ -54,40 +131,66 @@ class WeightedMediaRange:
         weighted_media_range_split = media_range.split(";")
         # Determine specificity:
         try:
-            logging.debug(
-                f"Determine specificty and asign q-parameter for weighted media range: {media_range}"  # noqa: B950
+            logger.debug(
+                "Determine specificty and asign q-parameter for weighted media range: %s",  # noqa: B950
+                media_range,
             )
-            self.type, self.sub_type = weighted_media_range_split[0].split("/")
+            media_type, sub_type = weighted_media_range_split[0].strip(OWS).split("/")
 
             # Determine specificity:
-            if self.type == "*":
-                self.specificity = MediaRangeSpecificity.NONSPECIFIC
-            elif self.sub_type == "*":
-                self.specificity = MediaRangeSpecificity.SUBTYPE_INSPECIFIC
+            if media_type == "*":
+                specificity = MediaRangeSpecificity.NONSPECIFIC
+            elif sub_type == "*":
+                specificity = MediaRangeSpecificity.SUBTYPE_INSPECIFIC
             else:
-                self.specificity = MediaRangeSpecificity.SPECIFIC
+                specificity = MediaRangeSpecificity.SPECIFIC
 
             # If q-parameter is present, assign it:
-            for weighted_media_range_part in weighted_media_range_split[1:]:
-                if weighted_media_range_part.startswith("q="):
-                    self.q = float(
-                        # RFC specifies only 3 decimals may be used in q value.
-                        # Must strip additional decimals so that q bonus from specificity
-                        # results in correct sorting.
-                        weighted_media_range_part.split("=")[1][0:5]
-                    )
-                    # Check if q value is valid and adjust accordingly:
-                    self.q = 1.0 if self.q > 1.0 else self.q
-                    self.q = 0.0 if self.q < 0.0 else self.q
+            q = parse_quality(weighted_media_range_split[1:])
 
         except ValueError as e:
             raise InvalidMediaRangeError(f"Invalid media range: {media_range}") from e
 
+        object.__setattr__(self, "type", media_type)
+        object.__setattr__(self, "sub_type", sub_type)
+        object.__setattr__(self, "q", q)
+        object.__setattr__(self, "specificity", specificity)
+        # Formatted once, since interned media ranges are shared between requests:
+        media_range = f"{media_type}/{sub_type}"
+        object.__setattr__(self, "_media_range", media_range)
+        object.__setattr__(
+            self, "_key", media_range if q == 1.0 else f"{media_range};q={q!r}"
+        )
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Refuse to modify the weighted media range."""
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        """Refuse to modify the weighted media range."""
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __getstate__(self) -> Tuple[Any, ...]:
+        """Return the attributes, to pickle or copy the weighted media range by."""
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state: Tuple[Any, ...]) -> None:
+        """Restore the attributes of a pickled or copied weighted media range."""
+        for name, value in zip(self.__slots__, state, strict=True):
+            object.__setattr__(self, name, value)
+
     def __eq__(self, other: Any) -> bool:
-        """Compare two weighted media ranges."""
+        """Compare two weighted media ranges, or a weighted media range and a string."""
+        # Equal if the media ranges and q-values are, whether interned or not:
+        if isinstance(other, WeightedMediaRange):
+            return self._key == other._key
         if isinstance(other, str):
-            return f"{self.type}/{self.sub_type}" == other
-        return False  # pragma: no cover
+            return self._media_range == other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        """Return the hash of the media range, which equal strings share."""
+        return hash(self._media_range)
 
     def __lt__(self, other: Any) -> bool:
         """Compare two weighted media ranges."""
@@ -107,38 +210,180 @@ class WeightedMediaRange:
 
     def media_range(self) -> str:
         """Return the media range."""
-        return f"{self.type}/{self.sub_type}"
+        return self._media_range
+
+
+@lru_cache(maxsize=MEDIA_RANGE_INTERN_SIZE)
+def intern_media_range(media_range: str) -> Optional[WeightedMediaRange]:
+    """Return the shared weighted media range of a media range.
+
+    Media ranges are parsed once and kept in a bounded intern table keyed by the raw
+    media range, so a media range that is repeated across requests is not parsed
+    again, even when the rest of the accept header differs.
+
+    Args:
+        media_range (str): the raw media range, e.g. "text/html;q=0.9".
+
+    Returns:
+        The weighted media range, or None if the media range is invalid.
+
+    """
+    try:
+        return WeightedMediaRange(media_range)
+    except InvalidMediaRangeError:
+        return None
 
 
 def prepare_weighted_media_ranges(
     weighted_media_ranges: List[str],
 ) -> List[WeightedMediaRange]:
     """Prepare the accept weighted media ranges and sort."""
-    logging.debug(f"Preparing accept weighted media ranges: {weighted_media_ranges}")
+    logger.debug("Preparing accept weighted media ranges: %s", weighted_media_ranges)
 
     weighted_media_ranges_sorted: List[WeightedMediaRange] = []
 
     for accept_weighted_media_range in weighted_media_ranges:
-        # Instantiate weighted media range:
-        try:
-            weighted_media_range = WeightedMediaRange(accept_weighted_media_range)
-
-            weighted_media_ranges_sorted.append(weighted_media_range)
-        except InvalidMediaRangeError:
-            logging.debug(
+        # Look up the interned weighted media range:
+        weighted_media_range = intern_media_range(accept_weighted_media_range)
+        if weighted_media_range is None:
+            logger.debug(
                 "Ignoring invalid weighted media range: %s", accept_weighted_media_range
             )
-            pass  # ignore invalid media range
+            continue  # ignore invalid media range
+
+        weighted_media_ranges_sorted.append(weighted_media_range)
 
     # Sort and return list of weighted media ranges:
     weighted_media_ranges_sorted.sort(reverse=True)
-    logging.debug(
-        f"Accept weighted media ranges sorted: {', '.join(str(p) for p in weighted_media_ranges_sorted)}"  # noqa: B950
-    )
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Accept weighted media ranges sorted: %s",
+            ", ".join(str(p) for p in weighted_media_ranges_sorted),
+        )
 
     return weighted_media_ranges_sorted
 
 
+@dataclass(frozen=True)
+class ParsedAccept:
+    """Accept headers parsed once, for negotiating against several supported lists.
+
+    Parsed accept headers are immutable, and may be passed to
+    :func:`decide_content_type` or to any :class:`ContentNegotiator` instead of the
+    raw accept headers, so that the headers are split, parsed and sorted only once
+    per request. They are values: parsed accept headers are hashable, and equal if
+    their headers and weighted media ranges are, whether interned or not.
+
+    Example:
+        >>> accept = parse_accept(request.headers.getlist("Accept"))
+        >>> try:
+        >>>     content_type = route_negotiator.decide(accept)
+        >>> except NoAgreeableContentTypeError:
+        >>>     content_type = error_page_negotiator.decide(accept)
+    """
+
+    #: The comma-joined accept headers, or None if no accept header was given.
+    header: Optional[str]
+    #: The weighted media ranges with a q-value above 0.0, in order of preference.
+    ranges: Tuple[WeightedMediaRange, ...]
+    #: Whether only invalid media ranges were given.
+    invalid: bool
+    #: The media ranges with a q-value of 0.0, which wildcards do not match.
+    excluded: FrozenSet[str] = frozenset()
+
+    @cached_property
+    def key(self) -> str:
+        """The canonical accept header, which is decided as the accept headers are.
+
+        Accept headers differing only in whitespace, in the case of the q parameter,
+        in "q=1" versus no q-value, in parameters other than q, in repeated media
+        ranges, or in how they are split into several header fields, have the same
+        key, so that decisions may be memoized by key. Excluded media ranges are
+        listed last, in sorted order.
+
+        Returns:
+            The canonical accept header.
+
+        """
+        # Only invalid media ranges decide as one invalid media range:
+        if self.invalid:
+            return ""
+        # No acceptable media ranges decide as any media range, unless that is
+        # excluded too:
+        if not self.ranges and "*/*" in self.excluded:
+            return "*/*;q=0"
+        elements: List[str] = [] if self.ranges else ["*/*"]
+
+        # Ranges are already sorted, and duplicates of a media range never decide:
+        seen: Set[str] = set()
+        for weighted_media_range in self.ranges:
+            if weighted_media_range._media_range not in seen:
+                seen.add(weighted_media_range._media_range)
+                elements.append(weighted_media_range._key)
+        if self.excluded:
+            elements.extend(
+                f"{media_range};q=0" for media_range in sorted(self.excluded)
+            )
+        return ",".join(elements)
+
+
+def parse_accept(accept_headers: List[str]) -> ParsedAccept:
+    """Parse and sort the accept headers.
+
+    Args:
+        accept_headers (List[str]): the accept headers.
+
+    Returns:
+        The parsed accept headers.
+
+    """
+    weighted_media_ranges = split_field_values(accept_headers)
+    weighted_media_ranges_sorted = prepare_weighted_media_ranges(weighted_media_ranges)
+
+    return ParsedAccept(
+        header=join_field_values(accept_headers),
+        # Remove weighted media-ranges with q=0.0:
+        ranges=tuple(
+            weighted_media_range
+            for weighted_media_range in weighted_media_ranges_sorted
+            if weighted_media_range.q != 0.0
+        ),
+        invalid=bool(len(weighted_media_ranges) and not weighted_media_ranges_sorted),
+        # Keep weighted media-ranges with q=0.0 apart, as exclusions:
+        excluded=frozenset(
+            weighted_media_range.media_range()
+            for weighted_media_range in weighted_media_ranges_sorted
+            if weighted_media_range.q == 0.0
+        ),
+    )
+
+
+def is_excluded(
+    media_type: str, excluded: AbstractSet[str], any_type: bool = False
+) -> bool:
+    """Return True if a media type matched by a wildcard is excluded.
+
+    A media type is excluded by a media range with a q-value of 0.0 that is more
+    specific than the wildcard, i.e. by the media type itself or, for a wildcard of
+    any type, by the "type/*" media range of its type.
+
+    Args:
+        media_type (str): the supported content type.
+        excluded (AbstractSet[str]): the media ranges with a q-value of 0.0.
+        any_type (bool): whether the wildcard matches any type, e.g. "*/*".
+
+    Returns:
+        True if the media type is excluded.
+
+    """
+    if not excluded:
+        return False
+    media_type = media_type.split(";")[0]
+    if media_type in excluded:
+        return True
+    return any_type and f"{media_type.split('/')[0]}/*" in excluded
+
+
 def get_default_content_type(
     supported_content_types: List[str], type: Optional[str] = None
 ) -> str:
@@ -153,6 +398,26 @@ def get_default_content_type(
     )
 
 
+def get_included_content_type(
+    supported_content_types: List[str],
+    type: Optional[str] = None,
+    excluded: AbstractSet[str] = frozenset(),
+) -> Optional[str]:
+    """Return the default content type that is not excluded, or None if all are."""
+    if not excluded:
+        return get_default_content_type(supported_content_types, type)
+
+    return next(
+        (
+            media_type
+            for media_type in supported_content_types
+            if (type is None or type == media_type.split("/")[0])
+            and not is_excluded(media_type, excluded, any_type=type is None)
+        ),
+        None,
+    )
+
+
 def is_media_range_type_in_supported_content_types(
     media_range_type: str, supported_content_types: List[str]
 ) -> bool:
@@ -163,14 +428,40 @@ def is_media_range_type_in_supported_content_types(
     )
 
 
+def get_wildcard_content_type(
+    weighted_media_range: WeightedMediaRange,
+    supported_content_types: List[str],
+    excluded: AbstractSet[str],
+) -> Optional[str]:
+    """Return the content type matched by a wildcard, unless it is excluded."""
+    if weighted_media_range.type == "*" and weighted_media_range.sub_type == "*":
+        return get_included_content_type(supported_content_types, excluded=excluded)
+    # Assumes valid mimetypes from `prepare_mime_types`
+    if weighted_media_range.sub_type == "*" and (
+        is_media_range_type_in_supported_content_types(
+            weighted_media_range.type,
+            supported_content_types,
+        )
+    ):
+        return get_included_content_type(
+            supported_content_types, type=weighted_media_range.type, excluded=excluded
+        )
+    return None
+
+
 def decide_content_type(
-    accept_headers: List[str], supported_content_types: List[str]
+    accept_headers: Union[List[str], ParsedAccept],
+    supported_content_types: List[str],
+    tracker: Optional[HeavyHittersTracker] = None,
 ) -> str:
     """Decide the content type based on the given accept header and supported content-types.
 
     Args:
-        accept_headers (List[str]): the accept headers.
+        accept_headers (Union[List[str], ParsedAccept]): the accept headers, or the
+            accept headers parsed by :func:`parse_accept`.
         supported_content_types (List[str]): List of supported content types.
+        tracker (Optional[HeavyHittersTracker]): tracker to record the accept
+            header with.
 
     Returns:
         The content type of the response.
@@ -179,8 +470,8 @@ def decide_content_type(
         NoAgreeableContentTypeError: If no agreeable content type is found.
 
     """
-    logging.debug(
-        f"Deciding content types {accept_headers} " f"against {supported_content_types}"
+    logger.debug(
+        "Deciding content types %s against %s", accept_headers, supported_content_types
     )
     # Checking corner cases:
     if len(supported_content_types) == 0:
@@ -188,48 +479,620 @@ def decide_content_type(
             "No supported content types or accept headers provided."
         )
 
-    # We need to parse and sort the accept headers:
-    weighted_media_ranges: List[str] = [
-        wmr for header in accept_headers for wmr in header.split(",")
-    ]
-    weighted_media_ranges_sorted = prepare_weighted_media_ranges(weighted_media_ranges)
+    # We need to parse and sort the accept headers, unless they are parsed already:
+    accept = (
+        accept_headers
+        if isinstance(accept_headers, ParsedAccept)
+        else parse_accept(accept_headers)
+    )
+    if tracker is not None:
+        tracker.record(accept.header)
 
     # If only invalid media ranges were given, return NoAgreeableContentTypeError:
-    if len(weighted_media_ranges) and not len(weighted_media_ranges_sorted):
+    if accept.invalid:
         raise NoAgreeableContentTypeError()
 
-    # Remove weighted media-ranges with q=0.0:
-    weighted_media_ranges_sorted = [
-        weighted_media_range
-        for weighted_media_range in weighted_media_ranges_sorted
-        if weighted_media_range.q != 0.0
-    ]
+    weighted_media_ranges_sorted = accept.ranges
 
-    # If the list of media-ranges accepted is empty, return the default content type:
+    # If the list of media-ranges accepted is empty, return the default content type
+    # that is not excluded:
     if len(weighted_media_ranges_sorted) == 0:
-        logging.debug("No media ranges provided. Returning default content-type.")
-        return get_default_content_type(supported_content_types)
+        logger.debug("No media ranges provided. Returning default content-type.")
+        content_type = (
+            None
+            if "*/*" in accept.excluded
+            else get_included_content_type(
+                supported_content_types, excluded=accept.excluded
+            )
+        )
+        if content_type is None:
+            raise NoAgreeableContentTypeError("No agreeable content type found.")
+        return content_type
 
     # If the list of media-ranges accepted is not empty, find the first one that is
-    # supported by the server:
+    # supported by the server, where wildcards do not match excluded media types:
     for weighted_media_range in weighted_media_ranges_sorted:
-        logging.debug(f"Checking weighted media range: {weighted_media_range}")
+        logger.debug("Checking weighted media range: %s", weighted_media_range)
         if weighted_media_range in supported_content_types:
             return weighted_media_range.media_range()
-        elif weighted_media_range.type == "*" and weighted_media_range.sub_type == "*":
-            return get_default_content_type(supported_content_types)
-        else:
-            # Assumes valid mimetypes from `prepare_mime_types`
-            if (
-                weighted_media_range.sub_type == "*"
-                and is_media_range_type_in_supported_content_types(
-                    weighted_media_range.type,
-                    supported_content_types,
-                )
-            ):
-                return get_default_content_type(
-                    supported_content_types, type=weighted_media_range.type
-                )
+        content_type = get_wildcard_content_type(
+            weighted_media_range, supported_content_types, accept.excluded
+        )
+        if content_type is not None:
+            return content_type
 
     # If no media-range is supported, raise NoAgreeableContentTypeError:
     raise NoAgreeableContentTypeError("No agreeable content type found.")
+
+
+def parse_server_quality(content_type: str) -> Tuple[str, float]:
+    """Split the server quality, the "qs" parameter, off a supported content type.
+
+    Args:
+        content_type (str): the supported content type, e.g. "text/html;qs=0.5".
+
+    Returns:
+        The content type without the "qs" parameter, and the server quality, which
+        defaults to 1.0.
+
+    Raises:
+        ValueError: If the server quality is not above 0.0 and at most 1.0.
+
+    """
+    if ";" not in content_type:
+        return content_type, 1.0
+
+    # The parameter name is case-insensitive, as the name of the q-value is:
+    parts = content_type.split(";")
+    qs = 1.0
+    parameters = []
+    for part in parts[1:]:
+        if part.strip(OWS)[:3].lower() == "qs=":
+            qs = float(part.split("=")[1])
+            if not 0.0 < qs <= 1.0:
+                raise ValueError(f"Invalid server quality: {content_type}")
+        else:
+            parameters.append(part)
+    return ";".join([parts[0], *parameters]), qs
+
+
+def structured_suffix_index(
+    supported_content_types: List[str],
+) -> Dict[str, List[str]]:
+    """Index the supported content types by structured syntax suffix.
+
+    Args:
+        supported_content_types (List[str]): List of supported content types.
+
+    Returns:
+        Mapping from the media ranges that a suffixed content type satisfies, e.g.
+        "application/*+json", "*/*+json" and "application/json", to the supported
+        content types that satisfy them, in order.
+
+    """
+    index: Dict[str, List[str]] = {}
+    for media_type in supported_content_types:
+        main_type, _, sub_type = media_type.partition("/")
+        if "+" not in sub_type:
+            continue
+        suffix = sub_type.rsplit("+", 1)[1]
+        for media_range in (
+            f"{main_type}/*+{suffix}",
+            f"*/*+{suffix}",
+            f"application/{suffix}",
+            *STRUCTURED_SUFFIX_BASE_TYPES.get(suffix, ()),
+        ):
+            index.setdefault(media_range, []).append(media_type)
+    return index
+
+
+@dataclass(frozen=True)
+class Negotiation:
+    """The outcome of a negotiation, with its response headers rendered up front.
+
+    The headers are (name, value) pairs of byte strings, as in ASGI, and are the
+    same objects for every request deciding the same content type.
+    """
+
+    #: The content type decided, or None if no content type is agreeable.
+    content_type: Optional[str]
+    #: The status code of the response, 200 or 406 (Not Acceptable).
+    status: int
+    #: The Content-Type, Vary and Link headers of the response.
+    headers: Tuple[Tuple[bytes, bytes], ...]
+    #: The body of a 406 response, listing the supported content types, or b"".
+    body: bytes = b""
+
+
+def content_type_header(content_type: str, charset: Optional[str] = "utf-8") -> str:
+    """Return the Content-Type header value of a content type.
+
+    Args:
+        content_type (str): the content type.
+        charset (Optional[str]): the charset of textual content types.
+
+    Returns:
+        The content type, with a charset parameter if it is a "text" type without
+        one.
+
+    """
+    if (
+        charset is not None
+        and content_type.startswith("text/")
+        and "charset=" not in content_type
+    ):
+        return f"{content_type}; charset={charset}"
+    return content_type
+
+
+def alternates_link_header(content_types: Iterable[str]) -> str:
+    """Return the Link header value listing the alternate content types.
+
+    Args:
+        content_types (Iterable[str]): the alternate content types.
+
+    Returns:
+        The Link header value, with a rel="alternate" link to the same resource per
+        content type.
+
+    """
+    return ", ".join(
+        '<>; rel="alternate"; type="%s"' % content_type
+        for content_type in content_types
+    )
+
+
+class ContentNegotiator(Freezable):
+    """Negotiator compiled once for a list of supported content types.
+
+    The supported content types are indexed when the negotiator is constructed, so
+    that deciding a content type is a dict lookup per media range instead of a scan
+    of the supported content types. The decisions are the same as those of
+    :func:`decide_content_type`.
+
+    With `structured_suffixes`, media ranges are also matched by structured syntax
+    suffix (RFC 6839): "application/*+json" and "*/*+json" match the first supported
+    "+json" type of the given type or of any type, and "application/json" matches
+    the first supported "+json" type when "application/json" itself is not
+    supported. The suffix index is built with the rest of the index.
+
+    Supported content types may carry a server quality, Apache-style, as a "qs"
+    parameter, e.g. "application/rdf+xml;qs=0.5" for a format that is costly to
+    serve. The content type with the highest product of the client's q-value and the
+    server quality is then decided, and on equal products the client's preference
+    decides. Without server qualities the products are never computed.
+
+    The decisions for a list of known accept headers, by default
+    :data:`KNOWN_ACCEPT_HEADERS`, are made when the negotiator is constructed and
+    kept in a read-only table, which is consulted before any parsing.
+
+    Example:
+        >>> negotiator = ContentNegotiator(["text/turtle", "application/ld+json"])
+        >>> negotiator.decide(["application/*;q=0.9, text/plain"])
+        'application/ld+json'
+        >>> negotiator = ContentNegotiator(["application/rdf+xml;qs=0.5", "text/turtle"])
+        >>> negotiator.decide(["*/*"])
+        'text/turtle'
+    """
+
+    supported_content_types: List[str]
+    server_qualities: Mapping[str, float]
+    decisions: Mapping[str, Optional[str]]
+    tracker: Optional[HeavyHittersTracker]
+    cache: Optional["SharedDecisionCache"]
+
+    def __init__(
+        self,
+        supported_content_types: List[str],
+        known_headers: Iterable[str] = KNOWN_ACCEPT_HEADERS,
+        structured_suffixes: bool = False,
+        tracker: Optional[HeavyHittersTracker] = None,
+        cache: Optional["SharedDecisionCache"] = None,
+        charset: Optional[str] = "utf-8",
+    ) -> None:
+        """Compile the supported content types.
+
+        Args:
+            supported_content_types (List[str]): List of supported content types,
+                optionally with a "qs" parameter.
+            known_headers (Iterable[str]): accept headers to decide up front.
+            structured_suffixes (bool): match media ranges by structured syntax
+                suffix.
+            tracker (Optional[HeavyHittersTracker]): tracker to record the accept
+                header of every decision with.
+            cache (Optional[SharedDecisionCache]): cache of decisions, shared with
+                other processes, to consult before parsing.
+            charset (Optional[str]): the charset of textual content types, in the
+                Content-Type headers rendered by :meth:`negotiate`.
+
+        """
+        server_qualities = dict(
+            parse_server_quality(media_type) for media_type in supported_content_types
+        )
+        self.supported_content_types = list(server_qualities)
+        self.server_qualities = MappingProxyType(server_qualities)
+        self._max_server_quality = max(server_qualities.values(), default=1.0)
+        self._scored = any(qs != 1.0 for qs in server_qualities.values())
+        self.structured_suffixes = structured_suffixes
+        self.tracker = tracker
+        self.cache = cache
+        if cache is not None:
+            cache.bind(
+                [*supported_content_types, f"structured_suffixes={structured_suffixes}"]
+            )
+
+        # Index of the supported content types matching each media range, in order:
+        candidates: Dict[str, List[str]] = (
+            structured_suffix_index(self.supported_content_types)
+            if structured_suffixes
+            else {}
+        )
+        for media_type in self.supported_content_types:
+            candidates.setdefault(f"{media_type.split('/')[0]}/*", []).append(
+                media_type
+            )
+        if len(self.supported_content_types):
+            candidates["*/*"] = self.supported_content_types
+        # Supported content types take precedence:
+        for media_type in self.supported_content_types:
+            candidates[media_type] = [media_type]
+        self._candidates: Dict[str, Tuple[str, ...]] = {
+            media_range: tuple(media_types)
+            for media_range, media_types in candidates.items()
+        }
+        # Index of the content type to return for each media range:
+        self._matches: Dict[str, str] = {
+            media_range: media_types[0]
+            for media_range, media_types in candidates.items()
+        }
+
+        # Decide the known headers, where None means no agreeable content type:
+        decisions: Dict[str, Optional[str]] = {}
+        if len(self.supported_content_types):
+            for header in known_headers:
+                try:
+                    decisions[header] = self._negotiate([header])
+                except NoAgreeableContentTypeError:
+                    decisions[header] = None
+        self.decisions = MappingProxyType(decisions)
+
+        self._charset = charset
+
+    @cached_property
+    def _negotiations(self) -> Mapping[Optional[str], Negotiation]:
+        """The negotiation of every supported content type, and None for the 406."""
+        vary = (b"vary", b"Accept")
+        negotiations: Dict[Optional[str], Negotiation] = {}
+        for content_type in self.supported_content_types:
+            headers = [
+                (
+                    b"content-type",
+                    content_type_header(content_type, self._charset).encode("latin-1"),
+                ),
+                vary,
+            ]
+            alternates = [t for t in self.supported_content_types if t != content_type]
+            if alternates:
+                alternates_link = alternates_link_header(alternates)
+                headers.append((b"link", alternates_link.encode("latin-1")))
+            negotiations[content_type] = Negotiation(
+                content_type=content_type, status=200, headers=tuple(headers)
+            )
+
+        headers = [(b"content-type", b"text/plain; charset=utf-8"), vary]
+        if self.supported_content_types:
+            supported_link = alternates_link_header(self.supported_content_types)
+            headers.append((b"link", supported_link.encode("latin-1")))
+        body = "Not Acceptable. Supported content types:\n" + "".join(
+            f"{content_type}\n" for content_type in self.supported_content_types
+        )
+        negotiations[None] = Negotiation(
+            content_type=None,
+            status=406,
+            headers=tuple(headers),
+            body=body.encode("utf-8"),
+        )
+        return MappingProxyType(negotiations)
+
+    @property
+    def not_acceptable(self) -> Negotiation:
+        """The negotiation of a 406 response, listing the supported content types."""
+        return self._negotiations[None]
+
+    def freeze(self) -> "ContentNegotiator":
+        """Render the negotiations, and make the negotiator immutable.
+
+        The negotiations are rendered before freezing, so that forked worker
+        processes share them with the negotiator.
+
+        Returns:
+            The negotiator.
+
+        """
+        self._negotiations  # noqa: B018
+        return super().freeze()
+
+    def negotiate(self, accept_headers: Union[List[str], ParsedAccept]) -> Negotiation:
+        """Decide the content type, and return it with its response headers.
+
+        The response headers, and the body of a 406 response, are rendered on the
+        first negotiation, or when the negotiator is frozen, so negotiating builds
+        no strings.
+
+        Example:
+            >>> negotiation = negotiator.negotiate(request.headers.getlist("Accept"))
+            >>> return Response(
+            >>>     negotiation.body or render(negotiation.content_type),
+            >>>     status=negotiation.status,
+            >>>     headers=negotiation.headers,
+            >>> )
+
+        Args:
+            accept_headers (Union[List[str], ParsedAccept]): the accept headers, or
+                the accept headers parsed by :func:`parse_accept`.
+
+        Returns:
+            The negotiation of the decided content type, or the 406 negotiation if
+            no content type is agreeable.
+
+        """
+        try:
+            return self._negotiations[self.decide(accept_headers)]
+        except NoAgreeableContentTypeError:
+            return self._negotiations[None]
+
+    def decide(self, accept_headers: Union[List[str], ParsedAccept]) -> str:
+        """Decide the content type based on the given accept headers.
+
+        Args:
+            accept_headers (Union[List[str], ParsedAccept]): the accept headers, or
+                the accept headers parsed by :func:`parse_accept`.
+
+        Returns:
+            The content type of the response.
+
+        Raises:
+            NoAgreeableContentTypeError: If no agreeable content type is found.
+
+        """
+        header = (
+            accept_headers.header
+            if isinstance(accept_headers, ParsedAccept)
+            else join_field_values(accept_headers)
+        )
+        if self.tracker is not None:
+            self.tracker.record(header)
+        if header is not None and header in self.decisions:
+            content_type = self.decisions[header]
+            if content_type is None:
+                raise NoAgreeableContentTypeError("No agreeable content type found.")
+            return content_type
+        if self.cache is not None and header is not None:
+            return self._decide_cached(self.cache, header, accept_headers)
+        return self._negotiate(accept_headers)
+
+    def _decide_cached(
+        self,
+        cache: "SharedDecisionCache",
+        header: str,
+        accept_headers: Union[List[str], ParsedAccept],
+    ) -> str:
+        """Decide the content type through the shared decision cache."""
+        # The header as sent is looked up before parsing, and on a miss, equivalent
+        # accept headers share one decision by their canonical key:
+        index = cache.lookup(header)
+        if index is None:
+            accept = (
+                accept_headers
+                if isinstance(accept_headers, ParsedAccept)
+                else parse_accept(accept_headers)
+            )
+            key = accept.key
+            index = cache.lookup(key)
+            if index is None:
+                try:
+                    index = self.supported_content_types.index(self._negotiate(accept))
+                except NoAgreeableContentTypeError:
+                    index = NO_AGREEABLE_CONTENT_TYPE
+                cache.store(key, index)
+            if header != key:
+                cache.store(header, index)
+
+        if index == NO_AGREEABLE_CONTENT_TYPE:
+            raise NoAgreeableContentTypeError("No agreeable content type found.")
+        return self.supported_content_types[index]
+
+    def iter_content_types(
+        self, accept_headers: Union[List[str], ParsedAccept]
+    ) -> Iterator[str]:
+        """Yield the acceptable content types in order of preference.
+
+        The accept headers are parsed once, and the supported content types are
+        yielded lazily, so that falling back to the next content type, e.g. when
+        serialization fails, does not negotiate again. The first content type
+        yielded is the one returned by :meth:`decide`.
+
+        Args:
+            accept_headers (Union[List[str], ParsedAccept]): the accept headers, or
+                the accept headers parsed by :func:`parse_accept`.
+
+        Yields:
+            The acceptable supported content types, each once.
+
+        """
+        if not self._scored:
+            for content_type, _ in self._iter_weighted(accept_headers):
+                yield content_type
+            return
+
+        # Order by the products of q-values and server qualities, which are only
+        # known once every acceptable content type is:
+        weighted = list(self._iter_weighted(accept_headers))
+        weighted.sort(key=lambda w: w[1] * self.server_qualities[w[0]], reverse=True)
+        for content_type, _ in weighted:
+            yield content_type
+
+    def _iter_weighted(
+        self, accept_headers: Union[List[str], ParsedAccept]
+    ) -> Iterator[Tuple[str, float]]:
+        """Yield the acceptable content types, and their q-values, in client order."""
+        if len(self.supported_content_types) == 0:
+            return
+
+        accept = (
+            accept_headers
+            if isinstance(accept_headers, ParsedAccept)
+            else parse_accept(accept_headers)
+        )
+
+        yielded: Set[str] = set()
+        for weighted_media_range in accept.ranges:
+            media_range = weighted_media_range.media_range()
+            for content_type in self._candidates.get(media_range, ()):
+                if content_type not in yielded and (
+                    content_type == media_range
+                    or not is_excluded(
+                        content_type, accept.excluded, media_range.startswith("*/")
+                    )
+                ):
+                    yielded.add(content_type)
+                    yield content_type, weighted_media_range.q
+
+        # If no media-ranges are accepted, every content type that is not excluded
+        # is acceptable, unless only invalid media ranges were given:
+        if not accept.ranges and not accept.invalid and "*/*" not in accept.excluded:
+            for content_type in self.supported_content_types:
+                if not is_excluded(content_type, accept.excluded, any_type=True):
+                    yield content_type, 1.0
+
+    def _negotiate_scored(self, accept_headers: Union[List[str], ParsedAccept]) -> str:
+        """Decide the content type by q-values and server qualities."""
+        content_type: Optional[str] = None
+        score = 0.0
+        for candidate, q in self._iter_weighted(accept_headers):
+            # q-values only decrease, so no later candidate can score higher:
+            if q * self._max_server_quality <= score:
+                break
+            candidate_score = q * self.server_qualities[candidate]
+            if candidate_score > score:
+                content_type, score = candidate, candidate_score
+
+        if content_type is None:
+            raise NoAgreeableContentTypeError("No agreeable content type found.")
+        return content_type
+
+    def _negotiate(self, accept_headers: Union[List[str], ParsedAccept]) -> str:
+        """Decide the content type by parsing the accept headers."""
+        if len(self.supported_content_types) == 0:
+            raise NoAgreeableContentTypeError(
+                "No supported content types or accept headers provided."
+            )
+        if self._scored:
+            return self._negotiate_scored(accept_headers)
+
+        accept = (
+            accept_headers
+            if isinstance(accept_headers, ParsedAccept)
+            else parse_accept(accept_headers)
+        )
+
+        # If only invalid media ranges were given, return NoAgreeableContentTypeError:
+        if accept.invalid:
+            raise NoAgreeableContentTypeError()
+
+        # Wildcards must skip the excluded media types, so take the candidates:
+        if accept.excluded:
+            for content_type, _ in self._iter_weighted(accept):
+                return content_type
+            raise NoAgreeableContentTypeError("No agreeable content type found.")
+
+        # If no media-ranges are accepted, return the default content type:
+        if not accept.ranges:
+            return self.supported_content_types[0]
+
+        for weighted_media_range in accept.ranges:
+            match = self._matches.get(weighted_media_range.media_range())
+            if match is not None:
+                return match
+
+        raise NoAgreeableContentTypeError("No agreeable content type found.")
+
+
+def _matched_content_types(
+    weighted_media_range: WeightedMediaRange,
+    supported_content_types: List[str],
+    excluded: AbstractSet[str],
+) -> Iterator[str]:
+    """Yield the content types a media range matches, as decide_content_type does."""
+    if weighted_media_range in supported_content_types:
+        yield weighted_media_range.media_range()
+    if weighted_media_range.sub_type != "*":
+        return
+    any_type = weighted_media_range.type == "*"
+    for media_type in supported_content_types:
+        if (
+            any_type or weighted_media_range.type == media_type.split("/")[0]
+        ) and not is_excluded(media_type, excluded, any_type):
+            yield media_type
+
+
+def iter_content_types(
+    accept_headers: Union[List[str], ParsedAccept], supported_content_types: List[str]
+) -> Iterator[str]:
+    """Yield the acceptable content types in order of preference.
+
+    The first content type yielded is the one returned by
+    :func:`decide_content_type`, and like it, the supported content types are
+    matched as they are, without server qualities. To order by server qualities,
+    or to negotiate against the same supported content types repeatedly, use
+    :meth:`ContentNegotiator.iter_content_types` instead.
+
+    Example:
+        >>> for content_type in iter_content_types(
+        >>>     ["application/rdf+xml, */*;q=0.5"], supported_content_types
+        >>> ):
+        >>>     try:
+        >>>         return serialize(graph, content_type)
+        >>>     except SerializationError:
+        >>>         continue  # fall back to the next content type
+
+    Args:
+        accept_headers (Union[List[str], ParsedAccept]): the accept headers, or the
+            accept headers parsed by :func:`parse_accept`.
+        supported_content_types (List[str]): List of supported content types.
+
+    Yields:
+        The acceptable supported content types, each once.
+
+    """
+    if len(supported_content_types) == 0:
+        return
+    accept = (
+        accept_headers
+        if isinstance(accept_headers, ParsedAccept)
+        else parse_accept(accept_headers)
+    )
+
+    # If no media ranges are accepted, every content type that is not excluded is
+    # acceptable, unless only invalid media ranges were given:
+    candidates: Iterable[str] = ()
+    if accept.ranges:
+        candidates = (
+            content_type
+            for weighted_media_range in accept.ranges
+            for content_type in _matched_content_types(
+                weighted_media_range, supported_content_types, accept.excluded
+            )
+        )
+    elif not accept.invalid and "*/*" not in accept.excluded:
+        candidates = (
+            content_type
+            for content_type in supported_content_types
+            if not is_excluded(content_type, accept.excluded, any_type=True)
+        )
+
+    yielded: Set[str] = set()
+    for content_type in candidates:
+        if content_type not in yielded:
+            yielded.add(content_type)
+            yield content_type
@@ -0,0 +1,269 @@
+"""Module for exporting decision tables to edge and proxy layers.
+
+A decision table maps the headers of a corpus, e.g. the most frequent headers
+found by a :class:`~content_negotiation.HeavyHittersTracker`, and their canonical
+keys, to the decided content type or language. Exported as an nginx ``map``, the
+table lets the proxy answer the common requests without reaching the workers;
+exported as JSON, it may be loaded by e.g. Varnish, or verified against the
+library later on, e.g. after an upgrade.
+
+Example:
+    >>> from content_negotiation.export import compile_table, to_nginx_map, verify
+    >>>
+    >>> table = compile_table(
+    >>>     "content_type", ["text/turtle", "application/ld+json"], tracker.top_headers()
+    >>> )
+    >>> with open("/etc/nginx/conf.d/accept.map", "w") as f:
+    >>>     f.write(to_nginx_map(table))
+    >>> assert not verify(table)
+"""
+
+from dataclasses import dataclass
+import json
+import string
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .content_negotiation import (
+    ContentNegotiator,
+    NoAgreeableContentTypeError,
+    parse_accept,
+)
+from .language_negotiation import (
+    LanguageNegotiator,
+    NoAgreeableLanguageError,
+    parse_accept_language,
+)
+
+# Kinds of decision tables, and the header each is decided on:
+KINDS: Mapping[str, str] = MappingProxyType(
+    {"content_type": "Accept", "language": "Accept-Language"}
+)
+
+# Parameters of the nginx map directive, which a source value must not be taken for:
+_NGINX_SPECIAL = ("default", "hostnames", "include", "volatile")
+# The nginx map directive matches source values ignoring ASCII case:
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+@dataclass(frozen=True)
+class DecisionTable:
+    """Decisions for a corpus of headers, against a list of supported variants."""
+
+    #: "content_type" or "language".
+    kind: str
+    #: The supported content types or languages.
+    supported: Tuple[str, ...]
+    #: Whether media ranges were matched by structured syntax suffix.
+    structured_suffixes: bool
+    #: The decided variant, or None if none is agreeable, by header.
+    decisions: Mapping[str, Optional[str]]
+
+
+def _decider(
+    kind: str, supported: Iterable[str], structured_suffixes: bool
+) -> Callable[[str], Tuple[str, Optional[str]]]:
+    """Return a function deciding a header, and returning its key and decision."""
+    if kind == "content_type":
+        content_negotiator = ContentNegotiator(
+            list(supported), known_headers=(), structured_suffixes=structured_suffixes
+        )
+
+        def _decide_content_type(header: str) -> Tuple[str, Optional[str]]:
+            accept = parse_accept([header])
+            try:
+                return accept.key, content_negotiator.decide(accept)
+            except NoAgreeableContentTypeError:
+                return accept.key, None
+
+        return _decide_content_type
+
+    language_negotiator = LanguageNegotiator(list(supported), known_headers=())
+
+    def _decide_language(header: str) -> Tuple[str, Optional[str]]:
+        accept_language = parse_accept_language([header])
+        try:
+            return accept_language.key, language_negotiator.decide(accept_language)
+        except NoAgreeableLanguageError:
+            return accept_language.key, None
+
+    return _decide_language
+
+
+def compile_table(
+    kind: str,
+    supported: Iterable[str],
+    headers: Iterable[str],
+    structured_suffixes: bool = False,
+) -> DecisionTable:
+    """Decide a corpus of headers, and their canonical keys, into a table.
+
+    Args:
+        kind (str): "content_type" to decide accept headers, or "language" to
+            decide accept-language headers.
+        supported (Iterable[str]): the supported content types or languages.
+        headers (Iterable[str]): the corpus of headers, each as sent.
+        structured_suffixes (bool): match media ranges by structured syntax suffix.
+
+    Returns:
+        The decision table.
+
+    Raises:
+        ValueError: If the kind is unknown.
+
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Unknown kind of decision table: {kind!r}")
+    supported = tuple(supported)
+    decide = _decider(kind, supported, structured_suffixes)
+    decisions: Dict[str, Optional[str]] = {}
+    for header in headers:
+        if header in decisions:
+            continue
+        try:
+            key, decision = decide(header)
+        except ValueError:
+            continue  # leave invalid headers to the workers
+        decisions[header] = decision
+        decisions.setdefault(key, decision)
+    return DecisionTable(
+        kind=kind,
+        supported=supported,
+        structured_suffixes=structured_suffixes,
+        decisions=MappingProxyType(decisions),
+    )
+
+
+def verify(table: DecisionTable) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+    """Replay a decision table against the library.
+
+    Args:
+        table (DecisionTable): the decision table, e.g. loaded by :func:`from_json`.
+
+    Returns:
+        The decision in the table, and the decision of the library, by header, for
+        the headers where they differ. Empty if the table is correct.
+
+    """
+    decide = _decider(table.kind, table.supported, table.structured_suffixes)
+    mismatches: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+    for header, expected in table.decisions.items():
+        try:
+            _, decision = decide(header)
+        except ValueError:
+            decision = None  # the library no longer decides the header
+        if decision != expected:
+            mismatches[header] = (expected, decision)
+    return mismatches
+
+
+def to_json(table: DecisionTable) -> str:
+    """Return a decision table as JSON.
+
+    Args:
+        table (DecisionTable): the decision table.
+
+    Returns:
+        The JSON object, where no agreeable variant is null.
+
+    """
+    return json.dumps(
+        {
+            "kind": table.kind,
+            "supported": list(table.supported),
+            "structured_suffixes": table.structured_suffixes,
+            "decisions": dict(table.decisions),
+        },
+        indent=2,
+    )
+
+
+def from_json(text: str) -> DecisionTable:
+    """Load a decision table from JSON, as written by :func:`to_json`.
+
+    Args:
+        text (str): the JSON object.
+
+    Returns:
+        The decision table.
+
+    Raises:
+        ValueError: If the JSON object is not a decision table.
+
+    """
+    data: Any = json.loads(text)
+    try:
+        table = DecisionTable(
+            kind=data["kind"],
+            supported=tuple(data["supported"]),
+            structured_suffixes=bool(data.get("structured_suffixes", False)),
+            decisions=MappingProxyType(dict(data["decisions"])),
+        )
+    except (AttributeError, KeyError, TypeError) as e:
+        raise ValueError(f"Not a decision table: {e}") from e
+    if table.kind not in KINDS:
+        raise ValueError(f"Unknown kind of decision table: {table.kind!r}")
+    return table
+
+
+def _nginx_string(value: str) -> str:
+    """Return a value as a quoted nginx string."""
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _case_insensitive(decisions: Mapping[str, Optional[str]]) -> Dict[str, str]:
+    """Return the agreeable decisions nginx can tell apart, ignoring case."""
+    # Headers equal but for case are kept as the first of them, if all of them
+    # decide the same variant, and left out otherwise:
+    variants: Dict[str, List[Optional[str]]] = {}
+    first: Dict[str, str] = {}
+    for header, decision in decisions.items():
+        folded = header.translate(_ASCII_LOWER)
+        variants.setdefault(folded, []).append(decision)
+        first.setdefault(folded, header)
+    return {
+        first[folded]: decided[0]
+        for folded, decided in variants.items()
+        if decided[0] is not None and decided.count(decided[0]) == len(decided)
+    }
+
+
+def to_nginx_map(
+    table: DecisionTable,
+    source: Optional[str] = None,
+    variable: Optional[str] = None,
+) -> str:
+    """Return a decision table as an nginx map block.
+
+    Headers without an agreeable variant are left out, so that they map to the
+    default, an empty string, and are passed on to the workers like any header
+    missing from the table. nginx matches headers ignoring case, where the library
+    does not: headers of the table equal but for case are left out too, unless
+    they all decide the same variant, and a header missing from the table is
+    answered by the header of the table it equals but for case.
+
+    Args:
+        table (DecisionTable): the decision table.
+        source (Optional[str]): the variable to map, by default "$http_accept" or
+            "$http_accept_language".
+        variable (Optional[str]): the variable to set, by default
+            "$negotiated_content_type" or "$negotiated_language".
+
+    Returns:
+        The map block.
+
+    """
+    if source is None:
+        source = "$http_" + KINDS[table.kind].lower().replace("-", "_")
+    if variable is None:
+        variable = f"$negotiated_{table.kind}"
+
+    lines: List[str] = [f"map {source} {variable} {{", '    default "";']
+    for header, decision in _case_insensitive(table.decisions).items():
+        quoted = _nginx_string(header)
+        # A source value starting with "~" would be taken for a regular expression:
+        if header.startswith("~") or header in _NGINX_SPECIAL:
+            quoted = '"\\' + quoted[1:]
+        lines.append(f"    {quoted} {_nginx_string(decision)};")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
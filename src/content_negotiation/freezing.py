@@ -0,0 +1,96 @@
+"""Module for freezing and pickling compiled negotiators.
+
+A frozen negotiator holds tuples and read-only mappings only, which the garbage
+collector stops tracking once they hold no containers, and refuses to be modified,
+so that it may be shared safely, e.g. between routes.
+
+Example:
+    >>> negotiator = ContentNegotiator(supported_content_types).freeze()
+
+A prefork server, e.g. gunicorn with ``preload_app``, shares the memory pages of
+the negotiators compiled in the master process with the workers copy-on-write,
+until the garbage collector of a worker writes to the objects on them. It is
+``gc.freeze()``, once everything is compiled and before forking, that keeps the
+pages shared; freezing the negotiators keeps no measurably more of them shared.
+
+Compiled negotiators may also be pickled, to be compiled once, e.g. at build time,
+and loaded without compiling them again. The tracker and the shared decision cache
+are bound to the process and are not pickled.
+"""
+
+from types import MappingProxyType
+from typing import Any, Dict, Tuple, TypeVar
+
+_Freezable = TypeVar("_Freezable", bound="Freezable")
+
+# Attributes bound to the process, which are not pickled:
+_PROCESS_BOUND = ("tracker", "cache")
+
+
+def _immutable(value: Any) -> Any:
+    """Return an immutable view of a list or dict, or the value itself."""
+    if isinstance(value, list):
+        return tuple(value)
+    if isinstance(value, dict):
+        return MappingProxyType(value)
+    return value
+
+
+class Freezable:
+    """Mixin of compiled negotiators that may be frozen and pickled."""
+
+    _frozen: bool = False
+
+    def freeze(self: _Freezable) -> _Freezable:
+        """Make the negotiator immutable, e.g. before sharing it between routes.
+
+        Lists are replaced by tuples and dicts by read-only mappings, and setting or
+        deleting an attribute raises AttributeError from then on.
+
+        Returns:
+            The negotiator.
+
+        """
+        for name, value in list(vars(self).items()):
+            object.__setattr__(self, name, _immutable(value))
+        object.__setattr__(self, "_frozen", True)
+        return self
+
+    @property
+    def frozen(self) -> bool:
+        """Whether the negotiator is frozen."""
+        return self._frozen
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Refuse to modify a frozen negotiator."""
+        if self._frozen:
+            raise AttributeError(f"{type(self).__name__} is frozen")
+        object.__setattr__(self, name, value)
+
+    def __delattr__(self, name: str) -> None:
+        """Refuse to modify a frozen negotiator."""
+        if self._frozen:
+            raise AttributeError(f"{type(self).__name__} is frozen")
+        object.__delattr__(self, name)
+
+    def __getstate__(self) -> Tuple[Dict[str, Any], Tuple[str, ...]]:
+        """Return the compiled state, without the attributes bound to the process."""
+        state: Dict[str, Any] = {}
+        read_only = []
+        for name, value in vars(self).items():
+            if name in _PROCESS_BOUND:
+                value = None
+            elif isinstance(value, MappingProxyType):
+                # Read-only mappings are not picklable, the dicts behind them are:
+                read_only.append(name)
+                value = value.copy()
+            state[name] = value
+        return state, tuple(read_only)
+
+    def __setstate__(self, state: Tuple[Dict[str, Any], Tuple[str, ...]]) -> None:
+        """Restore the compiled state."""
+        attributes, read_only = state
+        for name, value in attributes.items():
+            if name in read_only:
+                value = MappingProxyType(value)
+            object.__setattr__(self, name, value)
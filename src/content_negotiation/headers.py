@@ -0,0 +1,79 @@
+"""Module for tokenizing the values of header fields."""
+
+from typing import Iterable, List, Optional, Sequence
+
+# Optional whitespace (RFC 7230, section 3.2.3):
+OWS = " \t"
+
+
+def join_field_values(field_values: Sequence[str]) -> Optional[str]:
+    """Join the values of a header field into one value.
+
+    A header field sent several times is equivalent to one field with the values
+    joined by commas (RFC 7230, section 3.2.2).
+
+    Args:
+        field_values (Sequence[str]): the values of the header field.
+
+    Returns:
+        The joined value, or None if the header field was not sent at all, which is
+        not the same as a header field with an empty value.
+
+    """
+    if len(field_values) == 0:
+        return None
+    if len(field_values) == 1:
+        return field_values[0]
+    return ",".join(field_values)
+
+
+def split_field_values(field_values: Iterable[str]) -> List[str]:
+    """Split the values of a header field into its list elements.
+
+    Optional whitespace around the elements is removed, while empty elements are
+    kept.
+
+    Args:
+        field_values (Iterable[str]): the values of the header field.
+
+    Returns:
+        The list elements, e.g. weighted media ranges.
+
+    """
+    return [
+        element.strip(OWS)
+        for field_value in field_values
+        for element in field_value.split(",")
+    ]
+
+
+def parse_quality(parameters: Iterable[str]) -> float:
+    """Return the q-value among the parameters of a range.
+
+    The parameter name is case-insensitive, optional whitespace around the
+    parameters is ignored, and the q-value is clamped to the range 0.0 to 1.0.
+
+    Args:
+        parameters (Iterable[str]): the parameters of the range, e.g. ["q=0.5"].
+
+    Returns:
+        The q-value, or 1.0 if there is none.
+
+    Raises:
+        ValueError: If the q-value is not a number.
+
+    """
+    q = 1.0
+    for parameter in parameters:
+        parameter = parameter.strip(OWS)
+        if parameter[:2] in ("q=", "Q="):
+            # RFC specifies only 3 decimals may be used in q value. Must strip
+            # additional decimals so that q bonus from specificity results in
+            # correct sorting.
+            q = float(parameter.split("=")[1][0:5])
+            if q != q:
+                raise ValueError(f"Invalid q-value: {parameter}")
+            # Check if q value is valid and adjust accordingly:
+            q = 1.0 if q > 1.0 else q
+            q = 0.0 if q < 0.0 else q
+    return q
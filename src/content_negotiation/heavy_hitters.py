@@ -0,0 +1,161 @@
+"""Module for tracking the most frequent headers in fixed memory.
+
+A :class:`HeavyHittersTracker` estimates how often each header is seen with a
+count-min sketch, and keeps the headers with the highest estimates in a bounded
+top-k heap. Recording a header costs the same regardless of the traffic seen, and
+the memory used is fixed when the tracker is constructed.
+
+Example:
+    >>> from content_negotiation import ContentNegotiator, HeavyHittersTracker
+    >>>
+    >>> tracker = HeavyHittersTracker()
+    >>> negotiator = ContentNegotiator(supported_content_types, tracker=tracker)
+    >>> # ... serve traffic, then compile the dominant headers up front:
+    >>> negotiator = ContentNegotiator(
+    >>>     supported_content_types, known_headers=tracker.top_headers()
+    >>> )
+"""
+
+import heapq
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+
+class HeavyHittersTracker:
+    """Tracker of the most frequent headers, with a count-min sketch and a top-k heap.
+
+    The estimated count of a header is never lower than its true count, and exceeds
+    it by at most ``2 / width`` of the headers recorded, with a probability of at
+    least ``1 - 0.5 ** depth``. The tracker is thread-safe.
+    """
+
+    width: int
+    depth: int
+    size: int
+    total: int
+
+    def __init__(self, width: int = 2048, depth: int = 4, size: int = 32) -> None:
+        """Allocate the sketch and the heap.
+
+        Args:
+            width (int): counters per row of the sketch.
+            depth (int): rows of the sketch.
+            size (int): number of headers to keep track of, the k of top-k.
+
+        Raises:
+            ValueError: If width, depth or size is not positive.
+
+        """
+        if width < 1 or depth < 1 or size < 1:
+            raise ValueError("Width, depth and size must be positive.")
+        self.width = width
+        self.depth = depth
+        self.size = size
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget every header recorded."""
+        with self._lock:
+            self._clear()
+
+    def _clear(self) -> None:
+        """Forget every header recorded, with the lock held."""
+        self.total = 0
+        self._rows: List[List[int]] = [[0] * self.width for _ in range(self.depth)]
+        # The tracked headers, and their estimates:
+        self._top: Dict[str, int] = {}
+        # Min-heap of the tracked headers, where estimates may be out of date:
+        self._heap: List[Tuple[int, str]] = []
+
+    def record(self, header: Optional[str]) -> None:
+        """Record one occurrence of a header.
+
+        Args:
+            header (Optional[str]): the comma-joined header, or None if the header
+                was not sent, which is not recorded.
+
+        """
+        if header is None:
+            return
+
+        # Derive the counter of every row from one hash, by double hashing:
+        h = hash(header)
+        step = (h >> 32) | 1
+        with self._lock:
+            self.total += 1
+            estimate = self.total
+            for i, row in enumerate(self._rows):
+                index = (h + i * step) % self.width
+                row[index] += 1
+                estimate = min(estimate, row[index])
+            self._track(header, estimate)
+
+    def _track(self, header: str, estimate: int) -> None:
+        """Keep the header among the top headers, if its estimate is high enough."""
+        if header in self._top:
+            # The heap entry is refreshed when it reaches the top of the heap:
+            self._top[header] = estimate
+            return
+
+        if len(self._top) < self.size:
+            self._top[header] = estimate
+            heapq.heappush(self._heap, (estimate, header))
+            return
+
+        # Estimates only grow, so refresh out of date entries until the least
+        # tracked estimate is at the top of the heap:
+        while self._heap[0][0] != self._top[self._heap[0][1]]:
+            _, stale = self._heap[0]
+            heapq.heapreplace(self._heap, (self._top[stale], stale))
+
+        if estimate > self._heap[0][0]:
+            _, evicted = heapq.heapreplace(self._heap, (estimate, header))
+            del self._top[evicted]
+            self._top[header] = estimate
+
+    def estimate(self, header: str) -> int:
+        """Return the estimated count of a header.
+
+        Args:
+            header (str): the comma-joined header.
+
+        Returns:
+            The estimated count, which is never lower than the true count.
+
+        """
+        h = hash(header)
+        step = (h >> 32) | 1
+        with self._lock:
+            return min(
+                row[(h + i * step) % self.width] for i, row in enumerate(self._rows)
+            )
+
+    def snapshot(self, reset: bool = False) -> List[Tuple[str, int]]:
+        """Return the tracked headers and their estimated counts, most frequent first.
+
+        Args:
+            reset (bool): whether to forget every header recorded, in the same step,
+                so that no header recorded in between is lost.
+
+        Returns:
+            The tracked headers and their estimated counts.
+
+        """
+        with self._lock:
+            top = sorted(self._top.items(), key=lambda item: item[1], reverse=True)
+            if reset:
+                self._clear()
+            return top
+
+    def top_headers(self, n: Optional[int] = None) -> Tuple[str, ...]:
+        """Return the most frequent headers, e.g. to pass as known headers.
+
+        Args:
+            n (Optional[int]): the number of headers, by default every tracked one.
+
+        Returns:
+            The most frequent headers, most frequent first.
+
+        """
+        return tuple(header for header, _ in self.snapshot()[:n])
@@ -15,9 +15,51 @@ Example:
     'nb-NO'
 """
 
+from dataclasses import dataclass
 from enum import Enum
+from functools import cached_property, lru_cache
 import logging
-from typing import Any, List
+from types import MappingProxyType
+from typing import (
+    AbstractSet,
+    Any,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+from .freezing import Freezable
+from .headers import join_field_values, OWS, parse_quality, split_field_values
+from .heavy_hitters import HeavyHittersTracker
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on the number of interned language ranges:
+LANGUAGE_INTERN_SIZE = 1024
+
+
+# Accept-language headers sent by common clients, decided up front by
+# `LanguageNegotiator`:
+KNOWN_ACCEPT_LANGUAGE_HEADERS = (
+    "*",
+    "en",
+    "en-US",
+    "en-US,en;q=0.9",
+    "en-GB,en;q=0.9",
+    "en-GB,en-US;q=0.9,en;q=0.8",
+    "nb",
+    "nb-NO,nb;q=0.9",
+    "nb-NO,nb;q=0.9,no;q=0.8,nn;q=0.7,en-US;q=0.6,en;q=0.5",
+    "nb,no;q=0.9,nn;q=0.8,en;q=0.7",
+    "nn-NO,nn;q=0.9,no;q=0.8,nb;q=0.7,en;q=0.6",
+)
 
 
 class NoAgreeableLanguageError(Exception):
@@ -34,42 +76,74 @@ class LanguageRangeSpecificity(Enum):
 
 
 class WeightedLanguage:
-    """Class for handling weighted languages."""
+    """Class for handling weighted languages.
+
+    Weighted languages are immutable, so that a parsed language range can be shared
+    between requests through :func:`intern_language`.
+    """
+
+    __slots__ = ("language", "q", "specificity", "_key")
 
     language: str
-    q: float = 1.0
+    q: float
     specificity: LanguageRangeSpecificity
+    # The element of the language range in canonical keys:
+    _key: str
 
     def __init__(self, language: str) -> None:
         """Initialize the weighted language."""
         weighted_language_split = language.split(";")
         # Instantiate weighted language:
-        logging.debug(f"Assigning q-parameter for weighted languag: {language}")
+        logger.debug("Assigning q-parameter for weighted languag: %s", language)
 
-        self.language = weighted_language_split[0]
+        language_range = weighted_language_split[0].strip(OWS)
 
         # Determine specificity:
-        if self.language == "*":
-            self.specificity = LanguageRangeSpecificity.NONSPECIFIC
+        if language_range == "*":
+            specificity = LanguageRangeSpecificity.NONSPECIFIC
         else:
-            self.specificity = LanguageRangeSpecificity.SPECIFIC
+            specificity = LanguageRangeSpecificity.SPECIFIC
 
         # If q-parameter is present, assign it:
-        for weighted_language_part in weighted_language_split[1:]:
-            if weighted_language_part.startswith("q="):
-                self.q = float(
-                    # RFC specifies only 3 decimals may be used in q value.
-                    weighted_language_part.split("=")[1][0:5]
-                )
-                # Check if q value is valid and adjust accordingly:
-                self.q = 1.0 if self.q > 1.0 else self.q
-                self.q = 0.0 if self.q < 0.0 else self.q
+        q = parse_quality(weighted_language_split[1:])
+
+        object.__setattr__(self, "language", language_range)
+        object.__setattr__(self, "q", q)
+        object.__setattr__(self, "specificity", specificity)
+        # Formatted once, since interned languages are shared between requests:
+        object.__setattr__(
+            self, "_key", language_range if q == 1.0 else f"{language_range};q={q!r}"
+        )
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Refuse to modify the weighted language."""
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        """Refuse to modify the weighted language."""
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __getstate__(self) -> Tuple[Any, ...]:
+        """Return the attributes, to pickle or copy the weighted language by."""
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state: Tuple[Any, ...]) -> None:
+        """Restore the attributes of a pickled or copied weighted language."""
+        for name, value in zip(self.__slots__, state, strict=True):
+            object.__setattr__(self, name, value)
 
     def __eq__(self, other: Any) -> bool:
-        """Compare two weighted languages."""
+        """Compare two weighted languages, or a weighted language and a string."""
+        # Equal if the language ranges and q-values are, whether interned or not:
+        if isinstance(other, WeightedLanguage):
+            return self._key == other._key
         if isinstance(other, str):
             return self.language == other
-        return False  # pragma: no cover
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        """Return the hash of the language range, which equal strings share."""
+        return hash(self.language)
 
     def __lt__(self, other: Any) -> bool:
         """Compare two weighted languages."""
@@ -88,28 +162,125 @@ class WeightedLanguage:
         return f"{self.language};q={self.q}"
 
 
+@lru_cache(maxsize=LANGUAGE_INTERN_SIZE)
+def intern_language(language: str) -> WeightedLanguage:
+    """Return the shared weighted language of a language range.
+
+    Language ranges are parsed once and kept in a bounded intern table keyed by the
+    raw language range, so a language range that is repeated across requests is not
+    parsed again, even when the rest of the accept-language header differs.
+
+    Args:
+        language (str): the raw language range, e.g. "nb;q=0.9".
+
+    Returns:
+        The weighted language.
+
+    """
+    return WeightedLanguage(language)
+
+
 def prepare_weighted_languages(
     weighted_languages: List[str],
 ) -> List[WeightedLanguage]:
     """Prepare the accept weighted languages and sort."""
-    logging.debug(f"Preparing accept weighted languages: {weighted_languages}")
+    logger.debug("Preparing accept weighted languages: %s", weighted_languages)
 
     weighted_languages_sorted: List[WeightedLanguage] = []
 
     for accept_weighted_language in weighted_languages:
-        # Instantiate weighted language:
-        weighted_language = WeightedLanguage(accept_weighted_language)
+        # Look up the interned weighted language:
+        weighted_language = intern_language(accept_weighted_language)
         weighted_languages_sorted.append(weighted_language)
 
     # Sort and return list of weighted languages:
     weighted_languages_sorted.sort(reverse=True)
-    logging.debug(
-        f"Accept weighted languages sorted: {', '.join(str(p) for p in weighted_languages_sorted)}"  # noqa: B950
-    )
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Accept weighted languages sorted: %s",
+            ", ".join(str(p) for p in weighted_languages_sorted),
+        )
 
     return weighted_languages_sorted
 
 
+@dataclass(frozen=True)
+class ParsedAcceptLanguage:
+    """Accept-language headers parsed once, for negotiating against several lists.
+
+    Parsed accept-language headers are immutable, and may be passed to
+    :func:`decide_language` or to any :class:`LanguageNegotiator` instead of the
+    raw accept-language headers. They are values: parsed accept-language headers
+    are hashable, and equal if their headers and weighted languages are, whether
+    interned or not.
+    """
+
+    #: The comma-joined accept-language headers, or None if none was given.
+    header: Optional[str]
+    #: The weighted languages with a q-value above 0.0, in order of preference.
+    ranges: Tuple[WeightedLanguage, ...]
+    #: The language ranges with a q-value of 0.0, which "*" does not match.
+    excluded: FrozenSet[str] = frozenset()
+
+    @cached_property
+    def key(self) -> str:
+        """The canonical accept-language header, decided as the headers are.
+
+        Accept-language headers differing only in whitespace, in the case of the q
+        parameter, in "q=1" versus no q-value, in repeated language ranges, or in
+        how they are split into several header fields, have the same key. Excluded
+        language ranges are listed last, in sorted order.
+
+        Returns:
+            The canonical accept-language header.
+
+        """
+        # No acceptable language ranges decide as any language, unless that is
+        # excluded too:
+        if not self.ranges and "*" in self.excluded:
+            return "*;q=0"
+        elements: List[str] = [] if self.ranges else ["*"]
+
+        seen: Set[str] = set()
+        for weighted_language in self.ranges:
+            if weighted_language.language not in seen:
+                seen.add(weighted_language.language)
+                elements.append(weighted_language._key)
+        if self.excluded:
+            elements.extend(f"{language};q=0" for language in sorted(self.excluded))
+        return ",".join(elements)
+
+
+def parse_accept_language(accept_language_headers: List[str]) -> ParsedAcceptLanguage:
+    """Parse and sort the accept-language headers.
+
+    Args:
+        accept_language_headers (List[str]): the accept-language headers.
+
+    Returns:
+        The parsed accept-language headers.
+
+    """
+    weighted_languages = split_field_values(accept_language_headers)
+    weighted_languages_sorted = prepare_weighted_languages(weighted_languages)
+
+    return ParsedAcceptLanguage(
+        header=join_field_values(accept_language_headers),
+        # Remove weighted languages with q=0.0:
+        ranges=tuple(
+            weighted_language
+            for weighted_language in weighted_languages_sorted
+            if weighted_language.q != 0.0
+        ),
+        # Keep weighted languages with q=0.0 apart, as exclusions:
+        excluded=frozenset(
+            weighted_language.language
+            for weighted_language in weighted_languages_sorted
+            if weighted_language.q == 0.0
+        ),
+    )
+
+
 def get_default_language(supported_languages: List[str]) -> str:
     """Get the default language.
 
@@ -121,20 +292,47 @@ def get_default_language(supported_languages: List[str]) -> str:
 
     """
     # If no accept-language header is provided, return the first supported language:
-    logging.debug(
+    logger.debug(
         "No accept-language header provided. Returning first supported language."
     )
     return supported_languages[0]
 
 
+def get_included_language(
+    supported_languages: List[str], excluded: AbstractSet[str]
+) -> Optional[str]:
+    """Get the default language that is not excluded.
+
+    Args:
+        supported_languages (List[str]): List of supported languages.
+        excluded (AbstractSet[str]): the language ranges with a q-value of 0.0.
+
+    Returns:
+        The first supported language that is not excluded, or None.
+
+    """
+    if not excluded:
+        return get_default_language(supported_languages)
+    return next(
+        (language for language in supported_languages if language not in excluded),
+        None,
+    )
+
+
 def decide_language(
-    accept_language_headers: List[str], supported_languages: List[str]
+    accept_language_headers: Union[List[str], ParsedAcceptLanguage],
+    supported_languages: List[str],
+    tracker: Optional[HeavyHittersTracker] = None,
 ) -> str:
     """Decide the language based on the given accept-language header and supported languages.
 
     Args:
-        accept_language_headers (List[str]): the accept-langugage headers.
+        accept_language_headers (Union[List[str], ParsedAcceptLanguage]): the
+            accept-langugage headers, or the accept-language headers parsed by
+            :func:`parse_accept_language`.
         supported_languages (List[str]): List of supported languages.
+        tracker (Optional[HeavyHittersTracker]): tracker to record the
+            accept-language header with.
 
     Returns:
         The content language of the response.
@@ -143,9 +341,8 @@ def decide_language(
         NoAgreeableLanguageError: If no agreeable language is found.
 
     """
-    logging.debug(
-        f"Deciding languages {accept_language_headers} "
-        f"against {supported_languages}"
+    logger.debug(
+        "Deciding languages %s against %s", accept_language_headers, supported_languages
     )
 
     # Checking a corner case:
@@ -154,33 +351,279 @@ def decide_language(
             "No supported languages or accept language headers provided."
         )
 
-    # Parse and sort the accept-language headers:
-    weighted_languages: List[str] = [
-        wl for header in accept_language_headers for wl in header.split(",")
-    ]
-    weighted_languages_sorted = prepare_weighted_languages(weighted_languages)
-
-    # Remove weighted languages with q=0.0:
-    weighted_languages_sorted = [
-        weighted_language
-        for weighted_language in weighted_languages_sorted
-        if weighted_language.q != 0.0
-    ]
-
-    # If the list of languages accepted is empty, return the default language:
+    # Parse and sort the accept-language headers, unless they are parsed already:
+    accept_language = (
+        accept_language_headers
+        if isinstance(accept_language_headers, ParsedAcceptLanguage)
+        else parse_accept_language(accept_language_headers)
+    )
+    if tracker is not None:
+        tracker.record(accept_language.header)
+    weighted_languages_sorted = accept_language.ranges
+    excluded = accept_language.excluded
+    language: Optional[str]
+
+    # If the list of languages accepted is empty, return the default language that
+    # is not excluded:
     if len(weighted_languages_sorted) == 0:
-        logging.debug(
+        logger.debug(
             "No accept-language header provided. Returning the default language."
         )
-        return get_default_language(supported_languages)
+        language = (
+            None
+            if "*" in excluded
+            else get_included_language(supported_languages, excluded)
+        )
+        if language is None:
+            raise NoAgreeableLanguageError("No agreeable language found.")
+        return language
 
-    # Find the first weighted language that is supported and return it:
+    # Find the first weighted language that is supported and return it, where "*"
+    # does not match excluded languages:
     for weighted_language in weighted_languages_sorted:
-        logging.debug(f"Checking weighted language: {weighted_language}")
+        logger.debug("Checking weighted language: %s", weighted_language)
         if weighted_language in supported_languages:
             return weighted_language.language
         elif weighted_language.language == "*":
-            return get_default_language(supported_languages)
+            language = get_included_language(supported_languages, excluded)
+            if language is not None:
+                return language
 
     # If no agreeable language is found, raise NoAgreeableLanguageError:
     raise NoAgreeableLanguageError("No agreeable language found.")
+
+
+def compile_language_candidates(
+    supported_languages: List[str],
+    fallbacks: Mapping[str, Sequence[str]],
+    equivalents: Iterable[Iterable[str]],
+) -> Dict[str, Tuple[str, ...]]:
+    """Compile the table from requested language to the languages it may decide.
+
+    A supported language decides itself. Any other language decides the supported
+    languages of its fallback chain, in order, and then the supported languages of
+    its equivalence class, in the order of the supported languages. "*" decides the
+    supported languages, unless "*" is supported itself.
+
+    Args:
+        supported_languages (List[str]): List of supported languages.
+        fallbacks (Mapping[str, Sequence[str]]): the fallback chains, by requested
+            language.
+        equivalents (Iterable[Iterable[str]]): the equivalence classes.
+
+    Returns:
+        The supported languages, in order of preference, by requested language.
+
+    """
+    supported = {language: i for i, language in enumerate(supported_languages)}
+    candidates: Dict[str, List[str]] = {}
+
+    for language, chain in fallbacks.items():
+        candidates[language] = [f for f in chain if f in supported]
+
+    for equivalence_class in equivalents:
+        languages = list(equivalence_class)
+        available = sorted(
+            (language for language in languages if language in supported),
+            key=supported.__getitem__,
+        )
+        for language in languages:
+            candidates.setdefault(language, []).extend(available)
+
+    if supported_languages:
+        candidates["*"] = list(supported)
+    # Supported languages take precedence:
+    for language in supported:
+        candidates[language] = [language]
+    return {
+        language: tuple(dict.fromkeys(languages))
+        for language, languages in candidates.items()
+        if languages
+    }
+
+
+def compile_language_matches(
+    supported_languages: List[str],
+    fallbacks: Mapping[str, Sequence[str]],
+    equivalents: Iterable[Iterable[str]],
+) -> Dict[str, str]:
+    """Compile the table from requested language to decided language.
+
+    Args:
+        supported_languages (List[str]): List of supported languages.
+        fallbacks (Mapping[str, Sequence[str]]): the fallback chains, by requested
+            language.
+        equivalents (Iterable[Iterable[str]]): the equivalence classes.
+
+    Returns:
+        The decided language, the first of :func:`compile_language_candidates`, by
+        requested language.
+
+    """
+    return {
+        language: languages[0]
+        for language, languages in compile_language_candidates(
+            supported_languages, fallbacks, equivalents
+        ).items()
+    }
+
+
+class LanguageNegotiator(Freezable):
+    """Negotiator compiled once for a list of supported languages.
+
+    The supported languages are indexed when the negotiator is constructed, so that
+    deciding a language is a dict lookup per language range. The decisions are the
+    same as those of :func:`decide_language`.
+
+    The decisions for a list of known accept-language headers, by default
+    :data:`KNOWN_ACCEPT_LANGUAGE_HEADERS`, are made when the negotiator is
+    constructed and kept in a read-only table, which is consulted before any
+    parsing.
+
+    Languages that clients send interchangeably may be declared as fallback chains,
+    where a requested language falls back to the first supported language of its
+    chain, and as equivalence classes, where a requested language falls back to the
+    first supported language of its class. The supported languages, the chains and
+    the classes are compiled into one table from requested language to decided
+    language, so each language range is decided by one dict lookup.
+
+    Example:
+        >>> negotiator = LanguageNegotiator(["nb", "en"])
+        >>> negotiator.decide(["en;q=0.8, nb;q=0.9"])
+        'nb'
+        >>> negotiator = LanguageNegotiator(
+        >>>     ["nb", "en"], fallbacks={"no": ["nb", "nn"]}, equivalents=[["en", "en-GB"]]
+        >>> )
+        >>> negotiator.decide(["no, en;q=0.5"])
+        'nb'
+    """
+
+    supported_languages: List[str]
+    decisions: Mapping[str, Optional[str]]
+    matches: Mapping[str, str]
+    tracker: Optional[HeavyHittersTracker]
+
+    def __init__(
+        self,
+        supported_languages: List[str],
+        known_headers: Iterable[str] = KNOWN_ACCEPT_LANGUAGE_HEADERS,
+        tracker: Optional[HeavyHittersTracker] = None,
+        fallbacks: Optional[Mapping[str, Sequence[str]]] = None,
+        equivalents: Iterable[Iterable[str]] = (),
+    ) -> None:
+        """Compile the supported languages.
+
+        Args:
+            supported_languages (List[str]): List of supported languages.
+            known_headers (Iterable[str]): accept-language headers to decide up front.
+            tracker (Optional[HeavyHittersTracker]): tracker to record the
+                accept-language header of every decision with.
+            fallbacks (Optional[Mapping[str, Sequence[str]]]): the languages a
+                requested language falls back to, in order, e.g.
+                {"no": ["nb", "nn"]}. Chains are not followed transitively.
+            equivalents (Iterable[Iterable[str]]): classes of languages that are
+                interchangeable, e.g. [["no", "nb", "nb-NO", "no-NO"]]. A requested
+                language falls back to its class after its fallback chain.
+
+        """
+        self.supported_languages = list(supported_languages)
+        self.tracker = tracker
+        self._candidates = compile_language_candidates(
+            self.supported_languages, fallbacks or {}, equivalents
+        )
+        self.matches = MappingProxyType(
+            {language: languages[0] for language, languages in self._candidates.items()}
+        )
+
+        # Decide the known headers, where None means no agreeable language:
+        decisions: Dict[str, Optional[str]] = {}
+        if len(self.supported_languages):
+            for header in known_headers:
+                try:
+                    decisions[header] = self._negotiate([header])
+                except NoAgreeableLanguageError:
+                    decisions[header] = None
+                except ValueError:
+                    continue  # leave invalid headers to fail when decided
+        self.decisions = MappingProxyType(decisions)
+
+    def decide(
+        self, accept_language_headers: Union[List[str], ParsedAcceptLanguage]
+    ) -> str:
+        """Decide the language based on the given accept-language headers.
+
+        Args:
+            accept_language_headers (Union[List[str], ParsedAcceptLanguage]): the
+                accept-language headers, or the accept-language headers parsed by
+                :func:`parse_accept_language`.
+
+        Returns:
+            The content language of the response.
+
+        Raises:
+            NoAgreeableLanguageError: If no agreeable language is found.
+
+        """
+        header = (
+            accept_language_headers.header
+            if isinstance(accept_language_headers, ParsedAcceptLanguage)
+            else join_field_values(accept_language_headers)
+        )
+        if self.tracker is not None:
+            self.tracker.record(header)
+
+        if header is not None and header in self.decisions:
+            language = self.decisions[header]
+            if language is None:
+                raise NoAgreeableLanguageError("No agreeable language found.")
+            return language
+
+        return self._negotiate(accept_language_headers)
+
+    def _negotiate(
+        self, accept_language_headers: Union[List[str], ParsedAcceptLanguage]
+    ) -> str:
+        """Decide the language by parsing the accept-language headers."""
+        if len(self.supported_languages) == 0:
+            raise NoAgreeableLanguageError(
+                "No supported languages or accept language headers provided."
+            )
+
+        accept_language = (
+            accept_language_headers
+            if isinstance(accept_language_headers, ParsedAcceptLanguage)
+            else parse_accept_language(accept_language_headers)
+        )
+
+        if accept_language.excluded:
+            return self._negotiate_excluding(accept_language)
+
+        # If no languages are accepted, return the default language:
+        if not accept_language.ranges:
+            return self.supported_languages[0]
+
+        for weighted_language in accept_language.ranges:
+            language = self.matches.get(weighted_language.language)
+            if language is not None:
+                return language
+
+        raise NoAgreeableLanguageError("No agreeable language found.")
+
+    def _negotiate_excluding(self, accept_language: ParsedAcceptLanguage) -> str:
+        """Decide the language, where "*" and fallbacks skip excluded languages."""
+        excluded = accept_language.excluded
+        if not accept_language.ranges:
+            candidates: Iterable[str] = (
+                () if "*" in excluded else self.supported_languages
+            )
+            for language in candidates:
+                if language not in excluded:
+                    return language
+
+        for weighted_language in accept_language.ranges:
+            requested = weighted_language.language
+            for language in self._candidates.get(requested, ()):
+                if language == requested or language not in excluded:
+                    return language
+
+        raise NoAgreeableLanguageError("No agreeable language found.")
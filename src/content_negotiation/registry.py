@@ -0,0 +1,116 @@
+"""Module for sharing compiled negotiators between routes with the same lists.
+
+Routes commonly declare one of a few lists of supported content types or
+languages. A :class:`NegotiatorRegistry` hands out one frozen negotiator per list,
+so that the index and the table of known headers of a list are compiled and kept
+once, however many routes declare it, and the decisions of one route are warm for
+every other route with the same list.
+
+The registry holds the negotiators by weak reference: once no route refers to a
+negotiator any more, it is dropped from the registry, and a later route declaring
+the list compiles it again.
+
+Example:
+    >>> from content_negotiation import registry
+    >>>
+    >>> datasets = registry.content_negotiator(["text/turtle", "application/ld+json"])
+    >>> concepts = registry.content_negotiator(["text/turtle", "application/ld+json"])
+    >>> datasets is concepts
+    True
+"""
+
+from threading import Lock
+from typing import Any, Hashable, Iterable, Mapping, Optional, Sequence, Tuple
+from weakref import WeakValueDictionary
+
+from .content_negotiation import ContentNegotiator
+from .language_negotiation import LanguageNegotiator
+
+
+class NegotiatorRegistry:
+    """Shared, frozen negotiators, one per list of supported content types or languages.
+
+    Negotiators handed out by the registry are frozen, since every route declaring
+    the same list holds the same negotiator. They are compiled with the default
+    known headers, and without a tracker or a cache.
+    """
+
+    def __init__(self) -> None:
+        """Create an empty registry."""
+        self._content_negotiators: "WeakValueDictionary[Hashable, ContentNegotiator]"
+        self._content_negotiators = WeakValueDictionary()
+        self._language_negotiators: "WeakValueDictionary[Hashable, LanguageNegotiator]"
+        self._language_negotiators = WeakValueDictionary()
+        self._lock = Lock()
+
+    def content_negotiator(
+        self, supported_content_types: Iterable[str], structured_suffixes: bool = False
+    ) -> ContentNegotiator:
+        """Return the shared negotiator of a list of supported content types.
+
+        Args:
+            supported_content_types (Iterable[str]): the supported content types,
+                optionally with a "qs" parameter.
+            structured_suffixes (bool): match media ranges by structured syntax
+                suffix.
+
+        Returns:
+            The frozen negotiator, compiled on first request.
+
+        """
+        key = (tuple(supported_content_types), structured_suffixes)
+        with self._lock:
+            negotiator = self._content_negotiators.get(key)
+            if negotiator is None:
+                negotiator = ContentNegotiator(
+                    list(key[0]), structured_suffixes=structured_suffixes
+                ).freeze()
+                self._content_negotiators[key] = negotiator
+            return negotiator
+
+    def language_negotiator(
+        self,
+        supported_languages: Iterable[str],
+        fallbacks: Optional[Mapping[str, Sequence[str]]] = None,
+        equivalents: Iterable[Iterable[str]] = (),
+    ) -> LanguageNegotiator:
+        """Return the shared negotiator of a list of supported languages.
+
+        Args:
+            supported_languages (Iterable[str]): the supported languages.
+            fallbacks (Optional[Mapping[str, Sequence[str]]]): the languages a
+                requested language falls back to, in order.
+            equivalents (Iterable[Iterable[str]]): classes of languages that are
+                interchangeable.
+
+        Returns:
+            The frozen negotiator, compiled on first request.
+
+        """
+        key: Tuple[Any, ...] = (
+            tuple(supported_languages),
+            tuple(
+                (language, tuple(chain))
+                for language, chain in (fallbacks or {}).items()
+            ),
+            tuple(tuple(equivalence_class) for equivalence_class in equivalents),
+        )
+        with self._lock:
+            negotiator = self._language_negotiators.get(key)
+            if negotiator is None:
+                negotiator = LanguageNegotiator(
+                    list(key[0]), fallbacks=dict(key[1]), equivalents=key[2]
+                ).freeze()
+                self._language_negotiators[key] = negotiator
+            return negotiator
+
+    def __len__(self) -> int:
+        """Return the number of negotiators in use."""
+        return len(self._content_negotiators) + len(self._language_negotiators)
+
+
+#: The registry of the process.
+default_registry = NegotiatorRegistry()
+
+content_negotiator = default_registry.content_negotiator
+language_negotiator = default_registry.language_negotiator
@@ -0,0 +1,216 @@
+"""Module for sharing negotiated decisions between worker processes.
+
+A :class:`SharedDecisionCache` is a fixed-size open-addressing table in shared
+memory, mapping the fingerprint of an accept header to the index of the decided
+content type in the supported content types. Every worker process of a prefork
+server, e.g. gunicorn, then shares one warm table instead of warming its own.
+
+Readers do not lock: every slot carries a sequence number, which is odd while the
+slot is being written, and a checksum, so a read that races a write is a miss
+rather than a wrong decision.
+
+Example:
+    >>> from content_negotiation import ContentNegotiator
+    >>> from content_negotiation.shared_cache import SharedDecisionCache
+    >>>
+    >>> # In the master process, before forking the workers:
+    >>> cache = SharedDecisionCache(slots=4096)
+    >>> negotiator = ContentNegotiator(supported_content_types, cache=cache)
+"""
+
+from hashlib import blake2b
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+import struct
+import sys
+from typing import Any, Optional, Sequence
+
+# Upper bound on the number of slots probed per header:
+MAX_PROBES = 8
+
+_MAGIC = b"CNCACHE1"
+# Magic, number of slots and digest of the namespace the decisions belong to:
+_HEADER = struct.Struct("<8sQ16s")
+# Sequence number, index of the content type, fingerprint and checksum:
+_SLOT = struct.Struct("<IiQQ")
+_SEQUENCE = struct.Struct("<I")
+
+_MASK = (1 << 64) - 1
+_EMPTY_DIGEST = bytes(16)
+
+
+def fingerprint(header: str) -> int:
+    """Return the 64 bit fingerprint of a header, which is never 0."""
+    digest = blake2b(header.encode("utf-8", "surrogateescape"), digest_size=8)
+    return int.from_bytes(digest.digest(), "little") or 1
+
+
+def _attach(name: Optional[str]) -> SharedMemory:
+    """Attach to shared memory by name, leaving it to the process that created it."""
+    # The resource tracker of an attaching process would unlink the shared memory
+    # when the process exits, under the processes still attached to it:
+    if sys.version_info >= (3, 13):  # pragma: no cover
+        return SharedMemory(name=name, track=False)
+    memory = SharedMemory(name=name)
+    resource_tracker.unregister(memory._name, "shared_memory")  # type: ignore[attr-defined]
+    return memory
+
+
+def _checksum(fingerprint: int, index: int) -> int:
+    """Return the checksum of a slot."""
+    return (fingerprint ^ ((index + 2) * 0x9E3779B97F4A7C15)) & _MASK
+
+
+class SharedDecisionCache:
+    """Cache of decisions in shared memory, shared by several processes.
+
+    Create the cache in one process, e.g. the master process of a prefork server
+    before it forks the workers, and attach to it from unrelated processes by name.
+    The cache is bound to the supported content types of the first negotiator
+    using it, and refuses negotiators with other supported content types.
+    """
+
+    slots: int
+
+    def __init__(
+        self, name: Optional[str] = None, slots: int = 4096, create: bool = True
+    ) -> None:
+        """Create, or attach to, the shared memory of the cache.
+
+        Args:
+            name (Optional[str]): the name of the shared memory, by default a
+                random name when creating.
+            slots (int): the number of slots, when creating.
+            create (bool): create the shared memory, or attach to it.
+
+        Raises:
+            ValueError: If the number of slots is not positive, or the shared
+                memory is not a decision cache.
+
+        """
+        if create:
+            if slots < 1:
+                raise ValueError("The number of slots must be positive.")
+            self._memory = SharedMemory(
+                name=name, create=True, size=_HEADER.size + slots * _SLOT.size
+            )
+            self._buf = self._attached_buf()
+            self._buf[: self._memory.size] = bytes(self._memory.size)
+            _HEADER.pack_into(self._buf, 0, _MAGIC, slots, _EMPTY_DIGEST)
+        else:
+            self._memory = _attach(name)
+            self._buf = self._attached_buf()
+            magic, slots, _ = _HEADER.unpack_from(self._buf, 0)
+            if magic != _MAGIC:
+                self._memory.close()
+                raise ValueError(f"Shared memory {name!r} is not a decision cache.")
+        self.slots = slots
+
+    def _attached_buf(self) -> memoryview:
+        """Return the buffer of the shared memory, which is set once attached."""
+        buf = self._memory.buf
+        assert buf is not None  # noqa: S101
+        return buf
+
+    @property
+    def name(self) -> str:
+        """The name of the shared memory, to attach to the cache by."""
+        return self._memory.name
+
+    def bind(self, namespace: Sequence[str]) -> None:
+        """Bind the cache to the supported content types its decisions index.
+
+        Args:
+            namespace (Sequence[str]): the supported content types, and anything
+                else the decisions depend on.
+
+        Raises:
+            ValueError: If the cache is bound to another namespace.
+
+        """
+        digest = blake2b("\n".join(namespace).encode(), digest_size=16).digest()
+        bound = _HEADER.unpack_from(self._buf, 0)[2]
+        if bound == _EMPTY_DIGEST:
+            _HEADER.pack_into(self._buf, 0, _MAGIC, self.slots, digest)
+        elif bound != digest:
+            raise ValueError(
+                "Shared decision cache is bound to other supported content types."
+            )
+
+    def _offset(self, fingerprint: int, probe: int) -> int:
+        """Return the offset of a slot probed for a fingerprint."""
+        return _HEADER.size + ((fingerprint + probe) % self.slots) * _SLOT.size
+
+    def lookup(self, header: str) -> Optional[int]:
+        """Return the index of the content type decided for a header.
+
+        Args:
+            header (str): the comma-joined accept header.
+
+        Returns:
+            The index in the supported content types, NO_AGREEABLE_CONTENT_TYPE, or
+            None if the header is not cached.
+
+        """
+        key = fingerprint(header)
+        buf = self._buf
+        for probe in range(MAX_PROBES):
+            offset = self._offset(key, probe)
+            sequence, index, slot_key, checksum = _SLOT.unpack_from(buf, offset)
+            if slot_key == 0:
+                return None
+            if slot_key != key:
+                continue
+            # A slot being written, or written since it was read, is a miss:
+            if sequence & 1 or _SEQUENCE.unpack_from(buf, offset)[0] != sequence:
+                return None
+            if checksum != _checksum(key, index):
+                return None
+            return index
+        return None
+
+    def store(self, header: str, index: int) -> None:
+        """Store the index of the content type decided for a header.
+
+        When every slot probed holds another header, the first is overwritten.
+
+        Args:
+            header (str): the comma-joined accept header.
+            index (int): the index in the supported content types, or
+                NO_AGREEABLE_CONTENT_TYPE.
+
+        """
+        key = fingerprint(header)
+        buf = self._buf
+        offset = self._offset(key, 0)
+        for probe in range(MAX_PROBES):
+            probed = self._offset(key, probe)
+            slot_key = _SLOT.unpack_from(buf, probed)[2]
+            if slot_key in (0, key):
+                offset = probed
+                break
+
+        sequence = _SEQUENCE.unpack_from(buf, offset)[0]
+        if sequence & 1:
+            return  # another process is writing the slot
+        _SEQUENCE.pack_into(buf, offset, (sequence + 1) & 0xFFFFFFFF)
+        _SLOT.pack_into(
+            buf, offset, (sequence + 1) & 0xFFFFFFFF, index, key, _checksum(key, index)
+        )
+        _SEQUENCE.pack_into(buf, offset, (sequence + 2) & 0xFFFFFFFF)
+
+    def close(self) -> None:
+        """Detach from the shared memory."""
+        self._memory.close()
+
+    def unlink(self) -> None:
+        """Destroy the shared memory, once every process has detached from it."""
+        self._memory.unlink()
+
+    def __enter__(self) -> "SharedDecisionCache":
+        """Return the cache."""
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Detach from the shared memory."""
+        self.close()
@@ -0,0 +1,309 @@
+"""Module for negotiating against per-resource subsets of a universe of variants.
+
+When every resource of a catalog has its own subset of the available content
+types or languages, compile the universe of content types or languages once, and
+keep the subset available for each resource as an integer bitmask, where bit i is
+set if the i-th variant of the universe is available.
+
+Deciding is then a walk of the client's ranges in order of preference, testing
+the available bits against the mask precomputed for each range, e.g. for
+"text/turtle", "text/*" and "*/*", instead of building a list of supported
+content types per request and scanning it. The variants that ranges with a
+q-value of 0.0 match are cleared from the bits wildcards are tested against.
+
+Example:
+    >>> from content_negotiation.variants import ContentTypeUniverse
+    >>>
+    >>> universe = ContentTypeUniverse(
+    >>>     ["text/turtle", "application/ld+json", "application/rdf+xml"]
+    >>> )
+    >>> # Per resource, e.g. stored with the resource:
+    >>> available = universe.mask(["application/ld+json", "application/rdf+xml"])
+    >>> # Per request:
+    >>> universe.decide(["text/turtle, application/*;q=0.5"], available)
+    'application/ld+json'
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from .content_negotiation import (
+    NoAgreeableContentTypeError,
+    parse_accept,
+    ParsedAccept,
+)
+from .language_negotiation import (
+    NoAgreeableLanguageError,
+    parse_accept_language,
+    ParsedAcceptLanguage,
+)
+
+
+class _Universe:
+    """Universe of variants, with the mask of the variants matching each range."""
+
+    variants: Tuple[str, ...]
+    full_mask: int
+
+    def __init__(self, variants: Iterable[str]) -> None:
+        """Assign a bit to every variant, in order."""
+        self.variants = tuple(dict.fromkeys(variants))
+        self.full_mask = (1 << len(self.variants)) - 1
+        self._bits: Dict[str, int] = {
+            variant: 1 << i for i, variant in enumerate(self.variants)
+        }
+        # Mask of the variants matching each range:
+        self._masks: Dict[str, int] = dict(self._bits)
+        # Mask of the variants each range with a q-value of 0.0 excludes from
+        # wildcards:
+        self._exclusion_masks: Dict[str, int] = dict(self._bits)
+
+    def mask(self, variants: Iterable[str]) -> int:
+        """Return the mask of a subset of the variants.
+
+        Args:
+            variants (Iterable[str]): the available variants, in any order.
+
+        Returns:
+            The mask of the variants.
+
+        Raises:
+            ValueError: If a variant is not in the universe.
+
+        """
+        mask = 0
+        for variant in variants:
+            try:
+                mask |= self._bits[variant]
+            except KeyError:
+                raise ValueError(f"{variant!r} is not in the universe.") from None
+        return mask
+
+    def unmask(self, mask: int) -> List[str]:
+        """Return the variants of a mask, in the order of the universe.
+
+        Args:
+            mask (int): the mask of the variants.
+
+        Returns:
+            The variants, e.g. to pass as supported variants to the functions
+            deciding on lists.
+
+        """
+        return [variant for i, variant in enumerate(self.variants) if mask >> i & 1]
+
+    def _first(self, ranges: Iterable[str], available: int) -> Optional[str]:
+        """Return the first available variant matching the first matched range."""
+        for match in ranges:
+            matched = self._masks.get(match, 0) & available
+            if matched:
+                return self._default(matched)
+        return None
+
+    def _default(self, available: int) -> Optional[str]:
+        """Return the first available variant, or None if there is none."""
+        if not available:
+            return None
+        # The lowest bit set is the first variant in the universe:
+        return self.variants[(available & -available).bit_length() - 1]
+
+    def _excluded(self, ranges: Iterable[str]) -> int:
+        """Return the mask of the variants that ranges with a q-value of 0.0 match."""
+        mask = 0
+        for excluded in ranges:
+            mask |= self._exclusion_masks.get(excluded, 0)
+        return mask
+
+
+class ContentTypeUniverse(_Universe):
+    """Universe of content types, to negotiate against masks of its content types.
+
+    The decision for a mask is the decision of
+    :func:`~content_negotiation.decide_content_type` for the content types of the
+    mask, in the order of the universe.
+    """
+
+    def __init__(self, content_types: Iterable[str]) -> None:
+        """Compile the masks of the exact, "type/*" and "*/*" media ranges.
+
+        Args:
+            content_types (Iterable[str]): every content type of the catalog, in
+                order of the server's preference.
+
+        """
+        super().__init__(content_types)
+        masks: Dict[str, int] = {"*/*": self.full_mask} if self.variants else {}
+        exclusion_masks: Dict[str, int] = {}
+        type_exclusion_masks: Dict[str, int] = {}
+        for content_type, bit in self._bits.items():
+            media_type = content_type.split(";")[0]
+            media_range = f"{media_type.split('/')[0]}/*"
+            masks[media_range] = masks.get(media_range, 0) | bit
+            exclusion_masks[media_type] = exclusion_masks.get(media_type, 0) | bit
+            type_exclusion_masks[media_range] = (
+                type_exclusion_masks.get(media_range, 0) | bit
+            )
+        # Content types take precedence:
+        masks.update(self._bits)
+        self._masks = masks
+        # "type/*" exclusions only apply to wildcards of any type:
+        self._exclusion_masks = exclusion_masks
+        self._type_exclusion_masks = type_exclusion_masks
+
+    def decide(
+        self, accept_headers: Union[List[str], ParsedAccept], available: int
+    ) -> str:
+        """Decide the content type of a resource.
+
+        Args:
+            accept_headers (Union[List[str], ParsedAccept]): the accept headers, or
+                the accept headers parsed by
+                :func:`~content_negotiation.parse_accept`.
+            available (int): the mask of the content types available for the
+                resource.
+
+        Returns:
+            The content type of the response.
+
+        Raises:
+            NoAgreeableContentTypeError: If no agreeable content type is found.
+
+        """
+        available &= self.full_mask
+        if not available:
+            raise NoAgreeableContentTypeError(
+                "No supported content types or accept headers provided."
+            )
+        accept = (
+            accept_headers
+            if isinstance(accept_headers, ParsedAccept)
+            else parse_accept(accept_headers)
+        )
+        if accept.invalid:
+            raise NoAgreeableContentTypeError()
+
+        content_type: Optional[str]
+        if accept.excluded:
+            content_type = self._decide_excluding(accept, available)
+        elif not accept.ranges:
+            content_type = self._default(available)
+        else:
+            content_type = self._first(
+                (
+                    weighted_media_range.media_range()
+                    for weighted_media_range in accept.ranges
+                ),
+                available,
+            )
+        if content_type is None:
+            raise NoAgreeableContentTypeError("No agreeable content type found.")
+        return content_type
+
+    def _decide_excluding(self, accept: ParsedAccept, available: int) -> Optional[str]:
+        """Decide, where wildcards do not match the excluded content types."""
+        excluded = self._excluded(accept.excluded)
+        type_excluded = excluded
+        for media_range in accept.excluded:
+            type_excluded |= self._type_exclusion_masks.get(media_range, 0)
+
+        if not accept.ranges:
+            if "*/*" in accept.excluded:
+                return None
+            return self._default(available & ~type_excluded)
+
+        for weighted_media_range in accept.ranges:
+            media_range = weighted_media_range.media_range()
+            matched = self._masks.get(media_range, 0) & available
+            if media_range not in self._bits:
+                matched &= ~(
+                    type_excluded if weighted_media_range.type == "*" else excluded
+                )
+            if matched:
+                return self._default(matched)
+        return None
+
+
+class LanguageUniverse(_Universe):
+    """Universe of languages, to negotiate against masks of its languages.
+
+    The decision for a mask is the decision of
+    :func:`~content_negotiation.decide_language` for the languages of the mask, in
+    the order of the universe.
+    """
+
+    def __init__(self, languages: Iterable[str]) -> None:
+        """Compile the masks of the exact and "*" language ranges.
+
+        Args:
+            languages (Iterable[str]): every language of the catalog, in order of
+                the server's preference.
+
+        """
+        super().__init__(languages)
+        if self.variants:
+            self._masks.setdefault("*", self.full_mask)
+
+    def decide(
+        self,
+        accept_language_headers: Union[List[str], ParsedAcceptLanguage],
+        available: int,
+    ) -> str:
+        """Decide the language of a resource.
+
+        Args:
+            accept_language_headers (Union[List[str], ParsedAcceptLanguage]): the
+                accept-language headers, or the accept-language headers parsed by
+                :func:`~content_negotiation.parse_accept_language`.
+            available (int): the mask of the languages available for the resource.
+
+        Returns:
+            The content language of the response.
+
+        Raises:
+            NoAgreeableLanguageError: If no agreeable language is found.
+
+        """
+        available &= self.full_mask
+        if not available:
+            raise NoAgreeableLanguageError(
+                "No supported languages or accept language headers provided."
+            )
+        accept_language = (
+            accept_language_headers
+            if isinstance(accept_language_headers, ParsedAcceptLanguage)
+            else parse_accept_language(accept_language_headers)
+        )
+        language: Optional[str]
+        if accept_language.excluded:
+            language = self._decide_excluding(accept_language, available)
+        elif not accept_language.ranges:
+            language = self._default(available)
+        else:
+            language = self._first(
+                (
+                    weighted_language.language
+                    for weighted_language in accept_language.ranges
+                ),
+                available,
+            )
+        if language is None:
+            raise NoAgreeableLanguageError("No agreeable language found.")
+        return language
+
+    def _decide_excluding(
+        self, accept_language: ParsedAcceptLanguage, available: int
+    ) -> Optional[str]:
+        """Decide, where "*" does not match the excluded languages."""
+        excluded = self._excluded(accept_language.excluded)
+        if not accept_language.ranges:
+            if "*" in accept_language.excluded:
+                return None
+            return self._default(available & ~excluded)
+
+        for weighted_language in accept_language.ranges:
+            language = weighted_language.language
+            matched = self._masks.get(language, 0) & available
+            if language not in self._bits:
+                matched &= ~excluded
+            if matched:
+                return self._default(matched)
+        return None
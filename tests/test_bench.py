@@ -0,0 +1,184 @@
+"""Test cases for the bench module and the command line."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from content_negotiation.__main__ import main
+from content_negotiation.bench import (
+    BenchResult,
+    format_table,
+    read_corpus,
+    run,
+    to_json,
+)
+
+SUPPORTED_CONTENT_TYPES = ["text/turtle", "application/ld+json"]
+SUPPORTED_LANGUAGES = ["nb", "en"]
+
+LINES = [
+    b"text/turtle\tnb\n",
+    b"application/ld+json;q=0.9, */*;q=0.1\ten;q=0.5, nb;q=0.4\n",
+    b"-\t-\n",
+    b"audio/*\tfr\n",
+    b"\tnb;q=x\r\n",
+    b"*/*",
+]
+
+
+@pytest.fixture
+def corpus(tmp_path: Path) -> str:
+    """Return the path of a corpus of requests."""
+    path = tmp_path / "accept-headers.tsv"
+    path.write_bytes(b"".join(LINES))
+    return str(path)
+
+
+def test_read_corpus(corpus: str) -> None:
+    """Should read the headers of every request, where "-" is no header."""
+    assert read_corpus(corpus) == [
+        (["text/turtle"], ["nb"]),
+        (["application/ld+json;q=0.9, */*;q=0.1"], ["en;q=0.5, nb;q=0.4"]),
+        ([], []),
+        (["audio/*"], ["fr"]),
+        ([], ["nb;q=x"]),
+        (["*/*"], []),
+    ]
+
+
+def test_run(corpus: str) -> None:
+    """Should measure every engine deciding every request."""
+    results = run(
+        read_corpus(corpus), SUPPORTED_CONTENT_TYPES, SUPPORTED_LANGUAGES, repeat=3
+    )
+    assert [(result.engine, result.header) for result in results] == [
+        ("decide_content_type", "Accept"),
+        ("compile_matcher", "Accept"),
+        ("ContentNegotiator", "Accept"),
+        ("ContentNegotiator+SharedDecisionCache", "Accept"),
+        ("decide_language", "Accept-Language"),
+        ("LanguageNegotiator", "Accept-Language"),
+    ]
+    for result in results:
+        assert result.requests == 18
+        assert result.ops_per_sec > 0
+        assert 0 < result.p50_us <= result.p99_us <= result.p999_us
+        assert result.peak_bytes >= 0
+    hit_ratios = {result.engine: result.hit_ratio for result in results}
+    assert hit_ratios["decide_content_type"] is None
+    # "text/turtle" and "*/*", twice, are decided up front:
+    assert hit_ratios["ContentNegotiator"] == pytest.approx(2 / 6)
+    # Every decision but the first of each of the 4 headers is a hit, and requests
+    # without a header are not looked up:
+    assert hit_ratios["ContentNegotiator+SharedDecisionCache"] == pytest.approx(8 / 18)
+
+
+def test_run_without_cache_or_requests() -> None:
+    """Should leave the cache out with no slots, and measure no requests as 0."""
+    results = run([], SUPPORTED_CONTENT_TYPES, cache_slots=0)
+    assert [result.engine for result in results] == [
+        "decide_content_type",
+        "compile_matcher",
+        "ContentNegotiator",
+    ]
+    assert results[2] == BenchResult(
+        engine="ContentNegotiator",
+        header="Accept",
+        requests=0,
+        ops_per_sec=0.0,
+        p50_us=0.0,
+        p99_us=0.0,
+        p999_us=0.0,
+        peak_bytes=0,
+        hit_ratio=0.0,
+    )
+    cached = run([], SUPPORTED_CONTENT_TYPES)[-1]
+    assert cached.engine == "ContentNegotiator+SharedDecisionCache"
+    assert cached.hit_ratio == 0.0
+
+
+def test_format_table() -> None:
+    """Should format one engine per line, with "-" for no hit ratio."""
+    result = BenchResult(
+        "decide_language", "Accept-Language", 10, 1e5, 1, 2, 3, 64, None
+    )
+    lines = format_table([result, result]).splitlines()
+    assert lines[0].split() == [
+        "engine",
+        "requests",
+        "ops/sec",
+        "p50",
+        "us",
+        "p99",
+        "us",
+        "p999",
+        "us",
+        "peak",
+        "bytes",
+        "hit",
+        "ratio",
+    ]
+    assert lines[1].split() == [
+        "decide_language",
+        "10",
+        "100000",
+        "1.00",
+        "2.00",
+        "3.00",
+        "64",
+        "-",
+    ]
+    assert len(lines) == 3
+
+
+def test_to_json() -> None:
+    """Should write one object per engine."""
+    result = BenchResult("LanguageNegotiator", "Accept-Language", 1, 1, 1, 1, 1, 0, 1)
+    assert json.loads(to_json([result])) == [
+        {
+            "engine": "LanguageNegotiator",
+            "header": "Accept-Language",
+            "requests": 1,
+            "ops_per_sec": 1,
+            "p50_us": 1,
+            "p99_us": 1,
+            "p999_us": 1,
+            "peak_bytes": 0,
+            "hit_ratio": 1,
+        }
+    ]
+
+
+def test_main_bench(corpus: str, capsys: pytest.CaptureFixture) -> None:
+    """Should print the table, or the JSON, of the engines measured."""
+    assert main(["bench", "--languages", "nb", "en", "--corpus", corpus]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert [line.split()[0] for line in lines[1:]] == [
+        "decide_language",
+        "LanguageNegotiator",
+    ]
+
+    argv = ["bench", "--supported", *SUPPORTED_CONTENT_TYPES, "--corpus", corpus]
+    assert main([*argv, "--cache-slots", "0", "--repeat", "2", "--json"]) == 0
+    results = json.loads(capsys.readouterr().out)
+    assert [result["requests"] for result in results] == [12, 12, 12]
+
+
+def test_main_bench_without_supported(corpus: str) -> None:
+    """Should exit with an error when neither list is given."""
+    with pytest.raises(SystemExit) as e:
+        main(["bench", "--corpus", corpus])
+    assert e.value.code == 2
+
+
+def test_main_bench_with_negative_cache_slots(
+    corpus: str, capsys: pytest.CaptureFixture
+) -> None:
+    """Should exit with an error when the cache slots are negative."""
+    argv = ["bench", "--languages", "nb", "--corpus", corpus, "--cache-slots"]
+    for cache_slots in ["-1", "x"]:
+        with pytest.raises(SystemExit) as e:
+            main([*argv, cache_slots])
+        assert e.value.code == 2
+        assert "not a non-negative integer" in capsys.readouterr().err
@@ -0,0 +1,109 @@
+"""Test cases for the bulk module."""
+
+import mmap
+from pathlib import Path
+
+import pytest
+
+from content_negotiation import bulk
+from content_negotiation.bulk import (
+    analyze_file,
+    BulkResult,
+    header_values,
+    shard_boundaries,
+)
+
+SUPPORTED_CONTENT_TYPES = ["text/turtle", "application/ld+json"]
+SUPPORTED_LANGUAGES = ["nb", "en"]
+
+LINES = [
+    b"text/turtle\tnb\n",
+    b"application/ld+json;q=0.9, */*;q=0.1\ten;q=0.5, nb;q=0.4\n",
+    b"-\t-\n",
+    b"audio/*\tfr\n",
+    b"text/turtle\tnb\n",
+    b"\tnb;q=x\r\n",
+    b"application/*",
+]
+
+
+@pytest.fixture
+def in_process(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Restore the negotiators of the worker globals once a test has set them."""
+    monkeypatch.setattr(bulk, "_content_negotiator", None)
+    monkeypatch.setattr(bulk, "_language_negotiator", None)
+
+
+def _write(tmp_path: Path, lines: list) -> str:
+    path = tmp_path / "accept-headers.tsv"
+    path.write_bytes(b"".join(lines))
+    return str(path)
+
+
+def test_analyze_file(tmp_path: Path) -> None:
+    """Should aggregate the decisions of all lines."""
+    path = _write(tmp_path, (LINES[:-1] + [b"application/*\n"]) * 50)
+    result = analyze_file(
+        path, SUPPORTED_CONTENT_TYPES, SUPPORTED_LANGUAGES, max_workers=2
+    )
+    assert result.lines == 350
+    assert result.content_types == {
+        "text/turtle": 200,
+        "application/ld+json": 100,
+    }
+    assert result.no_agreeable_content_type == 50
+    assert result.languages == {"nb": 200, "en": 50}
+    assert result.no_agreeable_language == 100
+
+
+def test_analyze_file_empty(tmp_path: Path) -> None:
+    """Should return an empty result for an empty file."""
+    path = _write(tmp_path, [])
+    assert analyze_file(path, SUPPORTED_CONTENT_TYPES) == BulkResult()
+
+
+def test_analyze_shard_in_process(tmp_path: Path, in_process: None) -> None:
+    """Should negotiate a shard with the negotiators compiled by the initializer."""
+    path = _write(tmp_path, LINES)
+    bulk._init_worker(SUPPORTED_CONTENT_TYPES, SUPPORTED_LANGUAGES)
+    result = bulk._analyze_shard(path, 0, Path(path).stat().st_size)
+    assert result.lines == 7
+    assert result.content_types == {"text/turtle": 4, "application/ld+json": 2}
+    assert result.no_agreeable_content_type == 1
+    assert result.languages == {"nb": 4, "en": 1}
+    assert result.no_agreeable_language == 2
+
+
+def test_analyze_shard_without_languages(
+    tmp_path: Path, in_process: None, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Should not count languages when no supported languages are given."""
+    path = _write(tmp_path, LINES)
+    bulk._init_worker(SUPPORTED_CONTENT_TYPES, None)
+    monkeypatch.setattr(bulk, "MEMO_SIZE", 0)
+    result = bulk._analyze_shard(path, 0, Path(path).stat().st_size)
+    assert result.lines == 7
+    assert result.languages == {}
+    assert result.no_agreeable_language == 0
+
+
+def test_shard_boundaries(tmp_path: Path) -> None:
+    """Should split on line boundaries and cover the whole file."""
+    path = _write(tmp_path, LINES * 10)
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        boundaries = shard_boundaries(mm, 8)
+        assert boundaries[0][0] == 0
+        assert boundaries[-1][1] == len(mm)
+        for (_, end), (start, _) in zip(boundaries, boundaries[1:], strict=False):
+            assert end == start
+            assert mm[end - 1 : end] == b"\n"
+
+
+def test_header_values() -> None:
+    """Should decode a field as latin-1, and a missing header as no values."""
+    assert header_values(b"text/turtle") == ["text/turtle"]
+    assert header_values("text/plain;title=Gr\xfc\xdf".encode("latin-1")) == [
+        "text/plain;title=Gr\xfc\xdf"
+    ]
+    assert header_values(b"") == []
+    assert header_values(b"-") == []
@@ -0,0 +1,151 @@
+"""Test cases for the canonical keys of accept and accept-language headers."""
+
+from typing import List
+
+import pytest
+
+from content_negotiation import (
+    ContentNegotiator,
+    decide_content_type,
+    decide_language,
+    LanguageNegotiator,
+    NoAgreeableContentTypeError,
+    NoAgreeableLanguageError,
+    parse_accept,
+    parse_accept_language,
+)
+from content_negotiation.shared_cache import SharedDecisionCache
+
+SUPPORTED_CONTENT_TYPES = ["text/turtle", "application/ld+json", "text/html"]
+
+# Accept headers that are equivalent to each other:
+EQUIVALENT_ACCEPT_HEADERS: List[List[List[str]]] = [
+    [
+        ["text/turtle;q=0.9,application/ld+json"],
+        ["application/ld+json, text/turtle;q=0.9"],
+        ["application/ld+json;q=1", "text/turtle; Q=0.9"],
+        ["application/ld+json;q=1.0,\ttext/turtle;q=0.900"],
+        ["application/ld+json,text/turtle;q=0.9,application/ld+json;q=0.5"],
+        ["application/ld+json;v=1,text/turtle;level=2;q=0.9"],
+    ],
+    [
+        ["*/*"],
+        ["*/*;q=1"],
+        [" */* "],
+        [],
+    ],
+]
+
+EQUIVALENT_ACCEPT_LANGUAGE_HEADERS: List[List[List[str]]] = [
+    [
+        ["nb,en;q=0.8"],
+        ["en;q=0.8, nb"],
+        ["nb;q=1.0", "en; Q=0.8"],
+        ["nb,en;q=0.800,nb;q=0.1"],
+    ],
+    [
+        ["*"],
+        [],
+    ],
+]
+
+
+@pytest.mark.parametrize("equivalent", EQUIVALENT_ACCEPT_HEADERS)
+def test_equivalent_accept_headers_have_the_same_key(
+    equivalent: List[List[str]],
+) -> None:
+    """Should give equivalent accept headers the same key and decision."""
+    keys = {parse_accept(accept_headers).key for accept_headers in equivalent}
+    assert len(keys) == 1
+    decisions = {
+        decide_content_type(accept_headers, SUPPORTED_CONTENT_TYPES)
+        for accept_headers in equivalent
+    }
+    assert len(decisions) == 1
+    (key,) = keys
+    assert decide_content_type([key], SUPPORTED_CONTENT_TYPES) in decisions
+
+
+def test_key_is_canonical() -> None:
+    """Should render the key in order of preference, without redundant parts."""
+    accept = parse_accept(["text/turtle;q=0.9, Application/LD+JSON;level=1"])
+    assert accept.key == "Application/LD+JSON,text/turtle;q=0.9"
+    assert parse_accept([accept.key]).key == accept.key
+
+
+def test_only_invalid_media_ranges_have_the_empty_key() -> None:
+    """Should give accept headers with only invalid media ranges the empty key."""
+    assert parse_accept(["text"]).key == parse_accept(["a/b/c"]).key == ""
+    with pytest.raises(NoAgreeableContentTypeError):
+        decide_content_type([""], SUPPORTED_CONTENT_TYPES)
+
+
+def test_differently_cased_media_ranges_have_different_keys() -> None:
+    """Should keep the case of media ranges, which decisions depend on."""
+    assert parse_accept(["text/turtle"]).key != parse_accept(["Text/Turtle"]).key
+
+
+def test_negotiator_decides_variants_of_known_headers() -> None:
+    """Should decide a variant of a known accept header as the known header."""
+    negotiator = ContentNegotiator(
+        SUPPORTED_CONTENT_TYPES, known_headers=["text/turtle;q=0.9,application/ld+json"]
+    )
+    # The table holds the headers as sent, since a variant is parsed either way:
+    assert list(negotiator.decisions) == ["text/turtle;q=0.9,application/ld+json"]
+    variant = ["application/ld+json ,text/turtle; q=0.90"]
+    assert negotiator.decide(variant) == "application/ld+json"
+    assert negotiator.decide(parse_accept(variant)) == "application/ld+json"
+
+
+def test_negotiator_decides_variants_without_agreeable_content_type() -> None:
+    """Should raise for a variant of a known accept header with no agreeable type."""
+    negotiator = ContentNegotiator(SUPPORTED_CONTENT_TYPES, known_headers=["audio/*"])
+    with pytest.raises(NoAgreeableContentTypeError):
+        negotiator.decide([" audio/* "])
+
+
+def test_shared_cache_is_keyed_by_canonical_key() -> None:
+    """Should share one cached decision between equivalent accept headers."""
+    with SharedDecisionCache(slots=8) as cache:
+        try:
+            negotiator = ContentNegotiator(
+                SUPPORTED_CONTENT_TYPES, known_headers=(), cache=cache
+            )
+            assert negotiator.decide(["text/html;q=0.5, text/turtle"]) == "text/turtle"
+            key = parse_accept(["text/turtle,text/html;Q=0.5"]).key
+            assert cache.lookup(key) == 0
+            del negotiator
+        finally:
+            cache.unlink()
+
+
+@pytest.mark.parametrize("equivalent", EQUIVALENT_ACCEPT_LANGUAGE_HEADERS)
+def test_equivalent_accept_language_headers_have_the_same_key(
+    equivalent: List[List[str]],
+) -> None:
+    """Should give equivalent accept-language headers the same key and decision."""
+    keys = {parse_accept_language(headers).key for headers in equivalent}
+    assert len(keys) == 1
+    decisions = {decide_language(headers, ["en", "nb"]) for headers in equivalent}
+    assert len(decisions) == 1
+
+
+def test_language_negotiator_decides_variants_of_known_headers_by_key() -> None:
+    """Should decide a variant of a known accept-language header by its key."""
+    negotiator = LanguageNegotiator(["en", "nb"], known_headers=["nb,en;q=0.8"])
+    assert negotiator.decide(["en; q=0.8", " nb"]) == "nb"
+    assert negotiator.decide(["en;q=0.8,nb;q=0.9"]) == "nb"
+
+
+def test_language_negotiator_decides_variants_without_agreeable_language() -> None:
+    """Should raise for a variant of a known header with no agreeable language."""
+    negotiator = LanguageNegotiator(["en", "nb"], known_headers=["fr"])
+    with pytest.raises(NoAgreeableLanguageError):
+        negotiator.decide([" fr;Q=1"])
+
+
+def test_nan_q_value_is_invalid() -> None:
+    """Should treat a q-value of nan as invalid, rather than as a number."""
+    assert parse_accept(["text/turtle;q=nan"]).invalid
+    with pytest.raises(ValueError):
+        parse_accept_language(["nb;q=nan"])
@@ -0,0 +1,136 @@
+"""Test cases for the charset_negotiation module."""
+
+from typing import List
+
+import pytest
+
+from content_negotiation import (
+    CharsetNegotiator,
+    decide_charset,
+    NoAgreeableCharsetError,
+)
+from content_negotiation.charset_negotiation import (
+    _charset_negotiator,
+    fold_charset,
+    WeightedCharset,
+)
+
+SUPPORTED_CHARSETS = ["utf-8", "ISO-8859-1", "windows-1252"]
+
+
+def test_charset_negotiation() -> None:
+    """Should return the supported charset with the highest q-value."""
+    accept_charset_header: List[str] = ["iso-8859-1;q=0.5, utf-8"]
+    charset = decide_charset(accept_charset_header, SUPPORTED_CHARSETS)
+    assert "utf-8" == charset, f"For {accept_charset_header!r}, should be utf-8."
+
+
+def test_charset_negotiation_is_case_insensitive() -> None:
+    """Should return the supported spelling of the charset."""
+    accept_charset_header: List[str] = ["Iso-8859-1"]
+    charset = decide_charset(accept_charset_header, SUPPORTED_CHARSETS)
+    assert "ISO-8859-1" == charset
+
+
+def test_charset_negotiation_folds_aliases() -> None:
+    """Should match aliases of the supported charsets."""
+    for accept_charset_header, expected in [
+        (["latin1"], "ISO-8859-1"),
+        (["cp1252"], "windows-1252"),
+        (["UTF8;q=0.9, l1;q=0.8"], "utf-8"),
+    ]:
+        charset = decide_charset(accept_charset_header, SUPPORTED_CHARSETS)
+        assert expected == charset, f"For {accept_charset_header!r}."
+
+
+def test_charset_negotiation_folds_supported_aliases() -> None:
+    """Should match the preferred name of a supported alias."""
+    charset = decide_charset(["iso-8859-1"], ["utf-8", "latin1"])
+    assert "latin1" == charset
+
+
+def test_charset_negotiation_wildcard() -> None:
+    """Should return the first supported charset not mentioned in the header."""
+    for accept_charset_header, expected in [
+        (["*"], "utf-8"),
+        (["utf-8;q=0, *"], "ISO-8859-1"),
+        (["utf-8;q=0, latin1;q=0, *"], "windows-1252"),
+        (["*, utf-8;q=0.5"], "ISO-8859-1"),
+    ]:
+        charset = decide_charset(accept_charset_header, SUPPORTED_CHARSETS)
+        assert expected == charset, f"For {accept_charset_header!r}."
+
+
+def test_charset_negotiation_wildcard_with_all_charsets_mentioned() -> None:
+    """Should fall back to the mentioned charsets with lower q-values."""
+    charset = decide_charset(["*, utf-8;q=0.5"], ["utf-8", "utf8"])
+    assert "utf-8" == charset
+
+
+def test_charset_negotiation_no_accept_charset_header() -> None:
+    """Should return the default charset."""
+    for accept_charset_header in [[], [""], [" , "]]:
+        charset = decide_charset(accept_charset_header, SUPPORTED_CHARSETS)
+        assert "utf-8" == charset, f"For {accept_charset_header!r}."
+
+
+def test_charset_negotiation_unmentioned_charsets_are_not_acceptable() -> None:
+    """Should raise NoAgreeableCharsetError."""
+    for accept_charset_header in [["koi8-r"], ["utf-8;q=0"], ["*;q=0"]]:
+        with pytest.raises(NoAgreeableCharsetError):
+            _ = decide_charset(accept_charset_header, SUPPORTED_CHARSETS)
+
+
+def test_charset_negotiation_invalid_q() -> None:
+    """Should ignore charset ranges with an invalid q-value."""
+    charset = decide_charset(["utf-8;q=x, latin1;q=0.5"], SUPPORTED_CHARSETS)
+    assert "ISO-8859-1" == charset
+    charset = decide_charset(["utf-8;q=nan, latin1;q=0.5"], SUPPORTED_CHARSETS)
+    assert "ISO-8859-1" == charset
+
+
+def test_charset_negotiation_q_is_case_insensitive() -> None:
+    """Should read the q parameter whatever its case, as media ranges do."""
+    charset = decide_charset(["utf-8;Q=0, iso-8859-1;q=0.5"], SUPPORTED_CHARSETS)
+    assert "ISO-8859-1" == charset
+
+
+def test_charset_negotiation_no_supported_charsets() -> None:
+    """Should raise NoAgreeableCharsetError."""
+    with pytest.raises(NoAgreeableCharsetError):
+        _ = decide_charset(["*"], [])
+
+
+def test_decide_charset_caches_negotiators() -> None:
+    """Should compile one frozen negotiator per list of supported charsets."""
+    _charset_negotiator.cache_clear()
+    assert decide_charset(["iso-8859-1"], ["utf-8", "latin1"]) == "latin1"
+    assert decide_charset(["iso-8859-1"], ["utf-8", "latin1"]) == "latin1"
+    assert _charset_negotiator.cache_info().hits == 1
+    negotiator = _charset_negotiator(("utf-8", "latin1"))
+    assert negotiator.frozen
+    assert negotiator.supported_charsets == ("utf-8", "latin1")
+
+
+def test_charset_negotiator_custom_aliases() -> None:
+    """Should fold the given aliases."""
+    negotiator = CharsetNegotiator(["utf-8"], aliases={"u8": "utf-8"})
+    assert negotiator.decide(["u8"]) == "utf-8"
+    with pytest.raises(NoAgreeableCharsetError):
+        _ = negotiator.decide(["utf8"])
+
+
+def test_fold_charset() -> None:
+    """Should return the preferred name in lower case."""
+    assert fold_charset(" Latin-1 ") == "iso-8859-1"
+    assert fold_charset("KOI8-R") == "koi8-r"
+
+
+def test_weighted_charset_is_immutable() -> None:
+    """Should raise AttributeError when modifying a weighted charset."""
+    wc = WeightedCharset("utf-8;q=0.5")
+    with pytest.raises(AttributeError):
+        wc.q = 1.0
+    with pytest.raises(AttributeError):
+        del wc.q
+    assert str(wc) == "utf-8;q=0.5"
@@ -0,0 +1,151 @@
+"""Test cases for the generated matchers."""
+
+import ast
+import inspect
+import logging
+from typing import List
+
+import pytest
+
+from content_negotiation import codegen
+from content_negotiation import (
+    decide_content_type,
+    NoAgreeableContentTypeError,
+    parse_accept,
+)
+from content_negotiation.codegen import answers, compile_matcher, generate_source
+
+SUPPORTED_CONTENT_TYPES = ["text/turtle", "application/ld+json", "application/rdf+xml"]
+
+
+@pytest.mark.parametrize(
+    "accept_headers, content_type",
+    [
+        ([], "text/turtle"),
+        (["application/*;q=0.9, text/plain"], "application/ld+json"),
+        (["application/rdf+xml, */*;q=0.1"], "application/rdf+xml"),
+        (["image/png, */*;q=0.1"], "text/turtle"),
+        (["*/*, text/turtle;q=0"], "application/ld+json"),
+    ],
+)
+def test_compile_matcher(accept_headers: List[str], content_type: str) -> None:
+    """Should decide as decide_content_type, on raw and parsed headers."""
+    matcher = compile_matcher(SUPPORTED_CONTENT_TYPES)
+    assert decide_content_type(accept_headers, SUPPORTED_CONTENT_TYPES) == content_type
+    assert matcher(accept_headers) == content_type
+    assert matcher(parse_accept(accept_headers)) == content_type
+
+
+@pytest.mark.parametrize(
+    "supported, accept_headers",
+    [
+        (SUPPORTED_CONTENT_TYPES, ["image/png"]),
+        (SUPPORTED_CONTENT_TYPES, ["text"]),
+        (SUPPORTED_CONTENT_TYPES, ["*/*;q=0"]),
+        ([], ["text/turtle"]),
+    ],
+)
+def test_compile_matcher_no_agreeable(
+    supported: List[str], accept_headers: List[str]
+) -> None:
+    """Should raise NoAgreeableContentTypeError where decide_content_type does."""
+    with pytest.raises(NoAgreeableContentTypeError):
+        compile_matcher(supported)(accept_headers)
+
+
+def test_compile_matcher_is_cached() -> None:
+    """Should return the same matcher for equal lists."""
+    assert compile_matcher(SUPPORTED_CONTENT_TYPES) is compile_matcher(
+        list(SUPPORTED_CONTENT_TYPES)
+    )
+    assert compile_matcher(SUPPORTED_CONTENT_TYPES) is not compile_matcher(
+        SUPPORTED_CONTENT_TYPES[::-1]
+    )
+
+
+def test_answers() -> None:
+    """Should answer supported content types before wildcards, and "*/*" last."""
+    assert answers(["*/foo", "text/*", "text/turtle;qs=0.5", "text/turtle", "*/*"]) == {
+        "*": {"foo": "*/foo", "*": "*/*"},
+        "text": {"*": "text/*", "turtle": "text/turtle"},
+    }
+    assert answers(["*/foo", "text"]) == {
+        "*": {"foo": "*/foo", "*": "*/foo"},
+        "text": {"*": "text"},
+    }
+    assert answers([]) == {}
+
+
+def test_generate_source() -> None:
+    """Should inline the default content type and the answers as literals."""
+    source = generate_source("matcher", ["text/turtle"])
+    assert source.startswith(
+        "MATCHES = {'text': {'turtle': 'text/turtle', '*': 'text/turtle'}, "
+        "'*': {'*': 'text/turtle'}}\n\ndef matcher(accept_headers):\n"
+    )
+    assert "return 'text/turtle'" in source
+
+
+class _Hostile(str):
+    """String with a repr that is code."""
+
+    def __repr__(self) -> str:
+        """Return code."""
+        return "print('INJECTED')"
+
+
+@pytest.mark.parametrize(
+    "hostile",
+    [
+        'a/b"""; print("INJECTED") #',
+        "a/b'''; print('INJECTED') #",
+        "a/b'; print('INJECTED') #",
+        'a/b\\"\n    print("INJECTED")',
+        _Hostile("a/hostile"),
+    ],
+)
+def test_generated_source_is_not_injectable(
+    hostile: str, capsys: pytest.CaptureFixture
+) -> None:
+    """Should run no code from the supported content types, however quoted."""
+    supported = ["text/turtle", hostile, _Hostile("b/hostile")]
+    codegen._compile.cache_clear()
+    matcher = compile_matcher(supported)
+    for accept_headers in (["a/*"], ["b/*"], ["*/*"]):
+        assert matcher(accept_headers) == decide_content_type(accept_headers, supported)
+    assert "INJECTED" not in capsys.readouterr().out
+    # The source is the MATCHES literal and the function, with a fixed docstring:
+    tree = ast.parse(generate_source("matcher", supported))
+    assign, function = tree.body
+    assert isinstance(assign, ast.Assign)
+    assert ast.literal_eval(assign.value) == answers(supported)
+    assert isinstance(function, ast.FunctionDef)
+    assert ast.get_docstring(function) == (
+        "Decide the content type against SUPPORTED_CONTENT_TYPES."
+    )
+
+
+def test_matcher_source_is_inspectable() -> None:
+    """Should keep the generated source for inspect and tracebacks."""
+    source = inspect.getsource(compile_matcher(["text/turtle", "text/html"]))
+    assert source.startswith("def decide_content_type_matcher(accept_headers):")
+
+
+def test_mismatch_falls_back_to_decide_content_type(
+    monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Should decide with decide_content_type when the generated matcher is wrong."""
+    wrong_source = generate_source
+    monkeypatch.setattr(
+        codegen,
+        "generate_source",
+        lambda name, supported: wrong_source(name, supported[::-1]),
+    )
+    codegen._compile.cache_clear()
+    try:
+        with caplog.at_level(logging.WARNING, logger="content_negotiation.codegen"):
+            matcher = compile_matcher(["text/n3", "application/n-triples"])
+    finally:
+        codegen._compile.cache_clear()
+    assert "unlike decide_content_type" in caplog.text
+    assert matcher(["*/*"]) == "text/n3"
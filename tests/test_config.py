@@ -0,0 +1,143 @@
+"""Test cases for the negotiator configuration loader."""
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from content_negotiation.config import ConfigError, NegotiatorConfig
+
+CONFIG = """
+[routes."/datasets"]
+content_types = ["text/turtle", "application/ld+json"]
+languages = ["nb", "en"]
+language_equivalents = [["no", "nb", "nb-NO"]]
+
+[routes."/datasets".language_fallbacks]
+nn = ["nb"]
+
+[routes."/concepts"]
+content_types = ["text/turtle", "application/rdf+xml;qs=0.5"]
+structured_suffixes = true
+"""
+
+
+def _write(path: Path, text: str, mtime_ns: int) -> None:
+    """Write the configuration file, with the given modification time."""
+    path.write_text(text)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_load_toml(tmp_path: Path) -> None:
+    """Should compile the negotiators of every route."""
+    path = tmp_path / "negotiation.toml"
+    _write(path, CONFIG, 1_000_000_000)
+    config = NegotiatorConfig(str(path))
+    datasets = config.routes["/datasets"]
+    assert datasets.content_negotiator.decide(["application/*"]) == (
+        "application/ld+json"
+    )
+    assert datasets.language_negotiator is not None
+    assert datasets.language_negotiator.decide(["en"]) == "en"
+    assert datasets.language_negotiator.decide(["nb-NO"]) == "nb"
+    assert datasets.language_negotiator.decide(["nn"]) == "nb"
+    concepts = config.routes["/concepts"]
+    assert concepts.content_negotiator.structured_suffixes is True
+    assert concepts.language_negotiator is None
+
+
+def test_load_json(tmp_path: Path) -> None:
+    """Should load a JSON configuration file."""
+    path = tmp_path / "negotiation.json"
+    path.write_text(json.dumps({"routes": {"/": {"content_types": ["text/html"]}}}))
+    config = NegotiatorConfig(str(path))
+    assert config.routes["/"].content_negotiator.decide([]) == "text/html"
+
+
+def test_routes_share_negotiators(tmp_path: Path) -> None:
+    """Should share one negotiator between the routes with the same lists."""
+    path = tmp_path / "negotiation.json"
+    spec = {"content_types": ["text/turtle", "text/html"], "languages": ["nb", "en"]}
+    routes = {f"/route-{i}": spec for i in range(500)}
+    routes["/other"] = {"content_types": ["text/html"]}
+    path.write_text(json.dumps({"routes": routes}))
+    config = NegotiatorConfig(str(path))
+    assert len({id(r.content_negotiator) for r in config.routes.values()}) == 2
+    assert len({id(r.language_negotiator) for r in config.routes.values()}) == 2
+
+
+def test_reload_only_changed_routes(tmp_path: Path) -> None:
+    """Should compile only the changed routes, in a new snapshot."""
+    path = tmp_path / "negotiation.toml"
+    _write(path, CONFIG, 1_000_000_000)
+    config = NegotiatorConfig(str(path))
+    routes = config.routes
+    assert config.reload() is False
+    assert config.routes is routes
+
+    _write(
+        path,
+        CONFIG.replace('"text/turtle", "application/ld+json"', '"application/ld+json"')
+        + '\n[routes."/"]\ncontent_types = ["text/html"]\n',
+        2_000_000_000,
+    )
+    assert config.reload() is True
+    assert config.routes["/concepts"] is routes["/concepts"]
+    assert config.routes["/datasets"] is not routes["/datasets"]
+    assert config.routes["/datasets"].content_negotiator.decide(["*/*"]) == (
+        "application/ld+json"
+    )
+    assert sorted(config.routes) == ["/", "/concepts", "/datasets"]
+    # The previous snapshot is left as it was:
+    assert routes["/datasets"].content_negotiator.decide(["*/*"]) == "text/turtle"
+    assert sorted(routes) == ["/concepts", "/datasets"]
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "routes = [",
+        "routes = 1",
+        '[routes]\n"/" = 1',
+        '[routes."/"]\nlanguages = ["nb"]',
+        '[routes."/"]\ncontent_types = "text/html"',
+        '[routes."/"]\ncontent_types = ["text/html"]\nstructured_suffixes = 1',
+        '[routes."/"]\ncontent_types = ["text/html;qs=2"]',
+        '[routes."/"]\ncontent_types = ["text/html"]\nlanguage_equivalents = ["nb"]',
+        '[routes."/"]\ncontent_types = ["text/html"]\nlanguage_fallbacks = ["nb"]',
+        '[routes."/"]\ncontent_types = ["text/html"]\nlanguage_fallbacks = {no = 1}',
+    ],
+)
+def test_invalid_config_keeps_routes(tmp_path: Path, text: str) -> None:
+    """Should raise ConfigError, and leave the routes as they were."""
+    path = tmp_path / "negotiation.toml"
+    _write(path, CONFIG, 1_000_000_000)
+    config = NegotiatorConfig(str(path))
+    routes = config.routes
+
+    _write(path, text, 2_000_000_000)
+    with pytest.raises(ConfigError):
+        config.reload()
+    assert config.routes is routes
+
+
+def test_invalid_config_raises_once(tmp_path: Path) -> None:
+    """Should raise once per invalid file, and reload once it changes again."""
+    path = tmp_path / "negotiation.toml"
+    _write(path, CONFIG, 1_000_000_000)
+    config = NegotiatorConfig(str(path))
+    routes = config.routes
+
+    _write(path, "routes = 1", 2_000_000_000)
+    with pytest.raises(ConfigError):
+        config.reload()
+    assert config.reload() is False
+    assert config.reload() is False
+    assert config.routes is routes
+
+    _write(path, CONFIG.replace('"en"', '"en", "nn"'), 3_000_000_000)
+    assert config.reload() is True
+    assert config.routes["/datasets"].language_negotiator is not None
+    assert config.routes["/datasets"] is not routes["/datasets"]
+    assert config.routes["/concepts"] is routes["/concepts"]
@@ -4,7 +4,11 @@ from typing import List
 
 import pytest
 
-from content_negotiation import decide_content_type, NoAgreeableContentTypeError
+from content_negotiation import (
+    ContentNegotiator,
+    decide_content_type,
+    NoAgreeableContentTypeError,
+)
 
 SUPPORTED_CONTENT_TYPES = [
     "text/turtle",
@@ -187,3 +191,65 @@ def test_content_negotiation_header_contains_only_empty_string() -> None:
     accept_header: List[str] = [""]
     with pytest.raises(NoAgreeableContentTypeError):
         _ = decide_content_type(accept_header, SUPPORTED_CONTENT_TYPES)
+
+
+def test_content_negotiator() -> None:
+    """Should decide the same content types as decide_content_type."""
+    negotiator = ContentNegotiator(SUPPORTED_CONTENT_TYPES)
+    for accept_header in [
+        ["text/turtle", "application/ld+json"],
+        ["application/ld+json", "text/turtle"],
+        ["not/acceptable", "*/*"],
+        ["application/json", "application/*", "*/*"],
+        ["application/*", "text/turtle;q=0.2"],
+        ["application/json;q=0.0"],
+        [],
+    ]:
+        assert negotiator.decide(accept_header) == decide_content_type(
+            accept_header, SUPPORTED_CONTENT_TYPES
+        ), f"For header-value {accept_header!r}."
+
+
+def test_content_negotiator_no_agreeable_content_type() -> None:
+    """Should raise NoAgreeableContentTypeError."""
+    negotiator = ContentNegotiator(SUPPORTED_CONTENT_TYPES)
+    for accept_header in [["text/"], ["audio/*"], [""]]:
+        with pytest.raises(NoAgreeableContentTypeError):
+            _ = negotiator.decide(accept_header)
+
+
+def test_content_negotiator_no_supported_content_types() -> None:
+    """Should raise NoAgreeableContentTypeError."""
+    with pytest.raises(NoAgreeableContentTypeError):
+        _ = ContentNegotiator([]).decide(["*/*"])
+
+
+def test_debug_logging(caplog: pytest.LogCaptureFixture) -> None:
+    """Should log the sorted media ranges to the module logger at debug level."""
+    with caplog.at_level("DEBUG", logger="content_negotiation.content_negotiation"):
+        decide_content_type(["text/*;q=0.5,text/turtle"], SUPPORTED_CONTENT_TYPES)
+    assert "Accept weighted media ranges sorted: text/turtle;q=1.0, text/*;q=0.5" in (
+        caplog.text
+    )
+
+
+@pytest.mark.parametrize(
+    "accept_header, content_type",
+    [
+        # Optional whitespace around list elements is not part of the media range:
+        (["text/html, application/ld+json"], "application/ld+json"),
+        (["text/html,\tapplication/ld+json ; q=0.5"], "application/ld+json"),
+        # The q parameter name is case-insensitive:
+        (["application/ld+json;Q=0.1, text/turtle;q=0.5"], "text/turtle"),
+        # A q-value that is not a number invalidates the media range:
+        (["application/ld+json;q=nan, text/turtle;q=0.5"], "text/turtle"),
+    ],
+)
+def test_content_negotiation_tokenizes_as_rfc_7231(
+    accept_header: List[str], content_type: str
+) -> None:
+    """Should tokenize the accept header as RFC 7231 specifies."""
+    assert decide_content_type(accept_header, SUPPORTED_CONTENT_TYPES) == content_type
+    assert ContentNegotiator(SUPPORTED_CONTENT_TYPES).decide(accept_header) == (
+        content_type
+    )
@@ -0,0 +1,99 @@
+"""Test cases for the precomputed decisions of compiled negotiators."""
+
+import pytest
+
+from content_negotiation import (
+    ContentNegotiator,
+    decide_content_type,
+    decide_language,
+    LanguageNegotiator,
+    NoAgreeableContentTypeError,
+    NoAgreeableLanguageError,
+)
+from content_negotiation.content_negotiation import KNOWN_ACCEPT_HEADERS
+from content_negotiation.language_negotiation import KNOWN_ACCEPT_LANGUAGE_HEADERS
+
+SUPPORTED_CONTENT_TYPES = ["text/turtle", "application/ld+json", "text/html"]
+SUPPORTED_LANGUAGES = ["nb", "nn", "en"]
+
+
+def test_known_accept_headers_are_decided_up_front() -> None:
+    """Should decide the known accept headers, and their keys, as the reference."""
+    negotiator = ContentNegotiator(SUPPORTED_CONTENT_TYPES)
+    assert set(KNOWN_ACCEPT_HEADERS) <= set(negotiator.decisions)
+    for header, content_type in negotiator.decisions.items():
+        if content_type is None:
+            with pytest.raises(NoAgreeableContentTypeError):
+                _ = decide_content_type([header], SUPPORTED_CONTENT_TYPES)
+        else:
+            assert content_type == decide_content_type(
+                [header], SUPPORTED_CONTENT_TYPES
+            )
+
+
+def test_decisions_are_read_only() -> None:
+    """Should not allow modifying the decisions."""
+    negotiator = ContentNegotiator(SUPPORTED_CONTENT_TYPES)
+    with pytest.raises(TypeError):
+        negotiator.decisions["*/*"] = "text/html"  # type: ignore
+
+
+def test_decide_uses_decisions_before_parsing() -> None:
+    """Should return the precomputed decision without parsing."""
+    negotiator = ContentNegotiator(SUPPORTED_CONTENT_TYPES, known_headers=["x/y"])
+    negotiator.decisions = {"x/y": "text/html"}  # type: ignore
+    assert negotiator.decide(["x/y"]) == "text/html"
+
+
+def test_decide_joins_multiple_headers() -> None:
+    """Should look up multiple accept headers by their comma-joined values."""
+    negotiator = ContentNegotiator(
+        SUPPORTED_CONTENT_TYPES, known_headers=["audio/*,application/ld+json"]
+    )
+    assert negotiator.decide(["audio/*", "application/ld+json"]) == (
+        "application/ld+json"
+    )
+
+
+def test_decide_known_header_without_agreeable_content_type() -> None:
+    """Should raise NoAgreeableContentTypeError for a known header."""
+    negotiator = ContentNegotiator(SUPPORTED_CONTENT_TYPES, known_headers=["audio/*"])
+    assert negotiator.decisions == {"audio/*": None}
+    with pytest.raises(NoAgreeableContentTypeError):
+        _ = negotiator.decide(["audio/*"])
+
+
+def test_no_decisions_without_supported_content_types() -> None:
+    """Should not decide known headers when no content types are supported."""
+    negotiator = ContentNegotiator([])
+    assert negotiator.decisions == {}
+    with pytest.raises(NoAgreeableContentTypeError):
+        _ = negotiator.decide(["*/*"])
+
+
+def test_known_accept_language_headers_are_decided_up_front() -> None:
+    """Should decide the known accept-language headers as decide_language does."""
+    negotiator = LanguageNegotiator(SUPPORTED_LANGUAGES)
+    assert set(negotiator.decisions) == set(KNOWN_ACCEPT_LANGUAGE_HEADERS)
+    for header, language in negotiator.decisions.items():
+        if language is None:
+            with pytest.raises(NoAgreeableLanguageError):
+                _ = decide_language([header], SUPPORTED_LANGUAGES)
+        else:
+            assert language == decide_language([header], SUPPORTED_LANGUAGES)
+    assert negotiator.decide(["en-US", "en;q=0.9"]) == "en"
+
+
+def test_decide_known_accept_language_header_without_agreeable_language() -> None:
+    """Should raise NoAgreeableLanguageError for a known header."""
+    negotiator = LanguageNegotiator(SUPPORTED_LANGUAGES, known_headers=["fr"])
+    with pytest.raises(NoAgreeableLanguageError):
+        _ = negotiator.decide(["fr"])
+
+
+def test_invalid_known_accept_language_header_is_not_decided() -> None:
+    """Should leave an invalid known header to fail when decided."""
+    negotiator = LanguageNegotiator(SUPPORTED_LANGUAGES, known_headers=["nb;q=x"])
+    assert negotiator.decisions == {}
+    with pytest.raises(ValueError):
+        _ = negotiator.decide(["nb;q=x"])
@@ -0,0 +1,276 @@
+"""Differential fuzz tests of the negotiators against the reference functions.
+
+Every engine, i.e. every compiled negotiator, cache and parse-once path, must
+decide exactly what :func:`decide_content_type` and :func:`decide_language` decide,
+or raise the same type of error, for random headers and supported lists.
+
+The headers are drawn from a small alphabet, so that duplicate ranges, equal
+q-values and equal specificities, and thereby the tie-breaks, are common.
+
+The seed and the number of iterations are read from the environment, e.g. for a
+long run with a new seed:
+
+    CONTENT_NEGOTIATION_FUZZ_SEED=$RANDOM CONTENT_NEGOTIATION_FUZZ_ITERATIONS=100000
+"""
+
+import os
+import random
+from typing import Any, Callable, Iterator, List, Tuple
+
+import pytest
+
+from content_negotiation import (
+    ContentNegotiator,
+    decide_content_type,
+    decide_language,
+    iter_content_types,
+    LanguageNegotiator,
+    NoAgreeableContentTypeError,
+    NoAgreeableLanguageError,
+    parse_accept,
+    parse_accept_language,
+)
+from content_negotiation.codegen import compile_matcher
+from content_negotiation.shared_cache import SharedDecisionCache
+from content_negotiation.variants import ContentTypeUniverse, LanguageUniverse
+
+SEED = int(os.environ.get("CONTENT_NEGOTIATION_FUZZ_SEED", "20230901"))
+ITERATIONS = int(os.environ.get("CONTENT_NEGOTIATION_FUZZ_ITERATIONS", "500"))
+
+TYPES = ["text", "application", "image", "audio", "*"]
+SUB_TYPES = ["turtle", "html", "json", "ld+json", "rdf+xml", "xml", "*"]
+Q_VALUES = ["1", "1.0", "0", "0.0", "0.5", "0.500", "0.9", "0.0001", "1.5", "-1", "x"]
+PARAMETERS = ["level=1", "charset=utf-8", "v=b3", "q"]
+MALFORMED_MEDIA_RANGES = ["text", "", "a/b/c", "text/html/", "text /html"]
+SUPPORTED_CONTENT_TYPES = [
+    f"{type}/{sub_type}" for type in TYPES[:-1] for sub_type in SUB_TYPES[:-1]
+] + ["text/html;level=1"]
+
+LANGUAGES = ["nb", "nn", "no", "en", "en-GB", "en-US", "nb-NO", "*", "fr", "EN"]
+SUPPORTED_LANGUAGES = LANGUAGES[:7]
+
+
+def _parameters(rng: random.Random) -> str:
+    """Return random parameters of a range, with a q-value or not."""
+    parameters = []
+    if rng.random() < 0.2:
+        parameters.append(rng.choice(PARAMETERS))
+    if rng.random() < 0.6:
+        parameters.append(f"{rng.choice(['q', 'q', 'Q'])}={rng.choice(Q_VALUES)}")
+    return "".join(rng.choice([";", ";", "; "]) + parameter for parameter in parameters)
+
+
+def random_accept_headers(rng: random.Random) -> List[str]:
+    """Return random accept headers."""
+    headers = []
+    for _ in range(rng.choice([0, 1, 1, 1, 2, 3])):
+        ranges = []
+        for _ in range(rng.randint(1, 6)):
+            if rng.random() < 0.05:
+                ranges.append(rng.choice(MALFORMED_MEDIA_RANGES))
+                continue
+            media_range = f"{rng.choice(TYPES)}/{rng.choice(SUB_TYPES)}"
+            ranges.append(media_range + _parameters(rng))
+        headers.append(rng.choice([",", ",", ", "]).join(ranges))
+    return headers
+
+
+def random_accept_language_headers(rng: random.Random) -> List[str]:
+    """Return random accept-language headers."""
+    headers = []
+    for _ in range(rng.choice([0, 1, 1, 1, 2])):
+        ranges = [
+            rng.choice(LANGUAGES) + _parameters(rng) for _ in range(rng.randint(1, 5))
+        ]
+        headers.append(",".join(ranges))
+    return headers
+
+
+def random_supported(rng: random.Random, population: List[str]) -> List[str]:
+    """Return a random list of supported values, possibly empty or with duplicates."""
+    supported = rng.sample(population, rng.choice([0, 1, 2, 3, 4, 6]))
+    if supported and rng.random() < 0.1:
+        supported.append(rng.choice(supported))
+    return supported
+
+
+def outcome(decide: Callable, *args: Any) -> Any:
+    """Return the decision, or the type of the error raised."""
+    try:
+        return decide(*args)
+    except Exception as e:
+        return type(e)
+
+
+def _first(iterator: Iterator[str]) -> str:
+    """Return the first content type yielded, as a decision."""
+    for content_type in iterator:
+        return content_type
+    raise NoAgreeableContentTypeError("No content type yielded.")
+
+
+def _negotiated(accept_headers: List[str], supported: List[str]) -> str:
+    """Return the content type of the negotiation, as a decision."""
+    negotiation = ContentNegotiator(supported, known_headers=()).negotiate(
+        accept_headers
+    )
+    if negotiation.content_type is None:
+        raise NoAgreeableContentTypeError("Not acceptable.")
+    return negotiation.content_type
+
+
+def _shared_cache_decisions(accept_headers: List[str], supported: List[str]) -> str:
+    """Decide twice through a shared decision cache, and return the cached decision."""
+    with SharedDecisionCache(slots=8) as cache:
+        try:
+            negotiator = ContentNegotiator(supported, known_headers=(), cache=cache)
+            miss = outcome(negotiator.decide, accept_headers)
+            hit = outcome(negotiator.decide, accept_headers)
+            del negotiator
+        finally:
+            cache.unlink()
+    assert miss == hit
+    if isinstance(hit, type):
+        raise hit()
+    return hit
+
+
+def _content_type_universe(accept_headers: List[str], supported: List[str]) -> str:
+    """Decide against the mask of the supported content types in a universe."""
+    universe = ContentTypeUniverse([*supported, *SUPPORTED_CONTENT_TYPES])
+    return universe.decide(accept_headers, universe.mask(supported))
+
+
+def _language_universe(accept_language_headers: List[str], supported: List[str]) -> str:
+    """Decide against the mask of the supported languages in a universe."""
+    universe = LanguageUniverse([*supported, *SUPPORTED_LANGUAGES])
+    return universe.decide(accept_language_headers, universe.mask(supported))
+
+
+def _parse_language_once(decide: Callable) -> Callable[[List[str], List[str]], str]:
+    """Return an engine deciding on accept-language headers parsed up front."""
+
+    def engine(accept_language_headers: List[str], supported: List[str]) -> str:
+        try:
+            parsed = parse_accept_language(accept_language_headers)
+        except ValueError:
+            # Parsing up front raises on an invalid q-value, where the reference
+            # first finds that no languages are supported:
+            if not supported:
+                raise NoAgreeableLanguageError() from None
+            raise
+        return decide(parsed, supported)
+
+    return engine
+
+
+# Engines deciding a content type, by accept headers and supported content types:
+CONTENT_TYPE_ENGINES: List[Tuple[str, Callable[[List[str], List[str]], str]]] = [
+    (
+        "ContentNegotiator.decide",
+        lambda a, s: ContentNegotiator(s, known_headers=()).decide(a),
+    ),
+    (
+        "ContentNegotiator.decisions",
+        lambda a, s: ContentNegotiator(s, known_headers=[",".join(a)]).decide(a),
+    ),
+    (
+        "ContentNegotiator.decide(ParsedAccept)",
+        lambda a, s: ContentNegotiator(s, known_headers=()).decide(parse_accept(a)),
+    ),
+    (
+        "decide_content_type(ParsedAccept)",
+        lambda a, s: decide_content_type(parse_accept(a), s),
+    ),
+    (
+        "decide_content_type(ParsedAccept.key)",
+        lambda a, s: decide_content_type([parse_accept(a).key], s),
+    ),
+    ("iter_content_types", lambda a, s: _first(iter_content_types(a, s))),
+    ("compile_matcher", lambda a, s: compile_matcher(s)(a)),
+    (
+        "compile_matcher(ParsedAccept)",
+        lambda a, s: compile_matcher(s)(parse_accept(a)),
+    ),
+    ("ContentNegotiator.negotiate", _negotiated),
+    ("SharedDecisionCache", _shared_cache_decisions),
+    ("ContentTypeUniverse", _content_type_universe),
+]
+
+# Engines deciding a language, by accept-language headers and supported languages:
+LANGUAGE_ENGINES: List[Tuple[str, Callable[[List[str], List[str]], str]]] = [
+    (
+        "LanguageNegotiator.decide",
+        lambda a, s: LanguageNegotiator(s, known_headers=()).decide(a),
+    ),
+    (
+        "LanguageNegotiator.decisions",
+        lambda a, s: LanguageNegotiator(s, known_headers=[",".join(a)]).decide(a),
+    ),
+    (
+        "LanguageNegotiator.decide(ParsedAcceptLanguage)",
+        _parse_language_once(
+            lambda p, s: LanguageNegotiator(s, known_headers=()).decide(p)
+        ),
+    ),
+    (
+        "decide_language(ParsedAcceptLanguage)",
+        _parse_language_once(decide_language),
+    ),
+    (
+        "decide_language(ParsedAcceptLanguage.key)",
+        _parse_language_once(lambda p, s: decide_language([p.key], s)),
+    ),
+    ("LanguageUniverse", _language_universe),
+]
+
+
+@pytest.mark.parametrize(
+    "name,engine", CONTENT_TYPE_ENGINES, ids=[n for n, _ in CONTENT_TYPE_ENGINES]
+)
+def test_content_type_engines(
+    name: str, engine: Callable[[List[str], List[str]], str]
+) -> None:
+    """Should decide what decide_content_type decides, for random input."""
+    rng = random.Random(f"{SEED}-{name}")  # noqa: S311
+    iterations = ITERATIONS // 10 if name == "SharedDecisionCache" else ITERATIONS
+    for iteration in range(iterations):
+        accept_headers = random_accept_headers(rng)
+        supported = random_supported(rng, SUPPORTED_CONTENT_TYPES)
+        expected = outcome(decide_content_type, accept_headers, supported)
+        assert outcome(engine, accept_headers, supported) == expected, (
+            f"Seed {SEED}, iteration {iteration}: {name} decided "
+            f"{accept_headers!r} against {supported!r} differently."
+        )
+
+
+@pytest.mark.parametrize(
+    "name,engine", LANGUAGE_ENGINES, ids=[n for n, _ in LANGUAGE_ENGINES]
+)
+def test_language_engines(
+    name: str, engine: Callable[[List[str], List[str]], str]
+) -> None:
+    """Should decide what decide_language decides, for random input."""
+    rng = random.Random(f"{SEED}-{name}")  # noqa: S311
+    for iteration in range(ITERATIONS):
+        accept_language_headers = random_accept_language_headers(rng)
+        supported = random_supported(rng, SUPPORTED_LANGUAGES)
+        expected = outcome(decide_language, accept_language_headers, supported)
+        assert outcome(engine, accept_language_headers, supported) == expected, (
+            f"Seed {SEED}, iteration {iteration}: {name} decided "
+            f"{accept_language_headers!r} against {supported!r} differently."
+        )
+
+
+def test_tie_break_first_listed_range_wins() -> None:
+    """Should decide the first listed of ranges with equal q and specificity."""
+    supported = ["text/turtle", "application/ld+json"]
+    for accept_headers in (
+        ["application/ld+json;q=0.5,text/turtle;q=0.5"],
+        ["application/ld+json;q=0.5", "text/turtle;q=0.5"],
+        ["application/*,text/*"],
+    ):
+        expected = decide_content_type(accept_headers, supported)
+        assert expected == "application/ld+json"
+        for name, engine in CONTENT_TYPE_ENGINES:
+            assert engine(accept_headers, supported) == expected, name
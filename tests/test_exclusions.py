@@ -0,0 +1,179 @@
+"""Test cases for ranges with a q-value of 0.0, which wildcards do not match."""
+
+from typing import List
+
+import pytest
+
+from content_negotiation import (
+    ContentNegotiator,
+    decide_content_type,
+    decide_language,
+    iter_content_types,
+    LanguageNegotiator,
+    NoAgreeableContentTypeError,
+    NoAgreeableLanguageError,
+    parse_accept,
+    parse_accept_language,
+)
+from content_negotiation.variants import ContentTypeUniverse, LanguageUniverse
+
+SUPPORTED_CONTENT_TYPES = [
+    "application/rdf+xml",
+    "text/turtle",
+    "application/ld+json",
+    "text/html;level=1",
+]
+
+
+@pytest.mark.parametrize(
+    "accept_headers,expected",
+    [
+        (["*/*, application/rdf+xml;q=0"], "text/turtle"),
+        (["application/*, application/rdf+xml;q=0"], "application/ld+json"),
+        (["*/*, application/*;q=0"], "text/turtle"),
+        (["*/*, application/*;q=0, text/turtle;q=0"], "text/html;level=1"),
+        (["application/*, application/*;q=0"], "application/rdf+xml"),
+        (
+            ["application/rdf+xml;q=0.5, */*;q=0.1, text/turtle;q=0"],
+            "application/rdf+xml",
+        ),
+        (["application/rdf+xml;q=0"], "text/turtle"),
+        (["text/*, text/html;q=0"], "text/turtle"),
+    ],
+)
+def test_wildcards_skip_excluded_content_types(
+    accept_headers: List[str], expected: str
+) -> None:
+    """Should decide the first content type a wildcard matches that is not excluded."""
+    assert decide_content_type(accept_headers, SUPPORTED_CONTENT_TYPES) == expected
+    negotiator = ContentNegotiator(SUPPORTED_CONTENT_TYPES, known_headers=())
+    assert negotiator.decide(accept_headers) == expected
+    assert negotiator.decide(parse_accept(accept_headers)) == expected
+    assert next(iter_content_types(accept_headers, SUPPORTED_CONTENT_TYPES)) == expected
+    universe = ContentTypeUniverse(SUPPORTED_CONTENT_TYPES)
+    assert universe.decide(accept_headers, universe.full_mask) == expected
+
+
+@pytest.mark.parametrize(
+    "accept_headers",
+    [
+        ["*/*;q=0"],
+        ["application/*, application/rdf+xml;q=0, application/ld+json;q=0"],
+        ["text/turtle;q=0", "*/*;q=0"],
+    ],
+)
+def test_every_content_type_excluded(accept_headers: List[str]) -> None:
+    """Should raise NoAgreeableContentTypeError when every match is excluded."""
+    supported = SUPPORTED_CONTENT_TYPES[:3]
+    with pytest.raises(NoAgreeableContentTypeError):
+        decide_content_type(accept_headers, supported)
+    with pytest.raises(NoAgreeableContentTypeError):
+        ContentNegotiator(supported, known_headers=()).decide(accept_headers)
+    assert list(iter_content_types(accept_headers, supported)) == []
+    universe = ContentTypeUniverse(supported)
+    with pytest.raises(NoAgreeableContentTypeError):
+        universe.decide(accept_headers, universe.full_mask)
+
+
+def test_exact_ranges_are_not_excluded() -> None:
+    """Should decide an acceptable exact range, despite a wildcard exclusion."""
+    accept_headers = ["application/*;q=0, application/ld+json;q=0.5"]
+    assert (
+        decide_content_type(accept_headers, SUPPORTED_CONTENT_TYPES)
+        == "application/ld+json"
+    )
+    universe = ContentTypeUniverse(SUPPORTED_CONTENT_TYPES)
+    assert universe.decide(accept_headers, universe.full_mask) == "application/ld+json"
+
+
+def test_iter_content_types_skips_excluded() -> None:
+    """Should never yield an excluded content type for a wildcard."""
+    assert list(
+        iter_content_types(["*/*, application/rdf+xml;q=0"], SUPPORTED_CONTENT_TYPES)
+    ) == ["text/turtle", "application/ld+json", "text/html;level=1"]
+
+
+def test_server_qualities_skip_excluded() -> None:
+    """Should score only content types that are not excluded."""
+    negotiator = ContentNegotiator(
+        ["application/rdf+xml", "text/turtle;qs=0.5"], known_headers=()
+    )
+    assert negotiator.decide(["*/*, application/rdf+xml;q=0"]) == "text/turtle"
+
+
+def test_structured_suffixes_skip_excluded() -> None:
+    """Should not match an excluded content type by structured syntax suffix."""
+    negotiator = ContentNegotiator(
+        ["application/ld+json", "application/activity+json"],
+        known_headers=(),
+        structured_suffixes=True,
+    )
+    assert (
+        negotiator.decide(["application/*+json, application/ld+json;q=0"])
+        == "application/activity+json"
+    )
+
+
+def test_decisions_are_keyed_with_exclusions() -> None:
+    """Should key, and so decide, exclusions apart from the headers without them."""
+    negotiator = ContentNegotiator(SUPPORTED_CONTENT_TYPES, known_headers=["*/*"])
+    assert negotiator.decide(["*/*"]) == "application/rdf+xml"
+    assert negotiator.decide(["*/*, application/rdf+xml;q=0"]) == "text/turtle"
+    accept = parse_accept(["application/rdf+xml;q=0, */*, text/html;Q=0"])
+    assert accept.key == "*/*,application/rdf+xml;q=0,text/html;q=0"
+    assert parse_accept(["text/turtle;q=0"]).key == "*/*,text/turtle;q=0"
+    assert parse_accept(["*/*;q=0"]).key == "*/*;q=0"
+
+
+@pytest.mark.parametrize(
+    "accept_language_headers,expected",
+    [
+        (["*, en;q=0"], "nb"),
+        (["en;q=0"], "nb"),
+        (["fr, *;q=0.5, en;q=0, nb;q=0"], "nn"),
+        (["en, *;q=0.5, en;q=0"], "en"),
+    ],
+)
+def test_star_skips_excluded_languages(
+    accept_language_headers: List[str], expected: str
+) -> None:
+    """Should decide the first language "*" matches that is not excluded."""
+    supported = ["en", "nb", "nn"]
+    assert decide_language(accept_language_headers, supported) == expected
+    negotiator = LanguageNegotiator(supported, known_headers=())
+    assert negotiator.decide(accept_language_headers) == expected
+    universe = LanguageUniverse(supported)
+    assert universe.decide(accept_language_headers, universe.full_mask) == expected
+
+
+@pytest.mark.parametrize(
+    "accept_language_headers", [["*;q=0"], ["*, en;q=0, nb;q=0"], ["en;q=0, nb;q=0"]]
+)
+def test_every_language_excluded(accept_language_headers: List[str]) -> None:
+    """Should raise NoAgreeableLanguageError when every match is excluded."""
+    supported = ["en", "nb"]
+    with pytest.raises(NoAgreeableLanguageError):
+        decide_language(accept_language_headers, supported)
+    with pytest.raises(NoAgreeableLanguageError):
+        LanguageNegotiator(supported, known_headers=()).decide(accept_language_headers)
+    universe = LanguageUniverse(supported)
+    with pytest.raises(NoAgreeableLanguageError):
+        universe.decide(accept_language_headers, universe.full_mask)
+
+
+def test_fallbacks_skip_excluded_languages() -> None:
+    """Should fall back past a language the client excluded."""
+    negotiator = LanguageNegotiator(
+        ["nb", "nn"], known_headers=(), fallbacks={"no": ["nb", "nn"]}
+    )
+    assert negotiator.decide(["no"]) == "nb"
+    assert negotiator.decide(["no, nb;q=0"]) == "nn"
+    with pytest.raises(NoAgreeableLanguageError):
+        negotiator.decide(["no, nb;q=0, nn;q=0"])
+
+
+def test_language_keys_with_exclusions() -> None:
+    """Should list the excluded languages last in the key."""
+    assert parse_accept_language(["en;q=0, *"]).key == "*,en;q=0"
+    assert parse_accept_language(["en;q=0"]).key == "*,en;q=0"
+    assert parse_accept_language(["*;q=0"]).key == "*;q=0"
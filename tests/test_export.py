@@ -0,0 +1,150 @@
+"""Test cases for exporting decision tables."""
+
+import json
+
+import pytest
+
+from content_negotiation import decide_content_type
+from content_negotiation.export import (
+    compile_table,
+    DecisionTable,
+    from_json,
+    to_json,
+    to_nginx_map,
+    verify,
+)
+
+SUPPORTED_CONTENT_TYPES = ["text/turtle", "application/ld+json"]
+ACCEPT_HEADERS = [
+    "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "application/ld+json, text/turtle;q=0.5",
+    "image/png",
+    "text/turtle",
+    "text",
+]
+
+
+def test_compile_table() -> None:
+    """Should decide every header, and its canonical key, as the library does."""
+    table = compile_table("content_type", SUPPORTED_CONTENT_TYPES, ACCEPT_HEADERS)
+    assert table.supported == tuple(SUPPORTED_CONTENT_TYPES)
+    assert table.decisions["image/png"] is None
+    assert table.decisions["text"] is None
+    assert table.decisions["application/ld+json,text/turtle;q=0.5"] == (
+        "application/ld+json"
+    )
+    for header in ACCEPT_HEADERS:
+        if table.decisions[header] is not None:
+            assert table.decisions[header] == decide_content_type(
+                [header], SUPPORTED_CONTENT_TYPES
+            )
+    assert not verify(table)
+
+
+def test_compile_language_table() -> None:
+    """Should decide accept-language headers, and leave out invalid ones."""
+    headers = ["nb-NO, nb;q=0.9, en;q=0.5", "fr", "nb;q=x", "fr"]
+    table = compile_table("language", ["en", "nb"], headers)
+    assert dict(table.decisions) == {
+        "nb-NO, nb;q=0.9, en;q=0.5": "nb",
+        "nb-NO,nb;q=0.9,en;q=0.5": "nb",
+        "fr": None,
+    }
+    assert not verify(table)
+
+
+def test_unknown_kind() -> None:
+    """Should raise ValueError for an unknown kind of table."""
+    with pytest.raises(ValueError):
+        compile_table("charset", ["utf-8"], ["utf-8"])
+
+
+def test_json_round_trip() -> None:
+    """Should load the table as written, with null for no agreeable variant."""
+    table = compile_table(
+        "content_type",
+        ["application/ld+json"],
+        ["application/*+json"],
+        structured_suffixes=True,
+    )
+    text = to_json(table)
+    assert json.loads(text)["decisions"] == {
+        "application/*+json": "application/ld+json"
+    }
+    assert from_json(text) == table
+    assert not verify(from_json(text))
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "[]",
+        '{"kind": "content_type"}',
+        '{"kind": "charset", "supported": [], "decisions": {}}',
+    ],
+)
+def test_from_json_invalid(text: str) -> None:
+    """Should raise ValueError for JSON that is not a decision table."""
+    with pytest.raises(ValueError):
+        from_json(text)
+
+
+def test_verify_reports_mismatches() -> None:
+    """Should report the decisions the library no longer makes."""
+    table = DecisionTable(
+        kind="language",
+        supported=("nb", "en"),
+        structured_suffixes=False,
+        decisions={"en": "nb", "nb": "nb", "nb;q=x": "nb"},
+    )
+    assert verify(table) == {"en": ("nb", "en"), "nb;q=x": ("nb", None)}
+
+
+def test_to_nginx_map() -> None:
+    """Should write an nginx map of the agreeable decisions, quoted."""
+    table = DecisionTable(
+        kind="content_type",
+        supported=("text/turtle",),
+        structured_suffixes=False,
+        decisions={
+            "text/turtle": "text/turtle",
+            'text/"x"': "text/turtle",
+            "~text": "text/turtle",
+            "default": "text/turtle",
+            "image/png": None,
+        },
+    )
+    assert to_nginx_map(table) == (
+        "map $http_accept $negotiated_content_type {\n"
+        '    default "";\n'
+        '    "text/turtle" "text/turtle";\n'
+        '    "text/\\"x\\"" "text/turtle";\n'
+        '    "\\~text" "text/turtle";\n'
+        '    "\\default" "text/turtle";\n'
+        "}\n"
+    )
+
+
+def test_to_nginx_map_of_headers_equal_but_for_case() -> None:
+    """Should leave out headers equal but for case, unless they decide the same."""
+    table = compile_table(
+        "language", ["en", "EN", "nb"], ["EN", "en", "fr, nb", "FR, nb"]
+    )
+    assert table.decisions["EN"] == "EN"
+    assert table.decisions["en"] == "en"
+    assert to_nginx_map(table) == (
+        "map $http_accept_language $negotiated_language {\n"
+        '    default "";\n'
+        '    "fr, nb" "nb";\n'
+        '    "fr,nb" "nb";\n'
+        "}\n"
+    )
+
+
+def test_to_nginx_map_of_languages() -> None:
+    """Should map the accept-language header by default, or the given variables."""
+    table = compile_table("language", ["nb"], ["nb"])
+    assert to_nginx_map(table).startswith(
+        "map $http_accept_language $negotiated_language {"
+    )
+    assert to_nginx_map(table, "$arg_lang", "$lang").startswith("map $arg_lang $lang {")
@@ -0,0 +1,167 @@
+"""Test cases for frozen and pickled negotiators."""
+
+import gc
+import os
+import pickle  # noqa: S403
+import sys
+from typing import Any, Callable, List, Sequence, Tuple
+
+import pytest
+
+from content_negotiation import (
+    CharsetNegotiator,
+    ContentNegotiator,
+    HeavyHittersTracker,
+    LanguageNegotiator,
+)
+from content_negotiation.shared_cache import SharedDecisionCache
+
+SUPPORTED_CONTENT_TYPES = ["text/turtle", "application/ld+json;qs=0.5"]
+SMAPS_ROLLUP = "/proc/self/smaps_rollup"
+
+# Negotiators, and a header to decide with them:
+NEGOTIATORS: List[Tuple[Callable[[], Any], str]] = [
+    (lambda: ContentNegotiator(SUPPORTED_CONTENT_TYPES), "application/*"),
+    (lambda: LanguageNegotiator(["nb", "en"], fallbacks={"no": ["nb"]}), "no"),
+    (lambda: CharsetNegotiator(["utf-8", "latin1"]), "iso-8859-1"),
+]
+
+
+@pytest.mark.parametrize("negotiator,header", NEGOTIATORS)
+def test_freeze(negotiator: Callable[[], Any], header: str) -> None:
+    """Should hold no lists or dicts, and refuse to be modified, once frozen."""
+    frozen = negotiator()
+    decision = frozen.decide([header])
+    assert frozen.freeze() is frozen
+    assert frozen.frozen
+    for value in vars(frozen).values():
+        assert not isinstance(value, (list, dict))
+    with pytest.raises(AttributeError):
+        frozen.tracker = None
+    with pytest.raises(AttributeError):
+        del frozen.tracker
+    assert frozen.decide([header]) == decision
+
+
+def test_unfrozen_negotiator_may_be_modified() -> None:
+    """Should let an unfrozen negotiator be modified."""
+    negotiator = ContentNegotiator(SUPPORTED_CONTENT_TYPES)
+    assert not negotiator.frozen
+    negotiator.tracker = HeavyHittersTracker()
+    del negotiator.tracker
+    assert not hasattr(negotiator, "tracker")
+
+
+def test_frozen_negotiators_decide_as_before() -> None:
+    """Should decide as the negotiator did before it was frozen."""
+    content_negotiator = ContentNegotiator(SUPPORTED_CONTENT_TYPES).freeze()
+    assert content_negotiator.decide(["*/*"]) == "text/turtle"
+    assert content_negotiator.decide(["*/*, text/turtle;q=0"]) == "application/ld+json"
+    assert list(content_negotiator.iter_content_types(["application/*"])) == [
+        "application/ld+json"
+    ]
+    assert content_negotiator.negotiate(["text/html"]).status == 406
+    language_negotiator = LanguageNegotiator(["nb", "en"]).freeze()
+    assert language_negotiator.decide(["en;q=0.5, nb"]) == "nb"
+    charset_negotiator = CharsetNegotiator(["utf-8", "latin1"]).freeze()
+    assert charset_negotiator.decide(["iso-8859-1"]) == "latin1"
+
+
+@pytest.mark.parametrize("freeze", [False, True])
+@pytest.mark.parametrize("negotiator,header", NEGOTIATORS)
+def test_pickle(negotiator: Callable[[], Any], header: str, freeze: bool) -> None:
+    """Should pickle the compiled state, frozen or not."""
+    original = negotiator()
+    if freeze:
+        original.freeze()
+    loaded = pickle.loads(pickle.dumps(original))  # noqa: S301
+    assert type(loaded) is type(original)
+    assert loaded.frozen is freeze
+    for name, value in vars(original).items():
+        assert vars(loaded)[name] == value, name
+    assert loaded.decide([header]) == original.decide([header])
+
+
+def test_pickle_drops_tracker_and_cache() -> None:
+    """Should not pickle the tracker or the shared decision cache."""
+    with SharedDecisionCache(slots=8) as cache:
+        try:
+            negotiator = ContentNegotiator(
+                SUPPORTED_CONTENT_TYPES, tracker=HeavyHittersTracker(), cache=cache
+            )
+            loaded = pickle.loads(pickle.dumps(negotiator))  # noqa: S301
+            del negotiator
+        finally:
+            cache.unlink()
+    assert loaded.tracker is None
+    assert loaded.cache is None
+    assert loaded.decide(["application/*"]) == "application/ld+json"
+
+
+def _private_dirty_kb() -> int:
+    """Return the private dirty memory of the process, in kB."""
+    with open(SMAPS_ROLLUP) as f:
+        for line in f:
+            if line.startswith("Private_Dirty:"):
+                return int(line.split()[1])
+    raise AssertionError("No Private_Dirty in smaps_rollup.")  # pragma: no cover
+
+
+def _unshared_by_worker_kb(
+    negotiators: Sequence[ContentNegotiator], headers: Sequence[str]
+) -> int:
+    """Fork a worker that negotiates and collects garbage, and return what it unshared."""
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:  # pragma: no cover
+        try:
+            os.close(read)
+            before = _private_dirty_kb()
+            for negotiator in negotiators:
+                for header in headers:
+                    negotiator.decide([header])
+            gc.collect()
+            os.write(write, str(_private_dirty_kb() - before).encode())
+        finally:
+            os._exit(0)
+    os.close(write)
+    with os.fdopen(read) as f:
+        unshared = int(f.read())
+    os.waitpid(pid, 0)
+    return unshared
+
+
+def _coverage_measured() -> bool:
+    """Return True if coverage is being measured, which writes on every line."""
+    coverage = sys.modules.get("coverage")
+    return coverage is not None and coverage.Coverage.current() is not None
+
+
+@pytest.mark.memory
+@pytest.mark.skipif(
+    not hasattr(os, "fork") or not os.path.exists(SMAPS_ROLLUP),
+    reason="needs fork and /proc/self/smaps_rollup",
+)
+@pytest.mark.skipif(_coverage_measured(), reason="coverage writes on every line")
+def test_negotiators_stay_shared_with_workers_after_gc_freeze() -> None:
+    """Should unshare less memory in forked workers after gc.freeze()."""
+    supported = [f"application/x-{i}+json" for i in range(40)] + ["text/turtle"]
+    headers = [f"application/x-{i}+json;q=0.5,text/*;q=0.1" for i in range(300)]
+
+    def compile_negotiators() -> List[ContentNegotiator]:
+        return [
+            ContentNegotiator(supported[i % 5 :], known_headers=headers)
+            for i in range(100)
+        ]
+
+    negotiators = compile_negotiators()
+    unshared = _unshared_by_worker_kb(negotiators, headers[:20])
+    del negotiators
+
+    negotiators = compile_negotiators()
+    gc.freeze()
+    try:
+        unshared_frozen = _unshared_by_worker_kb(negotiators, headers[:20])
+    finally:
+        gc.unfreeze()
+    assert unshared_frozen < unshared
@@ -0,0 +1,133 @@
+"""Test cases for the heavy hitters tracker."""
+
+from concurrent.futures import ThreadPoolExecutor
+import random
+
+import pytest
+
+from content_negotiation import (
+    ContentNegotiator,
+    decide_content_type,
+    decide_language,
+    HeavyHittersTracker,
+    LanguageNegotiator,
+    parse_accept,
+)
+
+
+def _traffic() -> list:
+    """Return a skewed mix of accept headers, with a long tail of rare headers."""
+    rng = random.Random(7)  # noqa: S311
+    headers = ["*/*"] * 500 + ["text/turtle"] * 300 + ["application/ld+json"] * 200
+    headers += [f"application/x-rare-{i}" for i in range(2000)]
+    rng.shuffle(headers)
+    return headers
+
+
+def test_top_headers() -> None:
+    """Should keep the most frequent headers, most frequent first."""
+    tracker = HeavyHittersTracker(width=1024, depth=4, size=8)
+    for header in _traffic():
+        tracker.record(header)
+    assert tracker.total == 3000
+    assert tracker.top_headers(3) == ("*/*", "text/turtle", "application/ld+json")
+    assert len(tracker.snapshot()) == 8
+
+
+def test_estimate_is_never_lower_than_count() -> None:
+    """Should not underestimate the count of any header."""
+    tracker = HeavyHittersTracker(width=64, depth=2, size=4)
+    traffic = _traffic()
+    for header in traffic:
+        tracker.record(header)
+    for header in set(traffic):
+        assert tracker.estimate(header) >= traffic.count(header)
+
+
+def test_record_without_header() -> None:
+    """Should not record a header that was not sent."""
+    tracker = HeavyHittersTracker()
+    tracker.record(None)
+    assert tracker.total == 0
+    assert tracker.snapshot() == []
+
+
+def test_reset() -> None:
+    """Should forget every header recorded."""
+    tracker = HeavyHittersTracker()
+    tracker.record("*/*")
+    tracker.reset()
+    assert tracker.total == 0
+    assert tracker.estimate("*/*") == 0
+    assert tracker.top_headers() == ()
+
+
+def test_snapshot_and_reset() -> None:
+    """Should forget every header recorded once the snapshot is taken."""
+    tracker = HeavyHittersTracker()
+    tracker.record("*/*")
+    tracker.record("*/*")
+    assert tracker.snapshot(reset=True) == [("*/*", 2)]
+    assert tracker.total == 0
+    assert tracker.snapshot() == []
+
+
+def test_snapshot_and_reset_from_threads() -> None:
+    """Should lose no header recorded between a snapshot and its reset."""
+    tracker = HeavyHittersTracker()
+
+    def record() -> None:
+        for _ in range(10000):
+            tracker.record("*/*")
+
+    counted = 0
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(record) for _ in range(4)]
+        while not all(future.done() for future in futures):
+            counted += sum(count for _, count in tracker.snapshot(reset=True))
+    for future in futures:
+        future.result()
+    counted += sum(count for _, count in tracker.snapshot(reset=True))
+    assert counted == 40000
+
+
+def test_invalid_dimensions() -> None:
+    """Should raise ValueError on dimensions that are not positive."""
+    with pytest.raises(ValueError):
+        HeavyHittersTracker(width=0)
+
+
+def test_record_from_threads() -> None:
+    """Should count every header recorded from several threads."""
+    tracker = HeavyHittersTracker()
+
+    def record() -> None:
+        for _ in range(1000):
+            tracker.record("*/*")
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(record) for _ in range(4)]
+    for future in futures:
+        future.result()
+    assert tracker.snapshot() == [("*/*", 4000)]
+
+
+def test_decide_with_tracker() -> None:
+    """Should record the joined headers of every decision."""
+    tracker = HeavyHittersTracker()
+    negotiator = ContentNegotiator(["text/turtle"], tracker=tracker)
+    negotiator.decide(["text/turtle", "*/*"])
+    negotiator.decide(parse_accept(["text/turtle", "*/*"]))
+    negotiator.decide([])
+    decide_content_type(["*/*"], ["text/turtle"], tracker=tracker)
+    assert tracker.snapshot() == [("text/turtle,*/*", 2), ("*/*", 1)]
+
+
+def test_decide_language_with_tracker() -> None:
+    """Should record the joined accept-language headers of every decision."""
+    tracker = HeavyHittersTracker()
+    negotiator = LanguageNegotiator(["nb", "en"], tracker=tracker)
+    negotiator.decide(["nb"])
+    decide_language(["nb"], ["nb", "en"], tracker=tracker)
+    decide_language([], ["nb", "en"], tracker=tracker)
+    assert tracker.snapshot() == [("nb", 2)]
@@ -0,0 +1,99 @@
+"""Test cases for the import cost of the package."""
+
+import os
+import subprocess  # noqa: S404
+import sys
+from typing import Dict, List, Tuple
+
+import pytest
+
+import content_negotiation
+
+# Budget for the cumulative import time of the package in microseconds:
+IMPORT_TIME_BUDGET_US = int(
+    os.environ.get("CONTENT_NEGOTIATION_IMPORT_TIME_BUDGET_US", "10000")
+)
+
+
+def _import_times(statement: str) -> List[Tuple[str, int, int]]:
+    """Return name, self time and cumulative time of each module imported."""
+    completed = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    times = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        times.append((name, int(self_us), int(cumulative_us)))
+    return times
+
+
+def _imported_by(times: List[Tuple[str, int, int]], module: str) -> Dict[str, int]:
+    """Return the modules imported while importing a module, and its own time."""
+    index = next(i for i, (name, _, _) in enumerate(times) if name.strip() == module)
+    name, _, cumulative_us = times[index]
+
+    # Nested imports are listed before the module, and are indented further:
+    indent = len(name) - len(name.lstrip())
+    imported = {module: cumulative_us}
+    for nested, _, nested_cumulative_us in reversed(times[:index]):
+        if len(nested) - len(nested.lstrip()) <= indent:
+            break
+        imported[nested.strip()] = nested_cumulative_us
+    return imported
+
+
+def test_import_does_not_import_submodules() -> None:
+    """Should not import the submodules, typing or importlib.metadata."""
+    imported = _imported_by(
+        _import_times("import content_negotiation"), "content_negotiation"
+    )
+    for module in [
+        "content_negotiation.content_negotiation",
+        "content_negotiation.language_negotiation",
+        "typing",
+        "importlib.metadata",
+        "logging",
+        "enum",
+    ]:
+        assert module not in imported, f"{module} is imported eagerly."
+
+
+def test_import_time_budget() -> None:
+    """Should import the package within the import time budget."""
+    imported = _imported_by(
+        _import_times("import content_negotiation"), "content_negotiation"
+    )
+    assert imported["content_negotiation"] <= IMPORT_TIME_BUDGET_US, imported
+
+
+def test_public_names_are_imported_on_first_access() -> None:
+    """Should import the submodule defining a public name on first access."""
+    imported = {
+        name.strip()
+        for name, _, _ in _import_times(
+            "from content_negotiation import decide_language"
+        )
+    }
+    assert "content_negotiation.language_negotiation" in imported
+    assert "content_negotiation.content_negotiation" not in imported
+
+
+def test_version() -> None:
+    """Should return the version of the package."""
+    assert isinstance(content_negotiation.__version__, str)
+
+
+def test_dir_includes_public_names() -> None:
+    """Should list the public names that are not yet imported."""
+    assert set(content_negotiation.__all__) <= set(dir(content_negotiation))
+
+
+def test_unknown_attribute() -> None:
+    """Should raise AttributeError for unknown names."""
+    with pytest.raises(AttributeError):
+        _ = content_negotiation.no_such_name  # type: ignore
@@ -0,0 +1,121 @@
+"""Test cases for interning of media ranges and language ranges."""
+
+import copy
+import pickle  # noqa: S403
+from typing import Any, Callable
+
+import pytest
+
+from content_negotiation.charset_negotiation import WeightedCharset
+from content_negotiation.content_negotiation import (
+    intern_media_range,
+    prepare_weighted_media_ranges,
+    WeightedMediaRange,
+)
+from content_negotiation.language_negotiation import (
+    intern_language,
+    prepare_weighted_languages,
+    WeightedLanguage,
+)
+
+
+def test_intern_media_range_is_shared() -> None:
+    """Should return the same object for the same media range."""
+    wmr = intern_media_range("application/xhtml+xml;q=0.9")
+    assert wmr is intern_media_range("application/xhtml+xml;q=0.9")
+    assert wmr is not None
+    assert wmr.media_range() == "application/xhtml+xml"
+    assert wmr.q == 0.9
+
+
+def test_intern_media_range_invalid() -> None:
+    """Should return None for an invalid media range."""
+    assert intern_media_range("text") is None
+
+
+def test_interned_media_ranges_are_reused_across_headers() -> None:
+    """Should reuse parsed media ranges even when the header differs."""
+    first = prepare_weighted_media_ranges(["text/html", "*/*;q=0.8"])
+    second = prepare_weighted_media_ranges(["application/json", "*/*;q=0.8"])
+    assert first[1] is second[1]
+
+
+def test_weighted_media_range_is_immutable() -> None:
+    """Should raise AttributeError when modifying a weighted media range."""
+    wmr = WeightedMediaRange("text/html")
+    with pytest.raises(AttributeError):
+        wmr.q = 0.5
+    with pytest.raises(AttributeError):
+        del wmr.q
+    assert wmr.q == 1.0
+
+
+def test_intern_language_is_shared() -> None:
+    """Should return the same object for the same language range."""
+    wl = intern_language("nb;q=0.9")
+    assert wl is intern_language("nb;q=0.9")
+    assert wl.language == "nb"
+    assert wl.q == 0.9
+
+
+def test_interned_languages_are_reused_across_headers() -> None:
+    """Should reuse parsed language ranges even when the header differs."""
+    first = prepare_weighted_languages(["en-US", "nb;q=0.9"])
+    second = prepare_weighted_languages(["nn", "nb;q=0.9"])
+    assert first[1] is second[1]
+
+
+def test_intern_language_invalid_q() -> None:
+    """Should raise ValueError every time for an invalid q-value."""
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            intern_language("nb;q=x")
+
+
+def test_weighted_language_is_immutable() -> None:
+    """Should raise AttributeError when modifying a weighted language."""
+    wl = WeightedLanguage("nb")
+    with pytest.raises(AttributeError):
+        wl.language = "en"
+    with pytest.raises(AttributeError):
+        del wl.language
+    assert wl.language == "nb"
+
+
+@pytest.mark.parametrize(
+    "weighted",
+    [
+        WeightedMediaRange("text/html;q=0.5"),
+        WeightedLanguage("nb;q=0.9"),
+        WeightedCharset("utf-8;q=0.7"),
+    ],
+)
+@pytest.mark.parametrize(
+    "duplicate",
+    [copy.copy, copy.deepcopy, lambda w: pickle.loads(pickle.dumps(w))],  # noqa: S301
+)
+def test_weighted_ranges_are_copied_and_pickled(
+    weighted: Any, duplicate: Callable[[Any], Any]
+) -> None:
+    """Should copy and pickle weighted ranges, which stay immutable."""
+    duplicated = duplicate(weighted)
+    assert type(duplicated) is type(weighted)
+    assert duplicated.__getstate__() == weighted.__getstate__()
+    with pytest.raises(AttributeError):
+        duplicated.q = 1.0
+
+
+def test_weighted_ranges_are_values() -> None:
+    """Should compare weighted ranges by value, and to strings by range."""
+    wmr = WeightedMediaRange("text/html;q=0.5")
+    assert wmr == WeightedMediaRange("text/html;level=1;q=0.5")
+    assert wmr != WeightedMediaRange("text/html")
+    assert wmr == "text/html"
+    assert wmr != 0.5
+    assert hash(wmr) == hash(WeightedMediaRange("text/html;q=0.5")) == hash("text/html")
+    wl = WeightedLanguage("nb;q=0.5")
+    assert wl == WeightedLanguage("nb; q=0.5")
+    assert wl != WeightedLanguage("nb")
+    assert wl == "nb"
+    assert wl != 0.5
+    assert hash(wl) == hash(WeightedLanguage("nb;q=0.5")) == hash("nb")
@@ -0,0 +1,124 @@
+"""Test cases for the ranked content type generator."""
+
+from typing import List
+
+import pytest
+
+from content_negotiation import content_negotiation
+from content_negotiation import (
+    ContentNegotiator,
+    decide_content_type,
+    iter_content_types,
+    NoAgreeableContentTypeError,
+)
+
+SUPPORTED_CONTENT_TYPES = [
+    "text/turtle",
+    "application/rdf+xml",
+    "application/ld+json",
+    "application/n-triples",
+]
+
+ACCEPT_HEADERS: List[List[str]] = [
+    ["text/turtle", "application/ld+json"],
+    ["application/ld+json", "text/turtle"],
+    ["not/acceptable", "*/*"],
+    ["application/json", "application/*", "*/*"],
+    ["application/*", "text/turtle;q=0.2"],
+    ["*/*;q=0.8", "text/plain", "application/signed-exchange;q=0.9"],
+    ["application/json;q=0.0"],
+    ["audio/*"],
+    ["text"],
+    [],
+]
+
+
+def test_first_content_type_is_decided_content_type() -> None:
+    """Should yield the decided content type first."""
+    for accept_header in ACCEPT_HEADERS:
+        content_types = list(iter_content_types(accept_header, SUPPORTED_CONTENT_TYPES))
+        try:
+            content_type = decide_content_type(accept_header, SUPPORTED_CONTENT_TYPES)
+        except NoAgreeableContentTypeError:
+            assert content_types == [], f"For header-value {accept_header!r}."
+        else:
+            assert content_types[0] == content_type, f"For {accept_header!r}."
+
+
+def test_content_types_in_order_of_preference() -> None:
+    """Should yield the acceptable content types in order of preference, once."""
+    accept_header = ["application/rdf+xml,application/*;q=0.8,*/*;q=0.1"]
+    assert list(iter_content_types(accept_header, SUPPORTED_CONTENT_TYPES)) == [
+        "application/rdf+xml",
+        "application/ld+json",
+        "application/n-triples",
+        "text/turtle",
+    ]
+
+
+def test_content_types_exclude_unacceptable() -> None:
+    """Should not yield content types that are not accepted."""
+    accept_header = ["application/ld+json,text/*;q=0.5"]
+    assert list(iter_content_types(accept_header, SUPPORTED_CONTENT_TYPES)) == [
+        "application/ld+json",
+        "text/turtle",
+    ]
+
+
+def test_content_types_without_accept_header() -> None:
+    """Should yield every supported content type when no media range is given."""
+    assert list(iter_content_types([], SUPPORTED_CONTENT_TYPES)) == (
+        SUPPORTED_CONTENT_TYPES
+    )
+
+
+def test_content_types_are_yielded_lazily() -> None:
+    """Should allow falling back to the next content type."""
+    negotiator = ContentNegotiator(SUPPORTED_CONTENT_TYPES)
+    content_types = negotiator.iter_content_types(["application/*"])
+    assert next(content_types) == "application/rdf+xml"
+    assert next(content_types) == "application/ld+json"
+
+
+def test_content_types_with_structured_suffixes() -> None:
+    """Should yield every content type matching a structured syntax suffix."""
+    negotiator = ContentNegotiator(
+        ["application/ld+json", "text/turtle", "application/activity+json"],
+        structured_suffixes=True,
+    )
+    assert list(negotiator.iter_content_types(["application/json"])) == [
+        "application/ld+json",
+        "application/activity+json",
+    ]
+
+
+def test_content_types_without_supported_content_types() -> None:
+    """Should yield nothing."""
+    assert list(iter_content_types(["*/*"], [])) == []
+    with pytest.raises(NoAgreeableContentTypeError):
+        _ = ContentNegotiator([]).decide(["*/*"])
+
+
+def test_first_content_type_is_decided_with_server_qualities() -> None:
+    """Should match supported content types as given, as decide_content_type does."""
+    supported_content_types = ["text/html;qs=0.5", "application/json"]
+    assert decide_content_type(["*/*"], supported_content_types) == "text/html;qs=0.5"
+    assert list(iter_content_types(["*/*"], supported_content_types)) == [
+        "text/html;qs=0.5",
+        "application/json",
+    ]
+    assert list(iter_content_types(["text/*"], ["text/html;qs=x"])) == [
+        "text/html;qs=x"
+    ]
+
+
+def test_content_types_without_compiling_a_negotiator(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Should iterate without compiling a negotiator per call."""
+    monkeypatch.setattr(content_negotiation, "ContentNegotiator", None)
+    assert list(iter_content_types(["application/*"], SUPPORTED_CONTENT_TYPES)) == [
+        "application/rdf+xml",
+        "application/ld+json",
+        "application/n-triples",
+    ]
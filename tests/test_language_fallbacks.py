@@ -0,0 +1,66 @@
+"""Test cases for language fallback chains and equivalence classes."""
+
+import pytest
+
+from content_negotiation import LanguageNegotiator, NoAgreeableLanguageError
+from content_negotiation.language_negotiation import compile_language_matches
+
+NORWEGIAN = [["no", "nb", "nn", "nb-NO", "no-NO", "nn-NO"]]
+
+
+def test_supported_languages_decide_themselves() -> None:
+    """Should decide a supported language as itself, despite its class."""
+    negotiator = LanguageNegotiator(["nn", "nb"], equivalents=NORWEGIAN)
+    assert negotiator.decide(["nb"]) == "nb"
+    assert negotiator.decide(["nn"]) == "nn"
+
+
+def test_equivalence_class_decides_first_supported_language() -> None:
+    """Should decide an equivalent language in the order of the supported languages."""
+    negotiator = LanguageNegotiator(["en", "nn", "nb"], equivalents=NORWEGIAN)
+    for requested in ("no", "nb-NO", "no-NO", "nn-NO"):
+        assert negotiator.decide([requested]) == "nn"
+
+
+def test_fallback_chain_decides_first_supported_language() -> None:
+    """Should decide the first supported language of the fallback chain."""
+    negotiator = LanguageNegotiator(
+        ["en", "nn"], fallbacks={"no": ["nb", "nn"], "nb-NO": ["nb"]}
+    )
+    assert negotiator.decide(["no"]) == "nn"
+    with pytest.raises(NoAgreeableLanguageError):
+        negotiator.decide(["nb-NO"])
+
+
+def test_fallback_chain_takes_precedence_over_equivalence_class() -> None:
+    """Should follow the fallback chain before the equivalence class."""
+    negotiator = LanguageNegotiator(
+        ["nb", "nn"], fallbacks={"no": ["nn"]}, equivalents=NORWEGIAN
+    )
+    assert negotiator.decide(["no"]) == "nn"
+    assert negotiator.decide(["no-NO"]) == "nb"
+
+
+def test_fallbacks_keep_the_client_preference() -> None:
+    """Should decide by the client's preference, then by the fallbacks."""
+    negotiator = LanguageNegotiator(["en", "nb"], fallbacks={"no": ["nb"]})
+    assert negotiator.decide(["no;q=0.9, en;q=0.8"]) == "nb"
+    assert negotiator.decide(["no;q=0.7, en;q=0.8"]) == "en"
+    assert negotiator.decide(["fr, no;q=0.1"]) == "nb"
+
+
+def test_known_headers_are_decided_with_fallbacks() -> None:
+    """Should decide the known headers with the fallbacks."""
+    negotiator = LanguageNegotiator(
+        ["en", "nb"], known_headers=["no"], fallbacks={"no": ["nb"]}
+    )
+    assert negotiator.decisions["no"] == "nb"
+
+
+def test_compile_language_matches() -> None:
+    """Should compile one table from requested language to decided language."""
+    assert compile_language_matches(
+        ["nb", "en"], {"no": ["nn", "nb"], "fr": ["de"]}, [["en", "en-GB"], ["sv"]]
+    ) == {"nb": "nb", "en": "en", "no": "nb", "en-GB": "en", "*": "nb"}
+    assert compile_language_matches(["*", "nb"], {}, []) == {"*": "*", "nb": "nb"}
+    assert compile_language_matches([], {"no": ["nb"]}, [["nb", "no"]]) == {}
@@ -4,7 +4,7 @@ from typing import List
 
 import pytest
 
-from content_negotiation import decide_language
+from content_negotiation import decide_language, LanguageNegotiator
 from content_negotiation.language_negotiation import NoAgreeableLanguageError
 
 SUPPORTED_LANGUAGES = ["en-GB", "en", "nb-NO", "nb", "en-US"]
@@ -125,3 +125,60 @@ def test_language_negotiation_accept_language_header_contains_only_empty_string(
     accept_language_header: List[str] = [""]
     with pytest.raises(NoAgreeableLanguageError):
         decide_language(accept_language_header, SUPPORTED_LANGUAGES)
+
+
+def test_language_negotiator() -> None:
+    """Should decide the same languages as decide_language."""
+    negotiator = LanguageNegotiator(SUPPORTED_LANGUAGES)
+    for accept_language_header in [
+        ["en-GB"],
+        ["en-GB;q=0.8", "nb-NO;q=0.9"],
+        ["fr", "*"],
+        ["nb;q=0.0"],
+        [],
+    ]:
+        assert negotiator.decide(accept_language_header) == decide_language(
+            accept_language_header, SUPPORTED_LANGUAGES
+        ), f"For header-value {accept_language_header!r}."
+
+
+def test_language_negotiator_no_agreeable_language() -> None:
+    """Should raise NoAgreeableLanguageError."""
+    with pytest.raises(NoAgreeableLanguageError):
+        _ = LanguageNegotiator(SUPPORTED_LANGUAGES).decide(["fr"])
+    with pytest.raises(NoAgreeableLanguageError):
+        _ = LanguageNegotiator([]).decide(["*"])
+
+
+def test_debug_logging(caplog: pytest.LogCaptureFixture) -> None:
+    """Should log the sorted languages to the module logger at debug level."""
+    with caplog.at_level("DEBUG", logger="content_negotiation.language_negotiation"):
+        decide_language(["en;q=0.5,nb"], SUPPORTED_LANGUAGES)
+    assert "Accept weighted languages sorted: nb;q=1.0, en;q=0.5" in caplog.text
+
+
+@pytest.mark.parametrize(
+    "accept_language_header, language",
+    [
+        # Optional whitespace around list elements is not part of the language:
+        (["fr, en"], "en"),
+        (["fr,\ten ; q=0.5"], "en"),
+        # The q parameter name is case-insensitive:
+        (["en;Q=0.1, nb;q=0.5"], "nb"),
+    ],
+)
+def test_language_negotiation_tokenizes_as_rfc_7231(
+    accept_language_header: List[str], language: str
+) -> None:
+    """Should tokenize the accept-language header as RFC 7231 specifies."""
+    assert decide_language(accept_language_header, SUPPORTED_LANGUAGES) == language
+    assert LanguageNegotiator(SUPPORTED_LANGUAGES).decide(accept_language_header) == (
+        language
+    )
+
+
+def test_language_negotiation_nan_q() -> None:
+    """Should raise ValueError on a q-value that is not a number, as on "q=x"."""
+    for accept_language_header in (["en;q=nan, nb;q=0.5"], ["en;q=x, nb;q=0.5"]):
+        with pytest.raises(ValueError):
+            decide_language(accept_language_header, SUPPORTED_LANGUAGES)
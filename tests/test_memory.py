@@ -0,0 +1,228 @@
+"""Allocation budgets of the public entry points, measured with tracemalloc.
+
+Every entry point is measured once its intern tables, and the interpreter's free
+lists, are warm: the peak bytes allocated by one call, and the bytes and the
+blocks still allocated after a number of further calls, which should be none,
+save for the interpreter's own bookkeeping. tracemalloc only traces the blocks
+that are still allocated, so the blocks allocated and freed again by a call are
+not counted; the peak bytes bound them instead. Coverage allocates on
+every line, so the tests are skipped while it is measured, and run by the nox
+session "memory" without it.
+
+Set CONTENT_NEGOTIATION_MEMORY_REPORT to a path to write the measurements as JSON,
+to compare them between releases.
+"""
+
+import gc
+import json
+import os
+import sys
+import tracemalloc
+from typing import Callable, Dict, Iterator, List, NamedTuple, Tuple
+
+import pytest
+
+from content_negotiation import (
+    CharsetNegotiator,
+    ContentNegotiator,
+    decide_charset,
+    decide_content_type,
+    decide_language,
+    iter_content_types,
+    LanguageNegotiator,
+    parse_accept,
+    parse_accept_language,
+)
+from content_negotiation.charset_negotiation import intern_charset
+from content_negotiation.content_negotiation import (
+    intern_media_range,
+    KNOWN_ACCEPT_HEADERS,
+)
+from content_negotiation.language_negotiation import intern_language
+
+pytestmark = pytest.mark.memory
+
+# Calls made before measuring, enough to fill the free lists of small tuples, and
+# after measuring, that should leave nothing allocated, per header shape:
+CALLS = {"browser": (2100, 200), "rdf": (2100, 200), "hostile": (100, 20)}
+# Bytes left allocated by the interpreter, far less than one object per call:
+RETAINED_SLACK = 256
+# Blocks the free lists of the interpreter trade between snapshots, fewer than the
+# calls measured, which would each leave one if they leaked:
+LEAKED_BLOCKS_SLACK = 8
+
+SUPPORTED_CONTENT_TYPES = ["text/turtle", "application/ld+json", "application/rdf+xml"]
+SUPPORTED_LANGUAGES = ["nb", "nn", "en"]
+SUPPORTED_CHARSETS = ["utf-8", "iso-8859-1"]
+
+ACCEPT_HEADERS = {
+    "browser": KNOWN_ACCEPT_HEADERS[0],
+    "rdf": ",".join(
+        [f"application/x-rdf-{i};q=0.{i % 9 + 1}" for i in range(19)] + ["*/*;q=0.1"]
+    ),
+    "hostile": ",".join(f"application/x-{i};q=0.5" for i in range(1000)),
+}
+
+ACCEPT_LANGUAGE_HEADERS = {
+    "browser": "nb-NO,nb;q=0.9,no;q=0.8,nn;q=0.7,en-US;q=0.6,en;q=0.5",
+    "rdf": ",".join([f"x-{i};q=0.{i % 9 + 1}" for i in range(19)] + ["*;q=0.1"]),
+    "hostile": ",".join(f"x-{i};q=0.5" for i in range(1000)),
+}
+
+ACCEPT_CHARSET_HEADERS = {
+    "browser": "utf-8,iso-8859-1;q=0.5",
+    "rdf": ",".join([f"x-{i};q=0.{i % 9 + 1}" for i in range(19)] + ["*;q=0.1"]),
+    "hostile": ",".join(f"x-{i};q=0.5" for i in range(1000)),
+}
+
+# Peak bytes allocated by one call, per header shape:
+PEAK_BUDGETS = {"browser": 8 * 1024, "rdf": 16 * 1024, "hostile": 256 * 1024}
+
+content_negotiator = ContentNegotiator(SUPPORTED_CONTENT_TYPES, known_headers=())
+language_negotiator = LanguageNegotiator(SUPPORTED_LANGUAGES, known_headers=())
+charset_negotiator = CharsetNegotiator(SUPPORTED_CHARSETS)
+
+
+def _entry_points(shape: str) -> List[Tuple[str, Callable]]:
+    """Return the entry points, called with headers of the given shape."""
+    accept = [ACCEPT_HEADERS[shape]]
+    accept_language = [ACCEPT_LANGUAGE_HEADERS[shape]]
+    accept_charset = [ACCEPT_CHARSET_HEADERS[shape]]
+    return [
+        ("parse_accept", lambda: parse_accept(accept)),
+        (
+            "decide_content_type",
+            lambda: decide_content_type(accept, SUPPORTED_CONTENT_TYPES),
+        ),
+        ("ContentNegotiator.decide", lambda: content_negotiator.decide(accept)),
+        (
+            "iter_content_types",
+            lambda: list(iter_content_types(accept, SUPPORTED_CONTENT_TYPES)),
+        ),
+        ("parse_accept_language", lambda: parse_accept_language(accept_language)),
+        (
+            "decide_language",
+            lambda: decide_language(accept_language, SUPPORTED_LANGUAGES),
+        ),
+        (
+            "LanguageNegotiator.decide",
+            lambda: language_negotiator.decide(accept_language),
+        ),
+        ("decide_charset", lambda: decide_charset(accept_charset, SUPPORTED_CHARSETS)),
+        ("CharsetNegotiator.decide", lambda: charset_negotiator.decide(accept_charset)),
+    ]
+
+
+def _call(entry_point: Callable) -> None:
+    """Call an entry point, ignoring that no agreeable value is found."""
+    try:
+        entry_point()
+    except Exception as e:
+        if not type(e).__name__.startswith("NoAgreeable"):
+            raise
+
+
+class Measurement(NamedTuple):
+    """Allocations of one warm call, and those left by further calls."""
+
+    peak: int
+    retained: int
+    # Blocks still allocated after the calls, not blocks allocated by a call:
+    leaked_blocks: int
+
+
+def _measure(entry_point: Callable, warm_up: int, repeat: int) -> Measurement:
+    """Return the peak bytes of one call, and the bytes and blocks left by more."""
+    # Start from the same state whatever ran before: empty intern tables, and no
+    # garbage collection until measured, since a full collection empties the free
+    # lists that the warm-up fills:
+    for intern in (intern_media_range, intern_language, intern_charset):
+        intern.cache_clear()
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(warm_up):
+            _call(entry_point)
+        return _measure_warm(entry_point, repeat)
+    finally:
+        gc.enable()
+
+
+def _blocks(snapshot: tracemalloc.Snapshot) -> int:
+    """Return the number of blocks allocated in a snapshot, save by tracemalloc."""
+    snapshot = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+    return sum(statistic.count for statistic in snapshot.statistics("filename"))
+
+
+def _measure_warm(entry_point: Callable, repeat: int) -> Measurement:
+    """Return the peak bytes of one warm call, and the bytes and blocks left by more."""
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        _call(entry_point)
+        current, peak = tracemalloc.get_traced_memory()
+        for _ in range(repeat):
+            _call(entry_point)
+        retained = tracemalloc.get_traced_memory()[0] - current
+        # Snapshots take from the free lists too, which the calls after the first
+        # snapshot fill again, so the blocks are counted between later snapshots:
+        before = after = tracemalloc.take_snapshot()
+        for _ in range(2):
+            for _ in range(repeat):
+                _call(entry_point)
+            before, after = after, tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    return Measurement(peak - base, retained, _blocks(after) - _blocks(before))
+
+
+@pytest.fixture(scope="module")
+def report() -> Iterator[Dict[str, Dict[str, Dict[str, int]]]]:
+    """Collect the measurements, and write them to the report, if requested."""
+    measurements: Dict[str, Dict[str, Dict[str, int]]] = {}
+    yield measurements
+    path = os.environ.get("CONTENT_NEGOTIATION_MEMORY_REPORT")
+    if path:
+        with open(path, "w") as f:
+            json.dump(measurements, f, indent=2, sort_keys=True)
+
+
+def _coverage_measured() -> bool:
+    """Return True if coverage is being measured, which allocates on every line."""
+    coverage = sys.modules.get("coverage")
+    return coverage is not None and coverage.Coverage.current() is not None
+
+
+@pytest.mark.skipif(_coverage_measured(), reason="coverage allocates on every line")
+@pytest.mark.parametrize("shape", sorted(PEAK_BUDGETS))
+def test_allocation_budgets(
+    shape: str, report: Dict[str, Dict[str, Dict[str, int]]]
+) -> None:
+    """Should stay within the peak budget, and leave nothing allocated."""
+    for name, entry_point in _entry_points(shape):
+        peak, retained, leaked_blocks = _measure(entry_point, *CALLS[shape])
+        report.setdefault(name, {})[shape] = {
+            "peak_bytes": peak,
+            "retained": retained,
+            "leaked_blocks": leaked_blocks,
+        }
+        assert peak <= PEAK_BUDGETS[shape], f"{name}: {peak} bytes"
+        assert retained < RETAINED_SLACK, f"{name}: {retained} bytes retained"
+        assert (
+            leaked_blocks < LEAKED_BLOCKS_SLACK
+        ), f"{name}: {leaked_blocks} blocks leaked"
+
+
+@pytest.mark.skipif(_coverage_measured(), reason="coverage allocates on every line")
+@pytest.mark.parametrize("shape", sorted(PEAK_BUDGETS))
+def test_negotiators_allocate_no_more_than_the_functions(shape: str) -> None:
+    """Should allocate no more in a compiled negotiator than in the function."""
+    entry_points = dict(_entry_points(shape))
+    for negotiator, function in [
+        ("ContentNegotiator.decide", "decide_content_type"),
+        ("LanguageNegotiator.decide", "decide_language"),
+        ("CharsetNegotiator.decide", "decide_charset"),
+    ]:
+        peak = _measure(entry_points[negotiator], *CALLS[shape]).peak
+        function_peak = _measure(entry_points[function], *CALLS[shape]).peak
+        assert peak <= function_peak, f"{negotiator}: {peak} > {function_peak} bytes"
@@ -0,0 +1,100 @@
+"""Test cases for negotiations with response headers rendered up front."""
+
+import pickle  # noqa: S403
+
+from content_negotiation import ContentNegotiator, Negotiation, parse_accept
+
+SUPPORTED_CONTENT_TYPES = ["text/turtle", "application/ld+json", "text/html;charset=x"]
+
+
+def test_negotiate() -> None:
+    """Should return the decided content type with its response headers."""
+    negotiator = ContentNegotiator(SUPPORTED_CONTENT_TYPES)
+    negotiation = negotiator.negotiate(["text/*"])
+    assert negotiation == Negotiation(
+        content_type="text/turtle",
+        status=200,
+        headers=(
+            (b"content-type", b"text/turtle; charset=utf-8"),
+            (b"vary", b"Accept"),
+            (
+                b"link",
+                b'<>; rel="alternate"; type="application/ld+json", '
+                b'<>; rel="alternate"; type="text/html;charset=x"',
+            ),
+        ),
+    )
+    assert negotiation.body == b""
+
+
+def test_negotiate_renders_once() -> None:
+    """Should return the same negotiation for every request deciding a type."""
+    negotiator = ContentNegotiator(SUPPORTED_CONTENT_TYPES)
+    negotiation = negotiator.negotiate(["application/*"])
+    assert negotiation.headers[0] == (b"content-type", b"application/ld+json")
+    assert negotiator.negotiate(parse_accept(["application/ld+json"])) is negotiation
+
+
+def test_negotiate_charset() -> None:
+    """Should keep the charset of a content type, and use the given charset."""
+    negotiator = ContentNegotiator(["text/html;charset=x"], charset="iso-8859-1")
+    assert negotiator.negotiate([]).headers[0] == (
+        b"content-type",
+        b"text/html;charset=x",
+    )
+    negotiator = ContentNegotiator(SUPPORTED_CONTENT_TYPES, charset="iso-8859-1")
+    assert negotiator.negotiate(["*/*"]).headers[0] == (
+        b"content-type",
+        b"text/turtle; charset=iso-8859-1",
+    )
+    negotiator = ContentNegotiator(SUPPORTED_CONTENT_TYPES, charset=None)
+    assert negotiator.negotiate(["*/*"]).headers[0] == (b"content-type", b"text/turtle")
+
+
+def test_negotiate_single_content_type() -> None:
+    """Should not link to alternates when there are none."""
+    negotiation = ContentNegotiator(["application/ld+json"]).negotiate([])
+    assert negotiation.headers == (
+        (b"content-type", b"application/ld+json"),
+        (b"vary", b"Accept"),
+    )
+
+
+def test_negotiate_not_acceptable() -> None:
+    """Should return the 406 negotiation, listing the supported content types."""
+    negotiator = ContentNegotiator(SUPPORTED_CONTENT_TYPES)
+    negotiation = negotiator.negotiate(["audio/*"])
+    assert negotiation is negotiator.not_acceptable
+    assert negotiation.content_type is None
+    assert negotiation.status == 406
+    assert negotiation.headers[:2] == (
+        (b"content-type", b"text/plain; charset=utf-8"),
+        (b"vary", b"Accept"),
+    )
+    assert negotiation.headers[2][1].count(b'rel="alternate"') == 3
+    assert negotiation.body == (
+        b"Not Acceptable. Supported content types:\n"
+        b"text/turtle\napplication/ld+json\ntext/html;charset=x\n"
+    )
+
+
+def test_negotiate_without_supported_content_types() -> None:
+    """Should return the 406 negotiation, without links."""
+    negotiation = ContentNegotiator([]).negotiate(["*/*"])
+    assert negotiation.status == 406
+    assert len(negotiation.headers) == 2
+    assert negotiation.body == b"Not Acceptable. Supported content types:\n"
+
+
+def test_negotiations_are_rendered_lazily() -> None:
+    """Should render on the first negotiation, or when frozen, and not before."""
+    negotiator = ContentNegotiator(SUPPORTED_CONTENT_TYPES)
+    assert "_negotiations" not in vars(negotiator)
+    negotiation = negotiator.negotiate(["*/*"])
+    assert negotiator.negotiate(["text/turtle"]) is negotiation
+
+    frozen = ContentNegotiator(SUPPORTED_CONTENT_TYPES).freeze()
+    assert "_negotiations" in vars(frozen)
+    loaded = pickle.loads(pickle.dumps(frozen))  # noqa: S301
+    assert loaded.negotiate(["*/*"]) == negotiation
+    assert loaded.negotiate(["audio/*"]) is loaded.not_acceptable
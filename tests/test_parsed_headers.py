@@ -0,0 +1,175 @@
+"""Test cases for headers parsed once and reused across negotiators."""
+
+import pickle  # noqa: S403
+from typing import Any, Callable, List
+
+import pytest
+
+from content_negotiation import (
+    ContentNegotiator,
+    decide_content_type,
+    decide_language,
+    iter_content_types,
+    LanguageNegotiator,
+    NoAgreeableContentTypeError,
+    NoAgreeableLanguageError,
+    parse_accept,
+    parse_accept_language,
+    ParsedAccept,
+)
+from content_negotiation.content_negotiation import intern_media_range
+from content_negotiation.language_negotiation import intern_language
+
+SUPPORTED_CONTENT_TYPE_LISTS = [
+    ["text/turtle", "application/ld+json"],
+    ["application/rdf+xml;qs=0.5", "text/turtle"],
+    ["text/html"],
+    [],
+]
+
+ACCEPT_HEADERS: List[List[str]] = [
+    ["text/turtle", "application/ld+json"],
+    ["application/ld+json;q=0.9,*/*;q=0.1"],
+    ["application/rdf+xml,text/turtle;q=0.9"],
+    ["text/*;q=0.5", "text/html;q=0.0"],
+    ["application/json;q=0.0"],
+    ["audio/*"],
+    ["text"],
+    ["*/*"],
+    [],
+]
+
+SUPPORTED_LANGUAGE_LISTS = [["nb", "en"], ["en"], []]
+
+ACCEPT_LANGUAGE_HEADERS: List[List[str]] = [
+    ["en;q=0.8,nb;q=0.9"],
+    ["nb-NO", "*;q=0.1"],
+    ["fr"],
+    ["nb;q=0.0"],
+    ["*"],
+    [],
+]
+
+
+def _outcome(decide: Callable, *args: Any) -> Any:
+    """Return the decision, or the type of the error raised."""
+    try:
+        return decide(*args)
+    except Exception as e:
+        return type(e)
+
+
+def test_parse_accept() -> None:
+    """Should join the headers and keep the acceptable ranges in order."""
+    accept = parse_accept(["text/*;q=0.5", "text/turtle,application/json;q=0.0"])
+    assert accept.header == "text/*;q=0.5,text/turtle,application/json;q=0.0"
+    assert [wmr.media_range() for wmr in accept.ranges] == ["text/turtle", "text/*"]
+    assert accept.invalid is False
+
+
+def test_parse_accept_without_headers() -> None:
+    """Should parse no accept headers as no header."""
+    assert parse_accept([]) == ParsedAccept(header=None, ranges=(), invalid=False)
+
+
+def test_parse_accept_invalid() -> None:
+    """Should flag headers with only invalid media ranges."""
+    accept = parse_accept(["text", "audio"])
+    assert accept.ranges == ()
+    assert accept.invalid is True
+
+
+def test_parsed_accept_is_immutable() -> None:
+    """Should not allow parsed accept headers to be modified."""
+    accept = parse_accept(["text/turtle"])
+    with pytest.raises(AttributeError):
+        accept.header = "text/html"  # type: ignore
+
+
+def test_parsed_headers_are_pickled() -> None:
+    """Should pickle parsed headers, which decide as before."""
+    accept = parse_accept(["text/*;q=0.5, application/ld+json"])
+    loaded = pickle.loads(pickle.dumps(accept))  # noqa: S301
+    assert loaded == accept
+    assert loaded.key == accept.key
+    assert decide_content_type(loaded, ["text/turtle"]) == "text/turtle"
+    accept_language = parse_accept_language(["nn;q=0.5, nb"])
+    loaded_language = pickle.loads(pickle.dumps(accept_language))  # noqa: S301
+    assert loaded_language == accept_language
+    assert decide_language(loaded_language, ["nn"]) == "nn"
+
+
+def test_parsed_headers_are_values() -> None:
+    """Should hash parsed headers, and compare them by value, interned or not."""
+    accept = parse_accept(["text/html;q=0.5, */*;q=0.1"])
+    accept_language = parse_accept_language(["nb, en;q=0.5"])
+    intern_media_range.cache_clear()
+    intern_language.cache_clear()
+    assert parse_accept(["text/html;q=0.5, */*;q=0.1"]) == accept
+    assert parse_accept(["text/html;q=0.4, */*;q=0.1"]) != accept
+    assert parse_accept_language(["nb, en;q=0.5"]) == accept_language
+    assert parse_accept_language(["nb, en;q=0.4"]) != accept_language
+    assert len({accept, parse_accept(["text/html;q=0.5, */*;q=0.1"])}) == 1
+    assert len({accept_language, parse_accept_language(["nb, en;q=0.5"])}) == 1
+
+
+def test_parsed_accept_decides_as_raw_headers() -> None:
+    """Should decide parsed headers as the raw headers, for every supported list."""
+    for accept_headers in ACCEPT_HEADERS:
+        accept = parse_accept(accept_headers)
+        for supported in SUPPORTED_CONTENT_TYPE_LISTS:
+            negotiator = ContentNegotiator(supported, known_headers=())
+            expected = _outcome(negotiator.decide, accept_headers)
+            assert _outcome(negotiator.decide, accept) == expected
+            assert list(negotiator.iter_content_types(accept)) == list(
+                negotiator.iter_content_types(accept_headers)
+            )
+            assert list(iter_content_types(accept, supported)) == list(
+                iter_content_types(accept_headers, supported)
+            )
+            assert _outcome(decide_content_type, accept, supported) == _outcome(
+                decide_content_type, accept_headers, supported
+            )
+
+
+def test_parsed_accept_uses_decision_table() -> None:
+    """Should look parsed headers up in the table of known headers."""
+    negotiator = ContentNegotiator(["text/turtle"], known_headers=["audio/*", "*/*"])
+    assert negotiator.decide(parse_accept(["*/*"])) == "text/turtle"
+    with pytest.raises(NoAgreeableContentTypeError):
+        negotiator.decide(parse_accept(["audio/*"]))
+
+
+def test_parse_accept_language() -> None:
+    """Should join the headers and keep the acceptable ranges in order."""
+    accept_language = parse_accept_language(["en;q=0.8", "nb;q=0.9,fr;q=0.0"])
+    assert accept_language.header == "en;q=0.8,nb;q=0.9,fr;q=0.0"
+    assert [wl.language for wl in accept_language.ranges] == ["nb", "en"]
+
+
+def test_parse_accept_language_invalid() -> None:
+    """Should raise ValueError on an invalid q-value, as the negotiators do."""
+    with pytest.raises(ValueError):
+        parse_accept_language(["nb;q=x"])
+
+
+def test_parsed_accept_language_decides_as_raw_headers() -> None:
+    """Should decide parsed headers as the raw headers, for every supported list."""
+    for accept_language_headers in ACCEPT_LANGUAGE_HEADERS:
+        accept_language = parse_accept_language(accept_language_headers)
+        for supported in SUPPORTED_LANGUAGE_LISTS:
+            negotiator = LanguageNegotiator(supported, known_headers=())
+            assert _outcome(negotiator.decide, accept_language) == _outcome(
+                negotiator.decide, accept_language_headers
+            )
+            assert _outcome(decide_language, accept_language, supported) == _outcome(
+                decide_language, accept_language_headers, supported
+            )
+
+
+def test_parsed_accept_language_uses_decision_table() -> None:
+    """Should look parsed headers up in the table of known headers."""
+    negotiator = LanguageNegotiator(["en"], known_headers=["nb", "en"])
+    assert negotiator.decide(parse_accept_language(["en"])) == "en"
+    with pytest.raises(NoAgreeableLanguageError):
+        negotiator.decide(parse_accept_language(["nb"]))
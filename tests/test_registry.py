@@ -0,0 +1,96 @@
+"""Test cases for the negotiator registry."""
+
+import gc
+import threading
+from typing import List
+
+import pytest
+
+from content_negotiation import ContentNegotiator, registry
+from content_negotiation.registry import default_registry, NegotiatorRegistry
+
+SUPPORTED_CONTENT_TYPES = ["text/turtle", "application/ld+json"]
+SUPPORTED_LANGUAGES = ["nb", "en"]
+
+
+def test_content_negotiator_is_shared() -> None:
+    """Should hand out one frozen negotiator per list."""
+    negotiators = NegotiatorRegistry()
+    negotiator = negotiators.content_negotiator(SUPPORTED_CONTENT_TYPES)
+    assert negotiator.frozen
+    assert negotiator.decide(["application/*"]) == "application/ld+json"
+    assert negotiators.content_negotiator(tuple(SUPPORTED_CONTENT_TYPES)) is negotiator
+    assert (
+        negotiators.content_negotiator(
+            SUPPORTED_CONTENT_TYPES, structured_suffixes=True
+        )
+        is not negotiator
+    )
+    assert negotiators.content_negotiator(SUPPORTED_CONTENT_TYPES[::-1]) is not (
+        negotiator
+    )
+    assert len(negotiators) == 1  # the others are no longer referred to
+
+
+def test_language_negotiator_is_shared() -> None:
+    """Should hand out one frozen negotiator per list, fallbacks and equivalents."""
+    negotiators = NegotiatorRegistry()
+    negotiator = negotiators.language_negotiator(
+        SUPPORTED_LANGUAGES, fallbacks={"nn": ["nb"]}, equivalents=[["no", "nb"]]
+    )
+    assert negotiator.frozen
+    assert negotiator.decide(["nn"]) == "nb"
+    assert negotiator.decide(["no"]) == "nb"
+    assert (
+        negotiators.language_negotiator(
+            SUPPORTED_LANGUAGES, fallbacks={"nn": ("nb",)}, equivalents=(("no", "nb"),)
+        )
+        is negotiator
+    )
+    assert negotiators.language_negotiator(SUPPORTED_LANGUAGES) is not negotiator
+
+
+def test_unused_negotiators_are_dropped() -> None:
+    """Should drop the negotiators no longer referred to."""
+    negotiators = NegotiatorRegistry()
+    content_negotiator = negotiators.content_negotiator(SUPPORTED_CONTENT_TYPES)
+    language_negotiator = negotiators.language_negotiator(SUPPORTED_LANGUAGES)
+    assert len(negotiators) == 2
+    del content_negotiator, language_negotiator
+    gc.collect()
+    assert len(negotiators) == 0
+
+
+def test_concurrent_requests_share_one_negotiator() -> None:
+    """Should compile a list once, when requested from several threads at once."""
+    negotiators = NegotiatorRegistry()
+    handed_out: List[ContentNegotiator] = []
+    barrier = threading.Barrier(8)
+
+    def request() -> None:
+        barrier.wait()
+        handed_out.append(negotiators.content_negotiator(SUPPORTED_CONTENT_TYPES))
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(negotiator) for negotiator in handed_out}) == 1
+
+
+def test_default_registry() -> None:
+    """Should hand out the negotiators of the process-wide registry."""
+    negotiator = registry.content_negotiator(SUPPORTED_CONTENT_TYPES)
+    assert default_registry.content_negotiator(SUPPORTED_CONTENT_TYPES) is negotiator
+    assert registry.language_negotiator(SUPPORTED_LANGUAGES) is (
+        default_registry.language_negotiator(SUPPORTED_LANGUAGES)
+    )
+
+
+def test_invalid_content_type() -> None:
+    """Should not register a negotiator that fails to compile."""
+    negotiators = NegotiatorRegistry()
+    with pytest.raises(ValueError):
+        negotiators.content_negotiator(["text/turtle;qs=x"])
+    assert len(negotiators) == 0
@@ -0,0 +1,102 @@
+"""Test cases for server qualities in compiled negotiators."""
+
+import pytest
+
+from content_negotiation import ContentNegotiator, NoAgreeableContentTypeError
+from content_negotiation.content_negotiation import parse_server_quality
+
+SUPPORTED_CONTENT_TYPES = [
+    "application/rdf+xml;qs=0.2",
+    "text/turtle",
+    "application/ld+json;qs=0.8",
+]
+
+
+def test_parse_server_quality() -> None:
+    """Should split the qs parameter off the content type."""
+    assert parse_server_quality("text/turtle") == ("text/turtle", 1.0)
+    assert parse_server_quality("text/turtle;qs=0.5") == ("text/turtle", 0.5)
+    assert parse_server_quality("text/plain; qs=0.5;charset=utf-8") == (
+        "text/plain;charset=utf-8",
+        0.5,
+    )
+    assert parse_server_quality("text/plain;charset=utf-8") == (
+        "text/plain;charset=utf-8",
+        1.0,
+    )
+
+
+def test_parse_server_quality_case_insensitive() -> None:
+    """Should split the qs parameter off whatever its case."""
+    assert parse_server_quality("text/turtle;QS=0.5") == ("text/turtle", 0.5)
+    assert parse_server_quality("text/plain; Qs=0.5;charset=utf-8") == (
+        "text/plain;charset=utf-8",
+        0.5,
+    )
+    negotiator = ContentNegotiator(["text/html;QS=0.5", "text/turtle"])
+    assert negotiator.supported_content_types == ["text/html", "text/turtle"]
+    assert negotiator.decide(["*/*"]) == "text/turtle"
+
+
+def test_parse_server_quality_invalid() -> None:
+    """Should raise ValueError for server qualities out of range."""
+    for content_type in ["text/turtle;qs=0", "text/turtle;qs=1.5", "text/html;qs=x"]:
+        with pytest.raises(ValueError):
+            parse_server_quality(content_type)
+
+
+def test_supported_content_types_without_server_qualities() -> None:
+    """Should strip the server qualities from the supported content types."""
+    negotiator = ContentNegotiator(SUPPORTED_CONTENT_TYPES)
+    assert negotiator.supported_content_types == [
+        "application/rdf+xml",
+        "text/turtle",
+        "application/ld+json",
+    ]
+    assert negotiator.server_qualities == {
+        "application/rdf+xml": 0.2,
+        "text/turtle": 1.0,
+        "application/ld+json": 0.8,
+    }
+
+
+def test_equally_rated_content_types_prefer_server_quality() -> None:
+    """Should decide the content type with the highest server quality."""
+    negotiator = ContentNegotiator(SUPPORTED_CONTENT_TYPES)
+    for accept_header, expected in [
+        (["*/*"], "text/turtle"),
+        ([], "text/turtle"),
+        (["application/rdf+xml,text/turtle"], "text/turtle"),
+        (["application/*"], "application/ld+json"),
+    ]:
+        assert negotiator.decide(accept_header) == expected, f"For {accept_header!r}."
+
+
+def test_client_preference_outweighs_server_quality() -> None:
+    """Should decide by the product of the q-value and the server quality."""
+    negotiator = ContentNegotiator(SUPPORTED_CONTENT_TYPES)
+    for accept_header, expected in [
+        (["application/rdf+xml,text/turtle;q=0.1"], "application/rdf+xml"),
+        (["application/ld+json,text/turtle;q=0.8"], "application/ld+json"),
+        (["application/ld+json,text/turtle;q=0.81"], "text/turtle"),
+        (["application/rdf+xml"], "application/rdf+xml"),
+    ]:
+        assert negotiator.decide(accept_header) == expected, f"For {accept_header!r}."
+
+
+def test_content_types_in_order_of_score() -> None:
+    """Should yield the acceptable content types by their products."""
+    negotiator = ContentNegotiator(SUPPORTED_CONTENT_TYPES)
+    assert list(negotiator.iter_content_types(["*/*"])) == [
+        "text/turtle",
+        "application/ld+json",
+        "application/rdf+xml",
+    ]
+
+
+def test_no_agreeable_content_type_with_server_qualities() -> None:
+    """Should raise NoAgreeableContentTypeError."""
+    negotiator = ContentNegotiator(SUPPORTED_CONTENT_TYPES)
+    for accept_header in [["audio/*"], ["text"]]:
+        with pytest.raises(NoAgreeableContentTypeError):
+            _ = negotiator.decide(accept_header)
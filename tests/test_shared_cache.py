@@ -0,0 +1,208 @@
+"""Test cases for the shared decision cache."""
+
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import struct
+import subprocess  # noqa: S404
+import sys
+from typing import Iterator, List, Optional
+
+import pytest
+
+from content_negotiation import content_negotiation
+from content_negotiation import (
+    ContentNegotiator,
+    NoAgreeableContentTypeError,
+    parse_accept,
+)
+from content_negotiation.content_negotiation import NO_AGREEABLE_CONTENT_TYPE
+from content_negotiation.shared_cache import fingerprint, SharedDecisionCache
+
+SUPPORTED_CONTENT_TYPES = ["text/turtle", "application/ld+json"]
+
+ACCEPT_HEADERS = [
+    "application/ld+json",
+    "text/*;q=0.5,application/json",
+    "application/*;q=0.9,text/turtle;q=0.1",
+    "audio/*",
+    "image/png,*/*;q=0.1",
+]
+
+
+@pytest.fixture
+def cache() -> Iterator[SharedDecisionCache]:
+    """Return a new shared decision cache, destroyed after the test."""
+    cache = SharedDecisionCache(slots=64)
+    yield cache
+    cache.close()
+    cache.unlink()
+
+
+def _decide_in_worker(name: str, headers: List[str]) -> List[Optional[str]]:
+    """Attach to the cache by name, and decide the headers through it."""
+    with SharedDecisionCache(name, create=False) as cache:
+        negotiator = ContentNegotiator(
+            SUPPORTED_CONTENT_TYPES, known_headers=(), cache=cache
+        )
+        decisions: List[Optional[str]] = []
+        for header in headers:
+            try:
+                decisions.append(negotiator.decide([header]))
+            except NoAgreeableContentTypeError:
+                decisions.append(None)
+        del negotiator
+    return decisions
+
+
+def test_shared_between_processes(cache: SharedDecisionCache) -> None:
+    """Should share the decisions made by other processes."""
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=2, mp_context=context) as executor:
+        futures = [
+            executor.submit(_decide_in_worker, cache.name, ACCEPT_HEADERS)
+            for _ in range(2)
+        ]
+        for future in futures:
+            assert future.result() == [
+                "application/ld+json",
+                "text/turtle",
+                "application/ld+json",
+                None,
+                "text/turtle",
+            ]
+
+    assert cache.lookup("application/ld+json") == 1
+    assert cache.lookup("audio/*") == NO_AGREEABLE_CONTENT_TYPE
+    assert cache.lookup("text/html") is None
+
+
+def test_decide_from_cache(cache: SharedDecisionCache) -> None:
+    """Should decide cached headers without negotiating."""
+    negotiator = ContentNegotiator(
+        SUPPORTED_CONTENT_TYPES, known_headers=(), cache=cache
+    )
+    cache.store("text/html", 1)
+    cache.store("application/ld+json", NO_AGREEABLE_CONTENT_TYPE)
+    assert negotiator.decide(["text/html"]) == "application/ld+json"
+    with pytest.raises(NoAgreeableContentTypeError):
+        negotiator.decide(["application/ld+json"])
+    assert negotiator.decide([]) == "text/turtle"
+
+
+def test_store_decisions(cache: SharedDecisionCache) -> None:
+    """Should store the decisions of headers that are not cached."""
+    negotiator = ContentNegotiator(
+        SUPPORTED_CONTENT_TYPES, known_headers=(), cache=cache
+    )
+    assert negotiator.decide(["application/*"]) == "application/ld+json"
+    with pytest.raises(NoAgreeableContentTypeError):
+        negotiator.decide(["audio/*"])
+    assert cache.lookup("application/*") == 1
+    assert cache.lookup("audio/*") == NO_AGREEABLE_CONTENT_TYPE
+
+
+def test_decide_header_before_parsing(
+    cache: SharedDecisionCache, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Should decide a cached header as sent, and store variants under both keys."""
+    negotiator = ContentNegotiator(
+        SUPPORTED_CONTENT_TYPES, known_headers=(), cache=cache
+    )
+    assert negotiator.decide(["text/html;q=0.5, text/turtle"]) == "text/turtle"
+    assert negotiator.decide(["text/turtle, text/html;Q=0.5"]) == "text/turtle"
+    assert cache.lookup(parse_accept(["text/turtle, text/html;q=0.5"]).key) == 0
+    assert cache.lookup("text/turtle, text/html;Q=0.5") == 0
+
+    def parse_accept_not_called(accept_headers: List[str]) -> None:
+        raise AssertionError("Parsed a cached header.")
+
+    monkeypatch.setattr(content_negotiation, "parse_accept", parse_accept_not_called)
+    assert negotiator.decide(["text/turtle, text/html;Q=0.5"]) == "text/turtle"
+
+
+def test_attach_by_name(cache: SharedDecisionCache) -> None:
+    """Should share the slots of the cache attached to by name."""
+    cache.store("text/turtle", 0)
+    with SharedDecisionCache(cache.name, create=False) as attached:
+        assert attached.slots == cache.slots
+        assert attached.lookup("text/turtle") == 0
+
+
+def test_attach_from_unrelated_processes() -> None:
+    """Should leave the cache to its creator when unrelated processes detach."""
+    cache = SharedDecisionCache(slots=64)
+    cache.store("text/turtle", 0)
+    attach = (
+        "from content_negotiation.shared_cache import SharedDecisionCache\n"
+        f"with SharedDecisionCache({cache.name!r}, create=False) as cache:\n"
+        "    assert cache.lookup('text/turtle') == 0\n"
+    )
+    try:
+        for _ in range(2):
+            subprocess.run(  # noqa: S603
+                [sys.executable, "-c", attach], capture_output=True, check=True
+            )
+    finally:
+        cache.close()
+        cache.unlink()
+
+
+def test_bound_to_supported_content_types(cache: SharedDecisionCache) -> None:
+    """Should refuse negotiators with other supported content types."""
+    ContentNegotiator(SUPPORTED_CONTENT_TYPES, cache=cache)
+    ContentNegotiator(SUPPORTED_CONTENT_TYPES, cache=cache)
+    with pytest.raises(ValueError):
+        ContentNegotiator(SUPPORTED_CONTENT_TYPES[::-1], cache=cache)
+    with pytest.raises(ValueError):
+        ContentNegotiator(
+            SUPPORTED_CONTENT_TYPES, cache=cache, structured_suffixes=True
+        )
+
+
+def test_collisions(cache: SharedDecisionCache) -> None:
+    """Should probe past other headers, and overwrite one when all probed are taken."""
+    headers = [f"application/x-{i}" for i in range(200)]
+    for index, header in enumerate(headers):
+        cache.store(header, index)
+    cached = {header: cache.lookup(header) for header in headers}
+    assert all(cached[h] in (None, i) for i, h in enumerate(headers))
+    assert cached[headers[-1]] == len(headers) - 1
+
+
+def test_slot_being_written_is_a_miss(cache: SharedDecisionCache) -> None:
+    """Should miss a slot that is being written, and not write it concurrently."""
+    cache.store("text/turtle", 0)
+    offset = cache._offset(fingerprint("text/turtle"), 0)
+    sequence = struct.unpack_from("<I", cache._buf, offset)[0]
+    struct.pack_into("<I", cache._buf, offset, sequence + 1)
+    assert cache.lookup("text/turtle") is None
+    cache.store("text/turtle", 1)
+    struct.pack_into("<I", cache._buf, offset, sequence)
+    assert cache.lookup("text/turtle") == 0
+
+
+def test_torn_slot_is_a_miss(cache: SharedDecisionCache) -> None:
+    """Should miss a slot whose checksum does not match."""
+    cache.store("text/turtle", 0)
+    offset = cache._offset(fingerprint("text/turtle"), 0)
+    struct.pack_into("<i", cache._buf, offset + 4, 1)
+    assert cache.lookup("text/turtle") is None
+
+
+def test_attach_to_other_shared_memory() -> None:
+    """Should refuse to attach to shared memory that is not a decision cache."""
+    from multiprocessing.shared_memory import SharedMemory
+
+    memory = SharedMemory(create=True, size=64)
+    try:
+        with pytest.raises(ValueError):
+            SharedDecisionCache(memory.name, create=False)
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+def test_invalid_slots() -> None:
+    """Should raise ValueError on a number of slots that is not positive."""
+    with pytest.raises(ValueError):
+        SharedDecisionCache(slots=0)
@@ -0,0 +1,64 @@
+"""Test cases for structured syntax suffix matching in compiled negotiators."""
+
+import pytest
+
+from content_negotiation import ContentNegotiator, NoAgreeableContentTypeError
+
+SUPPORTED_CONTENT_TYPES = [
+    "text/turtle",
+    "application/rdf+xml",
+    "application/ld+json",
+    "application/activity+json",
+]
+
+
+def test_suffix_wildcard_of_type() -> None:
+    """Should return the first supported +json type of the given type."""
+    negotiator = ContentNegotiator(SUPPORTED_CONTENT_TYPES, structured_suffixes=True)
+    assert negotiator.decide(["application/*+json"]) == "application/ld+json"
+    assert negotiator.decide(["application/*+xml"]) == "application/rdf+xml"
+
+
+def test_suffix_wildcard_of_any_type() -> None:
+    """Should return the first supported +json type of any type."""
+    negotiator = ContentNegotiator(SUPPORTED_CONTENT_TYPES, structured_suffixes=True)
+    assert negotiator.decide(["*/*+json"]) == "application/ld+json"
+
+
+def test_suffix_base_type() -> None:
+    """Should satisfy the base type of a suffix with a suffixed type."""
+    negotiator = ContentNegotiator(SUPPORTED_CONTENT_TYPES, structured_suffixes=True)
+    assert negotiator.decide(["application/json"]) == "application/ld+json"
+    assert negotiator.decide(["text/xml"]) == "application/rdf+xml"
+    assert negotiator.decide(["text/html,application/xml;q=0.9"]) == (
+        "application/rdf+xml"
+    )
+
+
+def test_suffix_does_not_override_supported_content_types() -> None:
+    """Should prefer a supported content type over a suffix match."""
+    negotiator = ContentNegotiator(
+        ["application/ld+json", "application/json"], structured_suffixes=True
+    )
+    assert negotiator.decide(["application/json"]) == "application/json"
+
+
+def test_suffix_respects_preference_order() -> None:
+    """Should prefer a higher weighted exact match over a suffix match."""
+    negotiator = ContentNegotiator(SUPPORTED_CONTENT_TYPES, structured_suffixes=True)
+    assert negotiator.decide(["application/json;q=0.5,text/turtle"]) == ("text/turtle")
+
+
+def test_suffix_matching_is_opt_in() -> None:
+    """Should not match by suffix unless enabled."""
+    negotiator = ContentNegotiator(SUPPORTED_CONTENT_TYPES)
+    for accept_header in [["application/*+json"], ["application/json"]]:
+        with pytest.raises(NoAgreeableContentTypeError):
+            _ = negotiator.decide(accept_header)
+
+
+def test_suffix_no_match() -> None:
+    """Should raise NoAgreeableContentTypeError for an unsupported suffix."""
+    negotiator = ContentNegotiator(SUPPORTED_CONTENT_TYPES, structured_suffixes=True)
+    with pytest.raises(NoAgreeableContentTypeError):
+        _ = negotiator.decide(["application/*+cbor"])
@@ -0,0 +1,127 @@
+"""Test cases for the package in isolated subinterpreters (PEP 684, PEP 734).
+
+Every subinterpreter imports the package anew, with its own loggers, intern tables
+and enum classes, so that no module state is shared with other interpreters. With
+a GIL per interpreter, from Python 3.12, subinterpreters are isolated, and only
+import extension modules that support isolation.
+"""
+
+import importlib
+import pkgutil
+import sys
+import threading
+from types import ModuleType
+from typing import List, Mapping, Optional
+
+import pytest
+
+import content_negotiation
+from content_negotiation.charset_negotiation import CHARSET_ALIASES
+from content_negotiation.content_negotiation import (
+    intern_media_range,
+    STRUCTURED_SUFFIX_BASE_TYPES,
+)
+
+
+def _interpreters() -> Optional[ModuleType]:
+    """Return the low-level subinterpreter module, if there is one."""
+    for name in ("_interpreters", "_xxsubinterpreters"):
+        try:
+            return importlib.import_module(name)
+        except ImportError:
+            continue
+    return None  # pragma: no cover
+
+
+interpreters = _interpreters()
+
+pytestmark = pytest.mark.skipif(
+    interpreters is None, reason="Subinterpreters are not available."
+)
+
+# Decides in the subinterpreter, and fails the run on a wrong decision:
+SCRIPT = f"""
+import sys
+sys.path[:] = {sys.path!r}
+assert "content_negotiation" not in sys.modules, "package shared"
+
+from content_negotiation import (
+    ContentNegotiator,
+    decide_charset,
+    decide_content_type,
+    decide_language,
+    LanguageNegotiator,
+)
+from content_negotiation.charset_negotiation import CHARSET_ALIASES
+from content_negotiation.content_negotiation import (
+    intern_media_range,
+    STRUCTURED_SUFFIX_BASE_TYPES,
+)
+
+supported = ["text/turtle", "application/ld+json"]
+accept = ["application/*;q=0.9, text/plain"]
+for _ in range(100):
+    assert decide_content_type(accept, supported) == "application/ld+json"
+    assert ContentNegotiator(supported).freeze().decide(accept) == "application/ld+json"
+    assert decide_language(["nb,en;q=0.5"], ["en", "nb"]) == "nb"
+    assert LanguageNegotiator(["en", "nb"]).decide(["nn,en;q=0.5"]) == "en"
+    assert decide_charset(["latin1"], ["iso-8859-1"]) == "iso-8859-1"
+assert intern_media_range.cache_info().currsize > 0, "no ranges interned"
+"""
+
+
+@pytest.mark.parametrize("table", [CHARSET_ALIASES, STRUCTURED_SUFFIX_BASE_TYPES])
+def test_module_tables_are_read_only(table: Mapping) -> None:
+    """Should refuse to modify the tables of the modules."""
+    with pytest.raises(TypeError):
+        table["x"] = "y"  # type: ignore[index]
+
+
+def _run(script: str) -> None:
+    """Run a script in a new subinterpreter, and raise if it fails."""
+    assert interpreters is not None
+    interpreter = interpreters.create()
+    try:
+        # Before Python 3.13 a failure is raised, from then on it is returned:
+        error = interpreters.run_string(interpreter, script)
+        if error is not None:  # pragma: no cover
+            raise AssertionError(error)
+    finally:
+        interpreters.destroy(interpreter)
+
+
+def test_decide_in_subinterpreter() -> None:
+    """Should decide in a subinterpreter, without touching this interpreter's state."""
+    intern_media_range.cache_clear()
+    _run(SCRIPT)
+    assert intern_media_range.cache_info().currsize == 0
+
+
+def test_decide_in_concurrent_subinterpreters() -> None:
+    """Should decide in several subinterpreters at once."""
+    errors: List[Exception] = []
+
+    def run() -> None:
+        try:
+            _run(SCRIPT)
+        except Exception as e:  # pragma: no cover
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+
+
+@pytest.mark.parametrize(
+    "module",
+    [
+        f"content_negotiation.{module.name}"
+        for module in pkgutil.iter_modules(content_negotiation.__path__)
+    ],
+)
+def test_import_in_subinterpreter(module: str) -> None:
+    """Should import every module in a subinterpreter."""
+    _run(f"import sys\nsys.path[:] = {sys.path!r}\nimport {module}\n")
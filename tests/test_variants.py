@@ -0,0 +1,121 @@
+"""Test cases for negotiating against masks of a universe of variants."""
+
+from typing import Any, Callable
+
+import pytest
+
+from content_negotiation import (
+    decide_content_type,
+    decide_language,
+    NoAgreeableContentTypeError,
+    NoAgreeableLanguageError,
+    parse_accept,
+    parse_accept_language,
+)
+from content_negotiation.variants import ContentTypeUniverse, LanguageUniverse
+
+
+def outcome(decide: Callable, *args: Any) -> Any:
+    """Return the decision, or the type of the error raised."""
+    try:
+        return decide(*args)
+    except Exception as e:
+        return type(e)
+
+
+CONTENT_TYPES = [
+    "text/turtle",
+    "application/ld+json",
+    "application/rdf+xml",
+    "text/html",
+]
+
+
+def test_mask_and_unmask() -> None:
+    """Should set one bit per content type, and list them in universe order."""
+    universe = ContentTypeUniverse(CONTENT_TYPES)
+    mask = universe.mask(["text/html", "application/ld+json"])
+    assert mask == 0b1010
+    assert universe.unmask(mask) == ["application/ld+json", "text/html"]
+    assert universe.full_mask == 0b1111
+
+
+def test_duplicate_variants_share_a_bit() -> None:
+    """Should assign one bit to a variant listed twice."""
+    universe = ContentTypeUniverse(["text/turtle", "text/html", "text/turtle"])
+    assert universe.variants == ("text/turtle", "text/html")
+
+
+def test_mask_of_unknown_variant() -> None:
+    """Should raise ValueError for a variant that is not in the universe."""
+    with pytest.raises(ValueError):
+        ContentTypeUniverse(CONTENT_TYPES).mask(["image/png"])
+
+
+@pytest.mark.parametrize(
+    "accept_headers",
+    [
+        ["text/turtle"],
+        ["text/*"],
+        ["application/*;q=0.5, text/html"],
+        ["*/*"],
+        ["image/png, */*;q=0.1"],
+        [],
+        ["text/turtle;q=0"],
+    ],
+)
+def test_decide_as_decide_content_type(accept_headers: list) -> None:
+    """Should decide as decide_content_type does on the content types of a mask."""
+    universe = ContentTypeUniverse(CONTENT_TYPES)
+    for mask in range(1, universe.full_mask + 1):
+        supported = universe.unmask(mask)
+        expected = outcome(decide_content_type, accept_headers, supported)
+        assert outcome(universe.decide, accept_headers, mask) == expected
+        parsed = parse_accept(accept_headers)
+        assert outcome(universe.decide, parsed, mask) == expected
+
+
+@pytest.mark.parametrize(
+    "accept_headers,mask",
+    [(["text/turtle"], 0), (["image/*"], 0b1111), (["text"], 0b1111)],
+)
+def test_decide_no_agreeable_content_type(accept_headers: list, mask: int) -> None:
+    """Should raise NoAgreeableContentTypeError."""
+    with pytest.raises(NoAgreeableContentTypeError):
+        ContentTypeUniverse(CONTENT_TYPES).decide(accept_headers, mask)
+
+
+def test_decide_ignores_bits_outside_the_universe() -> None:
+    """Should ignore bits of a mask beyond the variants of the universe."""
+    universe = ContentTypeUniverse(CONTENT_TYPES)
+    assert universe.decide(["*/*"], 1 << 8 | 0b0100) == "application/rdf+xml"
+    with pytest.raises(NoAgreeableContentTypeError):
+        universe.decide(["*/*"], 1 << 8)
+
+
+def test_empty_universe() -> None:
+    """Should never decide a content type from an empty universe."""
+    with pytest.raises(NoAgreeableContentTypeError):
+        ContentTypeUniverse([]).decide(["*/*"], 0b1)
+
+
+@pytest.mark.parametrize(
+    "accept_language_headers",
+    [["nb"], ["en;q=0.5, nb"], ["fr, *;q=0.1"], ["*"], [], ["nb;q=0"]],
+)
+def test_decide_language_as_decide_language(accept_language_headers: list) -> None:
+    """Should decide as decide_language does on the languages of a mask."""
+    universe = LanguageUniverse(["nb", "nn", "en"])
+    for mask in range(1, universe.full_mask + 1):
+        supported = universe.unmask(mask)
+        expected = outcome(decide_language, accept_language_headers, supported)
+        assert outcome(universe.decide, accept_language_headers, mask) == expected
+        parsed = parse_accept_language(accept_language_headers)
+        assert outcome(universe.decide, parsed, mask) == expected
+
+
+@pytest.mark.parametrize("accept_language_headers,mask", [(["nb"], 0), (["fr"], 1)])
+def test_decide_no_agreeable_language(accept_language_headers: list, mask: int) -> None:
+    """Should raise NoAgreeableLanguageError."""
+    with pytest.raises(NoAgreeableLanguageError):
+        LanguageUniverse(["nb", "en"]).decide(accept_language_headers, mask)
@@ -2,7 +2,10 @@
 
 import pytest
 
-from content_negotiation.content_negotiation import get_default_content_type
+from content_negotiation.content_negotiation import (
+    get_default_content_type,
+    get_included_content_type,
+)
 
 
 @pytest.mark.unit
@@ -26,3 +29,24 @@ def test_get_default_content_type_given_type() -> None:
         )
         == supported_content_types[1]
     )
+
+
+@pytest.mark.unit
+def test_get_included_content_type() -> None:
+    """Should return the first content type that is not excluded, or None."""
+    supported_content_types = ["text/turtle", "text/n3", "application/ld+json"]
+    assert get_included_content_type(supported_content_types) == "text/turtle"
+    assert (
+        get_included_content_type(supported_content_types, excluded={"text/turtle"})
+        == "text/n3"
+    )
+    assert (
+        get_included_content_type(supported_content_types, excluded={"text/*"})
+        == "application/ld+json"
+    )
+    assert (
+        get_included_content_type(
+            supported_content_types, type="text", excluded={"text/turtle", "text/n3"}
+        )
+        is None
+    )
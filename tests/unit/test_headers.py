@@ -0,0 +1,49 @@
+"""Unit test cases for the headers module."""
+
+import pytest
+
+from content_negotiation.headers import parse_quality, split_field_values
+
+
+@pytest.mark.unit
+def test_split_field_values_strips_optional_whitespace() -> None:
+    """Should split the field values into elements without surrounding whitespace."""
+    assert split_field_values(["text/turtle ,\ttext/html", " */*"]) == [
+        "text/turtle",
+        "text/html",
+        "*/*",
+    ]
+
+
+@pytest.mark.unit
+def test_split_field_values_keeps_empty_elements() -> None:
+    """Should keep empty elements."""
+    assert split_field_values(["", "a, ,b"]) == ["", "a", "", "b"]
+
+
+@pytest.mark.unit
+def test_parse_quality_default() -> None:
+    """Should return 1.0 when there is no q parameter."""
+    assert parse_quality(["level=1"]) == 1.0
+
+
+@pytest.mark.unit
+def test_parse_quality_case_insensitive_name_and_whitespace() -> None:
+    """Should parse a q parameter with an upper case name and whitespace."""
+    assert parse_quality([" Q=0.5 "]) == 0.5
+
+
+@pytest.mark.unit
+def test_parse_quality_truncates_and_clamps() -> None:
+    """Should truncate to three decimals and clamp to between 0.0 and 1.0."""
+    assert parse_quality(["q=0.12345"]) == 0.123
+    assert parse_quality(["q=1.5"]) == 1.0
+    assert parse_quality(["q=-1"]) == 0.0
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("value", ["x", "nan", ""])
+def test_parse_quality_invalid(value: str) -> None:
+    """Should raise ValueError for a q-value that is not a number."""
+    with pytest.raises(ValueError):
+        parse_quality([f"q={value}"])
@@ -0,0 +1,60 @@
+"""Unit test cases for the WeightedCharset class."""
+
+import pytest
+
+from content_negotiation.charset_negotiation import (
+    CharsetSpecificity,
+    InvalidCharsetError,
+    prepare_weighted_charsets,
+    WeightedCharset,
+)
+
+
+@pytest.mark.unit
+def test_initialization_default_q() -> None:
+    """Should return a WeightedCharset object with default value for q = 1.0."""
+    wc = WeightedCharset("UTF-8")
+    assert wc.charset == "utf-8"
+    assert wc.q == 1.0
+    assert wc.specificity == CharsetSpecificity.SPECIFIC
+
+
+@pytest.mark.unit
+def test_initialization_given_q() -> None:
+    """Should return a WeightedCharset object with the given q."""
+    wc = WeightedCharset("utf-8; q=0.5")
+    assert wc.q == 0.5
+
+
+@pytest.mark.unit
+def test_initialization_q_out_of_range() -> None:
+    """Should clamp q to between 0.0 and 1.0."""
+    assert WeightedCharset("utf-8;q=1.1").q == 1.0
+    assert WeightedCharset("utf-8;q=-1.1").q == 0.0
+
+
+@pytest.mark.unit
+def test_initialization_non_specific() -> None:
+    """Should return a non-specific WeightedCharset object."""
+    wc = WeightedCharset("*")
+    assert wc.specificity == CharsetSpecificity.NONSPECIFIC
+
+
+@pytest.mark.unit
+def test_initialization_invalid_q() -> None:
+    """Should raise InvalidCharsetError."""
+    with pytest.raises(InvalidCharsetError):
+        WeightedCharset("utf-8;q=x")
+
+
+@pytest.mark.unit
+def test_str() -> None:
+    """Should return a string representation of the object."""
+    assert str(WeightedCharset("utf-8;q=0.5")) == "utf-8;q=0.5"
+
+
+@pytest.mark.unit
+def test_prepare_weighted_charsets() -> None:
+    """Should sort by q-value, then specificity."""
+    wcs = prepare_weighted_charsets(["*", "latin1;q=0.5", "utf-8"])
+    assert [wc.charset for wc in wcs] == ["utf-8", "*", "latin1"]